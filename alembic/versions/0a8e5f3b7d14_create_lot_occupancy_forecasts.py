@@ -0,0 +1,36 @@
+"""create lot occupancy forecasts
+
+Revision ID: 0a8e5f3b7d14
+Revises: f19b4d62c8e0
+Create Date: 2026-10-22 09:27:05.614771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a8e5f3b7d14'
+down_revision: Union[str, Sequence[str], None] = 'f19b4d62c8e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "lot_occupancy_forecasts",
+        sa.Column("parking_lot_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("profile", sa.LargeBinary(), nullable=False),
+        sa.Column("slot_count", sa.Integer(), nullable=False),
+        sa.Column("weeks", sa.Integer(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("lot_occupancy_forecasts")
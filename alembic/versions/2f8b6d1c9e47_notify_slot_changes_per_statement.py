@@ -0,0 +1,61 @@
+"""notify slot changes once per statement and lot
+
+Revision ID: 2f8b6d1c9e47
+Revises: 6c2d9f4e1a83
+Create Date: 2026-10-24 10:14:37.520915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f8b6d1c9e47'
+down_revision: Union[str, Sequence[str], None] = '6c2d9f4e1a83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Sensor ingestion flips thousands of slots per UPDATE; listeners only use
+# "lot" for slots, so send one notification per affected lot like bookings.
+SLOT_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_slot_changes() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'spotzy_changes',
+        json_build_object('table', 'parking_slots', 'op', TG_OP, 'lot', lots.parking_lot_id)::text
+    )
+    FROM (SELECT DISTINCT parking_lot_id FROM changed_rows) AS lots;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(SLOT_FUNCTION)
+    op.execute("DROP TRIGGER IF EXISTS parking_slots_notify ON parking_slots")
+
+    for event, transition in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        op.execute(f"""
+            CREATE TRIGGER parking_slots_notify_{event.lower()}
+            AFTER {event} ON parking_slots
+            REFERENCING {transition} TABLE AS changed_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_slot_changes()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS parking_slots_notify_{event} ON parking_slots")
+
+    op.execute("""
+        CREATE TRIGGER parking_slots_notify
+        AFTER INSERT OR UPDATE OR DELETE ON parking_slots
+        FOR EACH ROW EXECUTE FUNCTION notify_row_change()
+    """)
+    op.execute("DROP FUNCTION IF EXISTS notify_slot_changes()")
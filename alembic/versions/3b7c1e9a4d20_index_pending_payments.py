@@ -0,0 +1,33 @@
+"""index pending payments for reconciliation
+
+Revision ID: 3b7c1e9a4d20
+Revises: 872a43bdaf89
+Create Date: 2026-10-19 09:12:41.220417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7c1e9a4d20'
+down_revision: Union[str, Sequence[str], None] = '872a43bdaf89'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_payments_created_pending",
+        "payments",
+        ["created_at", "uid"],
+        postgresql_where=sa.text("status = 'created'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_payments_created_pending", table_name="payments")
@@ -0,0 +1,28 @@
+"""add refund_pending payment status
+
+Revision ID: 4e9b2c7a1f53
+Revises: 2f8b6d1c9e47
+Create Date: 2026-10-27 09:41:18.204617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e9b2c7a1f53'
+down_revision: Union[str, Sequence[str], None] = '2f8b6d1c9e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TYPE payment_status_enum ADD VALUE IF NOT EXISTS 'refund_pending' BEFORE 'refunded'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres cannot drop an enum value; it is unused once no row holds it
+    pass
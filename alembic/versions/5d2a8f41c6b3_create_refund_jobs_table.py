@@ -0,0 +1,51 @@
+"""create refund jobs table
+
+Revision ID: 5d2a8f41c6b3
+Revises: 3b7c1e9a4d20
+Create Date: 2026-10-19 11:03:27.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8f41c6b3'
+down_revision: Union[str, Sequence[str], None] = '3b7c1e9a4d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "refund_jobs",
+        sa.Column("uid", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("parking_lot_id", sa.Uuid(), nullable=False),
+        sa.Column("window_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("window_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", postgresql.VARCHAR(), nullable=False),
+        sa.Column("processed", sa.Integer(), nullable=False),
+        sa.Column("refunded", sa.Integer(), nullable=False),
+        sa.Column("cancelled", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("last_error", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("cursor_start_time", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("cursor_booking_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("created_by", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["parking_lot_id"], ["parking_lots.uid"]),
+        sa.ForeignKeyConstraint(["created_by"], ["users.uid"]),
+    )
+    op.create_index("ix_refund_jobs_parking_lot_id", "refund_jobs", ["parking_lot_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_refund_jobs_parking_lot_id", table_name="refund_jobs")
+    op.drop_table("refund_jobs")
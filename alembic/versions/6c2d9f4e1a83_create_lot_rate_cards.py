@@ -0,0 +1,66 @@
+"""create lot rate cards
+
+Revision ID: 6c2d9f4e1a83
+Revises: 0a8e5f3b7d14
+Create Date: 2026-10-23 11:02:48.306217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2d9f4e1a83'
+down_revision: Union[str, Sequence[str], None] = '0a8e5f3b7d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "lot_rate_cards",
+        sa.Column("uid", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "parking_lot_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("parking_lots.uid", ondelete="CASCADE"),
+            nullable=False,
+            unique=True,
+        ),
+        sa.Column("currency", sa.String(length=10), nullable=False),
+        sa.Column("hourly_rate", sa.Numeric(10, 2), nullable=False),
+        sa.Column("daily_cap", sa.Numeric(10, 2), nullable=True),
+        sa.Column("peak_multiplier", sa.Numeric(4, 2), nullable=False, server_default="1"),
+        sa.Column("peak_start_hour", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("peak_end_hour", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("peak_weekdays", sa.Integer(), nullable=False, server_default="31"),
+        sa.Column("billing_increment_minutes", sa.Integer(), nullable=False, server_default="15"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.CheckConstraint("hourly_rate >= 0", name="ck_lot_rate_cards_hourly_rate"),
+        sa.CheckConstraint("peak_multiplier >= 1", name="ck_lot_rate_cards_peak_multiplier"),
+        sa.CheckConstraint(
+            "peak_start_hour BETWEEN 0 AND 23 AND peak_end_hour BETWEEN 0 AND 24",
+            name="ck_lot_rate_cards_peak_hours",
+        ),
+        sa.CheckConstraint(
+            "billing_increment_minutes BETWEEN 1 AND 1440",
+            name="ck_lot_rate_cards_increment",
+        ),
+    )
+
+    # workers cache rate cards; notify_row_change() tells them to drop one
+    op.execute("""
+        CREATE TRIGGER lot_rate_cards_notify
+        AFTER INSERT OR UPDATE OR DELETE ON lot_rate_cards
+        FOR EACH ROW EXECUTE FUNCTION notify_row_change()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS lot_rate_cards_notify ON lot_rate_cards")
+    op.drop_table("lot_rate_cards")
@@ -0,0 +1,32 @@
+"""add parking_slots.state_observed_at
+
+Revision ID: 8d1f5a2e6c39
+Revises: 4e9b2c7a1f53
+Create Date: 2026-10-28 11:06:52.318470
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1f5a2e6c39'
+down_revision: Union[str, Sequence[str], None] = '4e9b2c7a1f53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # sensor time of the last applied reading; NULL until a sensor reports
+    op.add_column(
+        "parking_slots",
+        sa.Column("state_observed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("parking_slots", "state_observed_at")
@@ -0,0 +1,43 @@
+"""create booking transitions audit table
+
+Revision ID: 9a61d3e7f208
+Revises: 7e4f0c2b9a15
+Create Date: 2026-10-19 15:21:09.377152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a61d3e7f208'
+down_revision: Union[str, Sequence[str], None] = '7e4f0c2b9a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "booking_transitions",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("booking_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("from_status", sqlmodel.sql.sqltypes.AutoString(length=32), nullable=True),
+        sa.Column("to_status", sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+        sa.Column("actor_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("reason", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_booking_transitions_booking_id", "booking_transitions", ["booking_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_booking_transitions_booking_id", table_name="booking_transitions")
+    op.drop_table("booking_transitions")
@@ -0,0 +1,97 @@
+"""notify on parking lot, slot and booking changes
+
+Revision ID: b3c9e2d4a7f1
+Revises: 9a61d3e7f208
+Create Date: 2026-10-19 17:05:44.613090
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c9e2d4a7f1'
+down_revision: Union[str, Sequence[str], None] = '9a61d3e7f208'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Payloads stay tiny ({"table", "op", "uid", "lot"}); listeners look the
+# data up again if they need it. Bookings use statement-level triggers so
+# a bulk UPDATE sends one notification per affected lot, not per row.
+ROW_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_row_change() RETURNS trigger AS $$
+DECLARE
+    rec record;
+    lot uuid;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+    ELSE
+        rec := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'parking_lots' THEN
+        lot := rec.uid;
+    ELSE
+        lot := rec.parking_lot_id;
+    END IF;
+
+    PERFORM pg_notify(
+        'spotzy_changes',
+        json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'uid', rec.uid, 'lot', lot)::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+BOOKING_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_booking_changes() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'spotzy_changes',
+        json_build_object('table', 'bookings', 'op', TG_OP, 'lot', lots.parking_lot_id)::text
+    )
+    FROM (
+        SELECT DISTINCT s.parking_lot_id
+        FROM changed_rows c
+        JOIN parking_slots s ON s.uid = c.slot_id
+    ) AS lots;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(ROW_FUNCTION)
+    op.execute(BOOKING_FUNCTION)
+
+    for table in ("parking_lots", "parking_slots"):
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION notify_row_change()
+        """)
+
+    for event, transition in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        op.execute(f"""
+            CREATE TRIGGER bookings_notify_{event.lower()}
+            AFTER {event} ON bookings
+            REFERENCING {transition} TABLE AS changed_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_booking_changes()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS bookings_notify_{event} ON bookings")
+    for table in ("parking_lots", "parking_slots"):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify ON {table}")
+
+    op.execute("DROP FUNCTION IF EXISTS notify_booking_changes()")
+    op.execute("DROP FUNCTION IF EXISTS notify_row_change()")
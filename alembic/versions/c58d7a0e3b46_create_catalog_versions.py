@@ -0,0 +1,70 @@
+"""create catalog versions maintained by triggers
+
+Revision ID: c58d7a0e3b46
+Revises: b3c9e2d4a7f1
+Create Date: 2026-10-20 09:31:18.072641
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58d7a0e3b46'
+down_revision: Union[str, Sequence[str], None] = 'b3c9e2d4a7f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Statement-level, so a bulk slot update bumps each lot once.
+BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_catalog_versions() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'parking_lots' THEN
+        INSERT INTO catalog_versions (scope, version, updated_at)
+        VALUES ('lots', 1, now())
+        ON CONFLICT (scope) DO UPDATE
+            SET version = catalog_versions.version + 1, updated_at = now();
+    ELSE
+        INSERT INTO catalog_versions (scope, version, updated_at)
+        SELECT DISTINCT 'lot:' || parking_lot_id, 1, now() FROM changed_rows
+        ON CONFLICT (scope) DO UPDATE
+            SET version = catalog_versions.version + 1, updated_at = now();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "catalog_versions",
+        sa.Column("scope", sqlmodel.sql.sqltypes.AutoString(length=64), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.execute(BUMP_FUNCTION)
+
+    for table in ("parking_lots", "parking_slots"):
+        for event, transition in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            op.execute(f"""
+                CREATE TRIGGER {table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                REFERENCING {transition} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_versions()
+            """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("parking_lots", "parking_slots"):
+        for event in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_version_{event} ON {table}")
+
+    op.execute("DROP FUNCTION IF EXISTS bump_catalog_versions()")
+    op.drop_table("catalog_versions")
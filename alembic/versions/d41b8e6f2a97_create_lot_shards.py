@@ -0,0 +1,58 @@
+"""create lot shard directory; drop cross-shard user foreign keys on shards
+
+Revision ID: d41b8e6f2a97
+Revises: c58d7a0e3b46
+Create Date: 2026-10-20 14:12:40.518337
+
+Shard databases are migrated with `alembic -x role=shard upgrade head`:
+users stay on the main database, so foreign keys pointing at them are
+dropped there.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41b8e6f2a97'
+down_revision: Union[str, Sequence[str], None] = 'c58d7a0e3b46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+USER_FOREIGN_KEYS = (
+    ("bookings", "bookings_user_id_fkey", "user_id"),
+    ("parking_lots", "parking_lots_admin_id_fkey", "admin_id"),
+    ("refund_jobs", "refund_jobs_created_by_fkey", "created_by"),
+)
+
+
+def _is_shard() -> bool:
+    return context.get_x_argument(as_dictionary=True).get("role") == "shard"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "lot_shards",
+        sa.Column("parking_lot_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("shard", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column("moving", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+    if _is_shard():
+        for table, name, _ in USER_FOREIGN_KEYS:
+            op.drop_constraint(name, table, type_="foreignkey")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _is_shard():
+        for table, name, column in USER_FOREIGN_KEYS:
+            op.create_foreign_key(name, table, "users", [column], ["uid"])
+
+    op.drop_table("lot_shards")
@@ -0,0 +1,147 @@
+"""partition bookings by month of start_time
+
+Revision ID: e7a3c9150b28
+Revises: d41b8e6f2a97
+Create Date: 2026-10-21 10:03:17.902215
+
+bookings becomes RANGE (start_time) partitioned, one partition per UTC
+month named bookings_YYYY_MM. The primary key has to include the
+partition key, so it is now (uid, start_time) and payments can no longer
+reference bookings.uid; payments.booking_id keeps its index but loses
+the foreign key (archived bookings leave their payments behind anyway).
+
+create_booking_partition(date) is used afterwards by
+src/services/partition_services.py to add future months.
+
+Downgrade folds attached partitions back into a plain table; archived
+months have to be restored first or they are not part of it.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c9150b28'
+down_revision: Union[str, Sequence[str], None] = 'd41b8e6f2a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# months created ahead of now by the migration itself
+MONTHS_AHEAD = 7
+
+PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_booking_partition(month date) RETURNS text AS $$
+DECLARE
+    first_day date := date_trunc('month', month)::date;
+    partition_name text := format('bookings_%s', to_char(first_day, 'YYYY_MM'));
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF bookings FOR VALUES FROM (%L) TO (%L)',
+        partition_name,
+        first_day::timestamp AT TIME ZONE 'UTC',
+        (first_day + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_PARTITIONS = f"""
+DO $$
+DECLARE
+    month date;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', coalesce(min(start_time), now()) AT TIME ZONE 'UTC'),
+            date_trunc('month', greatest(max(start_time), now() + interval '{MONTHS_AHEAD} months') AT TIME ZONE 'UTC'),
+            interval '1 month'
+        )::date
+        FROM bookings_unpartitioned
+    LOOP
+        PERFORM create_booking_partition(month);
+    END LOOP;
+END $$;
+"""
+
+NOTIFY_EVENTS = (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+
+
+def _is_shard() -> bool:
+    return context.get_x_argument(as_dictionary=True).get("role") == "shard"
+
+
+def _create_notify_triggers() -> None:
+    # statement-level with transition tables is allowed on the parent
+    for event, transition in NOTIFY_EVENTS:
+        op.execute(f"""
+            CREATE TRIGGER bookings_notify_{event.lower()}
+            AFTER {event} ON bookings
+            REFERENCING {transition} TABLE AS changed_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_booking_changes()
+        """)
+
+
+def _create_foreign_keys() -> None:
+    op.create_foreign_key(
+        "bookings_slot_id_fkey", "bookings", "parking_slots", ["slot_id"], ["uid"]
+    )
+    if not _is_shard():
+        op.create_foreign_key(
+            "bookings_user_id_fkey", "bookings", "users", ["user_id"], ["uid"]
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_booking_id_fkey")
+
+    op.rename_table("bookings", "bookings_unpartitioned")
+    op.execute(
+        "ALTER TABLE bookings_unpartitioned "
+        "RENAME CONSTRAINT bookings_pkey TO bookings_unpartitioned_pkey"
+    )
+
+    op.execute("""
+        CREATE TABLE bookings (LIKE bookings_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE (start_time)
+    """)
+    op.create_primary_key("bookings_pkey", "bookings", ["uid", "start_time"])
+    _create_foreign_keys()
+    # overlap checks and per-user lists; every partition gets its own copy
+    op.create_index("ix_bookings_slot_id_start_time", "bookings", ["slot_id", "start_time"])
+    op.create_index("ix_bookings_user_id_start_time", "bookings", ["user_id", "start_time"])
+
+    op.execute(PARTITION_FUNCTION)
+    op.execute(CREATE_PARTITIONS)
+
+    op.execute("INSERT INTO bookings SELECT * FROM bookings_unpartitioned")
+    op.drop_table("bookings_unpartitioned")  # takes its triggers along
+
+    _create_notify_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table("bookings", "bookings_partitioned")
+    op.execute(
+        "ALTER TABLE bookings_partitioned RENAME CONSTRAINT bookings_pkey TO bookings_partitioned_pkey"
+    )
+    op.execute("""
+        CREATE TABLE bookings (LIKE bookings_partitioned INCLUDING DEFAULTS)
+    """)
+    op.create_primary_key("bookings_pkey", "bookings", ["uid"])
+    _create_foreign_keys()
+
+    op.execute("INSERT INTO bookings SELECT * FROM bookings_partitioned")
+    op.drop_table("bookings_partitioned")  # drops every attached partition
+    op.execute("DROP FUNCTION IF EXISTS create_booking_partition(date)")
+
+    _create_notify_triggers()
+
+    op.execute("""
+        ALTER TABLE payments ADD CONSTRAINT payments_booking_id_fkey
+        FOREIGN KEY (booking_id) REFERENCES bookings (uid) NOT VALID
+    """)
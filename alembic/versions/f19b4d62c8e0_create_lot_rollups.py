@@ -0,0 +1,129 @@
+"""create dashboard rollup tables and dirty-day triggers
+
+Revision ID: f19b4d62c8e0
+Revises: e7a3c9150b28
+Create Date: 2026-10-21 16:40:52.338104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19b4d62c8e0'
+down_revision: Union[str, Sequence[str], None] = 'e7a3c9150b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Statement-level: one INSERT ... ON CONFLICT DO NOTHING per write
+# statement, covering every UTC day the changed bookings touch.
+BOOKING_FUNCTION = """
+CREATE OR REPLACE FUNCTION mark_booking_rollups_dirty() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO rollup_dirty_days (parking_lot_id, day)
+    SELECT DISTINCT s.parking_lot_id, d::date
+    FROM changed_rows c
+    JOIN parking_slots s ON s.uid = c.slot_id
+    CROSS JOIN LATERAL generate_series(
+        (c.start_time AT TIME ZONE 'UTC')::date,
+        (c.end_time AT TIME ZONE 'UTC')::date,
+        interval '1 day'
+    ) AS d
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PAYMENT_FUNCTION = """
+CREATE OR REPLACE FUNCTION mark_payment_rollups_dirty() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO rollup_dirty_days (parking_lot_id, day)
+    SELECT DISTINCT s.parking_lot_id, (b.start_time AT TIME ZONE 'UTC')::date
+    FROM changed_rows c
+    JOIN bookings b ON b.uid = c.booking_id
+    JOIN parking_slots s ON s.uid = b.slot_id
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+EVENTS = (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "lot_revenue_daily",
+        sa.Column("parking_lot_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("currency", sqlmodel.sql.sqltypes.AutoString(length=10), nullable=False),
+        sa.Column("paid_amount", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("paid_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("refunded_amount", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("refunded_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("parking_lot_id", "day", "currency"),
+    )
+    op.create_table(
+        "lot_occupancy_hourly",
+        sa.Column("parking_lot_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("hour", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("occupied_seconds", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("booking_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("slot_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("parking_lot_id", "hour"),
+    )
+    op.create_table(
+        "rollup_dirty_days",
+        sa.Column("parking_lot_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint("parking_lot_id", "day"),
+    )
+
+    op.execute(BOOKING_FUNCTION)
+    op.execute(PAYMENT_FUNCTION)
+    for table, function in (
+        ("bookings", "mark_booking_rollups_dirty"),
+        ("payments", "mark_payment_rollups_dirty"),
+    ):
+        for event, transition in EVENTS:
+            op.execute(f"""
+                CREATE TRIGGER {table}_rollups_{event.lower()}
+                AFTER {event} ON {table}
+                REFERENCING {transition} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+            """)
+
+    # backfill: every day that has bookings gets rolled up by the first run
+    op.execute("""
+        INSERT INTO rollup_dirty_days (parking_lot_id, day)
+        SELECT DISTINCT s.parking_lot_id, d::date
+        FROM bookings b
+        JOIN parking_slots s ON s.uid = b.slot_id
+        CROSS JOIN LATERAL generate_series(
+            (b.start_time AT TIME ZONE 'UTC')::date,
+            (b.end_time AT TIME ZONE 'UTC')::date,
+            interval '1 day'
+        ) AS d
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("bookings", "payments"):
+        for event, _ in EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_rollups_{event.lower()} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS mark_payment_rollups_dirty()")
+    op.execute("DROP FUNCTION IF EXISTS mark_booking_rollups_dirty()")
+
+    op.drop_table("rollup_dirty_days")
+    op.drop_table("lot_occupancy_hourly")
+    op.drop_table("lot_revenue_daily")
@@ -0,0 +1,59 @@
+"""
+Best-fit slot assignment: pick latency and packing against first fit.
+
+    python -m benchmarks.bench_assignment [--slots 200] [--requests 3500] [--days 3]
+
+Replays synthetic "any slot in this lot" requests (stays of 30 min to
+10 h, starting anywhere in --days, in random arrival order) through a
+LotTimeline twice: once with the best-fit `reserve`, once taking the
+first free slot in slot order, which is what clients guessing from the
+slot list amount to. Reports pick latency and how many requests each
+could place.
+"""
+import argparse
+import random
+import time
+import uuid
+
+from src.services.assignment_services import LotTimeline
+
+
+def first_fit(timeline: LotTimeline, start: float, end: float):
+    for slot in timeline.slots:
+        starts, ends = timeline.starts[slot], timeline.ends[slot]
+        if all(e <= start or s >= end for s, e in zip(starts, ends)):
+            timeline.add(slot, start, end)
+            return slot
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--slots", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=3500)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--horizon-hours", type=float, default=12)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    slots = [uuid.uuid4() for _ in range(args.slots)]
+    span = args.days * 86400
+    requests = []
+    for _ in range(args.requests):
+        start = rng.randrange(0, span, 900)
+        requests.append((start, start + rng.randrange(1800, 36000, 900)))
+
+    horizon = args.horizon_hours * 3600
+    for name, pick in (("best fit", LotTimeline.reserve), ("first fit", first_fit)):
+        timeline = LotTimeline(-horizon, span + 36000 + horizon, slots, horizon)
+        started = time.perf_counter()
+        placed = sum(pick(timeline, start, end) is not None for start, end in requests)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:>9}: placed {placed}/{len(requests)} "
+            f"({placed / len(requests):.1%}), {elapsed / len(requests) * 1e6:.0f}us per pick"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Occupancy forecast compute: per-booking Python loop vs vectorized NumPy.
+
+    python -m benchmarks.bench_forecast [--lots 10000] [--weeks 104] [--per-day 2]
+
+Generates synthetic booking intervals (random starts, 30 min to 8 h
+long) for every lot and runs the same pipeline as
+OccupancyForecaster.compute_chunk: hourly expansion, weekly folding and
+recency-weighted averaging, one chunk of lots at a time. The loop
+baseline only runs on the first chunk and is extrapolated.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.services.forecast_services import (
+    HOUR,
+    WEEK_HOURS,
+    encode_profiles,
+    expand_intervals,
+    seasonal_profiles,
+)
+
+
+def synthetic_chunk(rng, n_lots: int, hours: int, per_day: float):
+    counts = rng.poisson(per_day * hours / 24, n_lots)
+    lot_index = np.repeat(np.arange(n_lots), counts)
+    starts = rng.integers(0, hours * HOUR, counts.sum())
+    ends = np.minimum(starts + rng.integers(1800, 8 * HOUR, counts.sum()), hours * HOUR)
+    slot_counts = rng.integers(5, 200, n_lots)
+    first_weeks = np.where(rng.random(n_lots) < 0.1, rng.integers(0, hours // WEEK_HOURS, n_lots), 0)
+    return lot_index, starts, ends, slot_counts, first_weeks
+
+
+def loop_profiles(lot_index, starts, ends, slot_counts, first_weeks, n_lots, hours, half_life):
+    seconds = [[0.0] * hours for _ in range(n_lots)]
+    for lot, start, end in zip(lot_index.tolist(), starts.tolist(), ends.tolist()):
+        hour = start // HOUR
+        while hour * HOUR < end:
+            seconds[lot][hour] += min(end, (hour + 1) * HOUR) - max(start, hour * HOUR)
+            hour += 1
+
+    weeks = hours // WEEK_HOURS
+    profiles = []
+    for lot in range(n_lots):
+        capacity = max(int(slot_counts[lot]), 1) * HOUR
+        totals, weight_sum = [0.0] * WEEK_HOURS, 0.0
+        for week in range(int(first_weeks[lot]), weeks):
+            weight = 0.5 ** ((weeks - 1 - week) / half_life)
+            weight_sum += weight
+            for h in range(WEEK_HOURS):
+                totals[h] += weight * min(seconds[lot][week * WEEK_HOURS + h] / capacity, 1.0)
+        profiles.append([t / weight_sum if weight_sum else 0.0 for t in totals])
+    return profiles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lots", type=int, default=10000)
+    parser.add_argument("--weeks", type=int, default=104)
+    parser.add_argument("--per-day", type=float, default=2.0)
+    parser.add_argument("--chunk", type=int, default=256)
+    parser.add_argument("--half-life", type=float, default=8.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    hours = args.weeks * WEEK_HOURS
+    intervals = 0
+    vectorized = 0.0
+    loop = None
+
+    for offset in range(0, args.lots, args.chunk):
+        n = min(args.chunk, args.lots - offset)
+        lot_index, starts, ends, slot_counts, first_weeks = synthetic_chunk(rng, n, hours, args.per_day)
+        intervals += len(starts)
+
+        started = time.perf_counter()
+        seconds = expand_intervals(lot_index, starts, ends, n, hours)
+        profiles = seasonal_profiles(seconds, slot_counts, first_weeks, args.half_life)
+        encode_profiles(profiles)
+        vectorized += time.perf_counter() - started
+
+        if loop is None:
+            started = time.perf_counter()
+            expected = loop_profiles(
+                lot_index, starts, ends, slot_counts, first_weeks, n, hours, args.half_life
+            )
+            loop = (time.perf_counter() - started) * args.lots / n
+            assert np.allclose(profiles, expected), "vectorized result differs from loop"
+
+    print(f"{args.lots} lots x {args.weeks} weeks, {intervals} bookings")
+    print(f"{'loop (extrapolated) s':<26}{loop:>10.1f}")
+    print(f"{'vectorized s':<26}{vectorized:>10.1f}")
+    print(f"{'speedup':<26}{loop / vectorized:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
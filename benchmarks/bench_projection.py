@@ -0,0 +1,91 @@
+"""
+ORM entities vs Core projection records for list reads.
+
+    python -m benchmarks.bench_projection [--sizes 10000 100000]
+
+Loads N bookings from an in-memory SQLite table either as full `Booking`
+ORM instances (session.execute(select(Booking)).scalars()) or as
+`booking_rows` __slots__ records, then serializes them with the same
+ListSerializer the endpoints use. Reports CPU time and peak traced
+memory for the load alone and for load + serialize.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from src.core.responses import ListSerializer
+from src.db.accessor.schemas.booking import BookingResponse
+from src.db.models.booking import Booking, BookingStatus
+from src.db.projections import booking_rows
+
+booking_list = ListSerializer(BookingResponse)
+
+
+def seed(engine, n: int) -> None:
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "uid": uuid.uuid4(),
+            "user_id": uuid.uuid4(),
+            "slot_id": uuid.uuid4(),
+            "start_time": now + timedelta(minutes=i),
+            "end_time": now + timedelta(minutes=i + 60),
+            "status": BookingStatus.BOOKED,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(n)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Booking.__table__), rows)
+
+
+def load_orm(engine):
+    with Session(engine) as session:
+        return session.execute(select(Booking)).scalars().all()
+
+
+def load_projection(engine):
+    with engine.connect() as conn:
+        return booking_rows.map_rows(conn.execute(booking_rows.select()).tuples())
+
+
+def measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    started = time.process_time()
+    result = fn()
+    cpu = time.process_time() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, cpu, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'path':<12}{'rows':>8}{'load cpu s':>12}{'load MiB':>10}{'+json cpu s':>13}{'+json MiB':>11}")
+    for size in args.sizes:
+        engine = create_engine("sqlite://")
+        Booking.__table__.create(engine)
+        seed(engine, size)
+
+        for name, load in (("orm", load_orm), ("projection", load_projection)):
+            _, load_cpu, load_mib = measure(lambda: load(engine))
+            body, full_cpu, full_mib = measure(lambda: booking_list.dump_json(load(engine)))
+            assert body.count(b'"uid"') == size
+            print(f"{name:<12}{size:>8}{load_cpu:>12.3f}{load_mib:>10.1f}{full_cpu:>13.3f}{full_mib:>11.1f}")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
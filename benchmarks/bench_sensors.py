@@ -0,0 +1,67 @@
+"""
+Sensor ingestion throughput: coalescing plus flush statements.
+
+    python -m benchmarks.bench_sensors [--readings 500000] [--slots 20000] [--batch 5000]
+
+Feeds synthetic readings (each slot reports every few seconds, mostly
+unchanged) through SensorIngestService.submit in request-sized batches,
+then builds the array parameters of the bulk UPDATE chunks one flush
+would send (the statement itself is compiled once per process). No
+database is needed; the point is the per-node CPU cost in front of
+Postgres.
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from src.services.sensor_services import SENSOR_UPDATE, SensorIngestService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readings", type=int, default=500000)
+    parser.add_argument("--slots", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    slots = [uuid.uuid4() for _ in range(args.slots)]
+    origin = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    readings = [
+        (rng.choice(slots), rng.random() < 0.6, origin + timedelta(milliseconds=i))
+        for i in range(args.readings)
+    ]
+    batches = [readings[i:i + args.batch] for i in range(0, len(readings), args.batch)]
+
+    service = SensorIngestService(flush_size=len(slots) + 1)
+    started = time.perf_counter()
+    coalesced = sum(service.submit(batch) for batch in batches)
+    submit_seconds = time.perf_counter() - started
+
+    pending = service._pending
+    dialect = postgresql.asyncpg.dialect()
+    started = time.perf_counter()
+    SENSOR_UPDATE.compile(dialect=dialect)
+    compile_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rows = service._sorted_rows(pending)
+    chunks = [
+        service._chunk_params(rows[i:i + service.chunk], moving=[])
+        for i in range(0, len(rows), service.chunk)
+    ]
+    flush_seconds = time.perf_counter() - started
+
+    print(f"readings:  {args.readings} in {len(batches)} requests of {args.batch}")
+    print(f"submit:    {submit_seconds:.3f}s ({args.readings / submit_seconds:,.0f} readings/s)")
+    print(f"coalesced: {coalesced} ({coalesced / args.readings:.1%}); pending slots {len(pending)}")
+    print(f"compile:   {compile_seconds * 1000:.1f}ms (once)")
+    print(f"flush:     {len(chunks)} chunks of parameters in {flush_seconds * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
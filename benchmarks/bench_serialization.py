@@ -0,0 +1,111 @@
+"""
+Per-item cost of serializing list responses.
+
+    python -m benchmarks.bench_serialization [--sizes 100 1000 10000]
+
+"before" is FastAPI's own path for a `response_model=list[...]` route
+(validate into the model, dump to Python, stdlib JSONResponse).
+"after" is ListSerializer: one precompiled TypeAdapter straight to JSON
+bytes. Inputs are detached ORM instances, as the endpoints return.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.core.responses import FastJSONResponse, ListSerializer, orjson
+from src.db.accessor.schemas.booking import BookingResponse
+from src.db.accessor.schemas.parkinglot import ParkingLotResponse
+from src.db.models.booking import Booking, BookingStatus
+from src.db.models.parkinglot import ParkingLot
+
+
+def make_bookings(n: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        Booking(
+            uid=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            slot_id=uuid.uuid4(),
+            start_time=now + timedelta(hours=i),
+            end_time=now + timedelta(hours=i + 1),
+            status=BookingStatus.BOOKED,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def make_lots(n: int) -> list:
+    return [
+        ParkingLot(
+            uid=uuid.uuid4(),
+            name=f"Lot {i}",
+            address=f"{i} Main Street",
+            latitude=12.97 + i * 1e-4,
+            longitude=77.59 + i * 1e-4,
+            total_slots=100,
+            available_slots=42,
+            admin_id=uuid.uuid4(),
+        )
+        for i in range(n)
+    ]
+
+
+def per_item_us(fn, items: list, repeat: int) -> float:
+    fn(items)  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(items)
+        best = min(best, time.perf_counter() - started)
+    return best / len(items) * 1e6
+
+
+def fastapi_path(model, response_class):
+    field = create_model_field(name="Response", type_=list[model], mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def run(items):
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=items)
+        )
+        return response_class(content).body
+
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if orjson else 'no (stdlib fallback)'}")
+    print(f"{'model':<20}{'items':>8}{'before us':>12}{'orjson us':>12}{'adapter us':>12}{'speedup':>9}")
+
+    for model, factory in ((BookingResponse, make_bookings), (ParkingLotResponse, make_lots)):
+        before = fastapi_path(model, JSONResponse)
+        fast_class = fastapi_path(model, FastJSONResponse)
+        after = ListSerializer(model).dump_json
+
+        for size in args.sizes:
+            items = factory(size)
+            assert len(before(items)) and len(after(items))
+            t_before = per_item_us(before, items, args.repeat)
+            t_class = per_item_us(fast_class, items, args.repeat)
+            t_after = per_item_us(after, items, args.repeat)
+            print(
+                f"{model.__name__:<20}{size:>8}{t_before:>12.2f}{t_class:>12.2f}"
+                f"{t_after:>12.2f}{t_before / t_after:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Python-side cost of the hot-path statements, rebuilt vs lambda.
+
+    python -m benchmarks.bench_statements [--calls 20000] [--profile]
+
+Executes each statement against an in-memory SQLite database (so the
+driver cost is small and constant) either rebuilt with select() on every
+call, as before, or through src/db/statements.py. Reports per-call time
+and, with --profile, the cProfile share spent building constructs,
+generating cache keys and compiling.
+"""
+import argparse
+import cProfile
+import pstats
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from src.db import statements
+from src.db.models.booking import Booking
+from src.db.models.parkingslot import ParkingSlot
+from src.db.models.payment import Payment
+from src.db.models.user import User
+from src.services.booking_state_machine import BLOCKING_STATUSES
+
+SLOT_ID = uuid.uuid4()
+START = datetime.now(timezone.utc)
+END = START + timedelta(hours=2)
+
+
+def rebuilt():
+    return {
+        "user_by_email": lambda: select(User).where(User.email == "a@example.com"),
+        "slot_overlap": lambda: select(Booking.uid).where(
+            Booking.slot_id == SLOT_ID,
+            Booking.start_time < END,
+            Booking.end_time > START,
+            Booking.status.in_(list(BLOCKING_STATUSES)),
+        ).limit(1),
+        "payment_by_order_id": lambda: select(Payment).where(
+            Payment.razorpay_order_id == "order_123"
+        ),
+    }
+
+
+def cached():
+    return {
+        "user_by_email": lambda: statements.user_by_email("a@example.com"),
+        "slot_overlap": lambda: statements.slot_overlap(
+            SLOT_ID, START, END, BLOCKING_STATUSES
+        ),
+        "payment_by_order_id": lambda: statements.payment_by_order_id("order_123"),
+    }
+
+
+def run(session: Session, build, calls: int) -> float:
+    session.execute(build()).all()  # warm the compiled cache
+    started = time.perf_counter()
+    for _ in range(calls):
+        session.execute(build()).all()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    for model in (User, ParkingSlot, Booking, Payment):
+        model.__table__.create(engine)
+
+    print(f"{'statement':<22}{'rebuilt us':>12}{'lambda us':>12}{'saved':>8}")
+    with Session(engine) as session:
+        before, after = rebuilt(), cached()
+        for name in before:
+            t_before = run(session, before[name], args.calls)
+            t_after = run(session, after[name], args.calls)
+            print(f"{name:<22}{t_before:>12.1f}{t_after:>12.1f}{1 - t_after / t_before:>8.0%}")
+
+        if args.profile:
+            for label, builds in (("rebuilt", before), ("lambda", after)):
+                profiler = cProfile.Profile()
+                profiler.enable()
+                for build in builds.values():
+                    run(session, build, args.calls // 10)
+                profiler.disable()
+                print(f"\n--- {label}: cache key / compile / construct ---")
+                stats = pstats.Stats(profiler).sort_stats("cumulative")
+                stats.print_stats(r"_generate_cache_key|compile|where|in_op|selectable.py.*select")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,53 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from src.api.v1.routes.routes import router as router
+from src.core.config import Config
+from src.core.cache import catalog_cache, invalidate_catalog
+from src.core.responses import FastJSONResponse
+from src.db.database import replica_set, shard_map
+from src.db.notifications import shard_change_listeners
+from src.db.sharding import ShardMovingError
+from src.services.availability_services import availability_hub
+from src.services.catalog_snapshot import lot_directory
+from src.services.partition_services import partition_manager
+from src.services.payment_status_services import payment_status_broker
+from src.services.pricing_services import pricing_engine
+from src.services.sensor_services import sensor_ingest_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # cross-process cache invalidation (Postgres LISTEN/NOTIFY), every shard
+    listeners = shard_change_listeners(shard_map)
+    for listener in listeners:
+        listener.subscribe(invalidate_catalog, on_reset=catalog_cache.flush_local)
+        listener.subscribe(lot_directory.on_change, on_reset=lot_directory.invalidate)
+        listener.subscribe(pricing_engine.on_change, on_reset=pricing_engine.flush_local)
+        listener.start()
+    replica_set.start()
+    partition_manager.start()
+    payment_status_broker.start()
+    sensor_ingest_service.start()
+    yield
+    await sensor_ingest_service.stop()
+    await payment_status_broker.stop()
+    await availability_hub.stop()
+    await partition_manager.stop()
+    await replica_set.stop()
+    for listener in listeners:
+        await listener.stop()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+app.include_router(router)
+
 
-app = FastAPI()
-app.include_router(router)
\ No newline at end of file
+@app.exception_handler(ShardMovingError)
+async def shard_moving_handler(request: Request, exc: ShardMovingError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(Config.SHARD_MOVE_DRAIN_SECONDS))},
+    )
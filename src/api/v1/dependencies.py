@@ -5,7 +5,8 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.services.auth_services import AuthService
 from src.services.user_services import UserService
-from src.db.database import get_session
+from src.db.database import get_session, release
+from src.db.routing import bind_user
 from src.core.redis import redis_client
 from src.utils.auth import decode_token
 from src.db.accessor.schemas.user import UserResponse
@@ -81,11 +82,14 @@ async def get_current_user(
     user_email = token_details["user"]["email"]
     user_service = UserService()
     user = await user_service.get_user_by_email(user_email, session)
+    # don't hold the connection while the handler does non-DB work
+    await release(session)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    await bind_user(session, user.uid)
     return user
 
 
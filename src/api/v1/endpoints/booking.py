@@ -1,17 +1,29 @@
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
-from src.db.database import get_session
+from src.db.database import get_session, shard_map
 from src.api.v1.dependencies import get_current_user
 from src.db.models.user import User
-from src.services.booking_services import booking_service
-from src.db.accessor.schemas.booking import BookingCreate, BookingResponse
+from src.services.booking_services import BookingConflictError, booking_service
+from src.db.accessor.schemas.booking import (
+    BookingCreate,
+    BookingResponse,
+    BookingSeriesCreate,
+    BookingSeriesResult,
+    BookingBulkTransition,
+    BookingBulkTransitionResult,
+)
 from src.db.models.booking import Booking, BookingStatus
+from src.services.booking_state_machine import booking_state_machine
+from src.core.responses import ListSerializer
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
+booking_list = ListSerializer(BookingResponse)
+
 
 # =========================
 # Admin Helper
@@ -24,6 +36,32 @@ def ensure_admin(user: User):
         )
 
 
+# =========================
+# Keyset Page Params
+# =========================
+class BookingPage:
+    """
+    ?limit=&after_start_time=&after_id= (last row of the previous page);
+    ?upcoming=true skips bookings that are already over.
+    """
+
+    def __init__(
+        self,
+        limit: int | None = Query(None, ge=1, le=500),
+        after_start_time: datetime | None = None,
+        after_id: UUID | None = None,
+        upcoming: bool = False,
+    ):
+        if (after_start_time is None) != (after_id is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="after_start_time and after_id go together",
+            )
+        self.limit = limit
+        self.after = (after_start_time, after_id) if after_id is not None else None
+        self.upcoming = upcoming
+
+
 # =========================
 # Create Booking (USER)
 # =========================
@@ -53,18 +91,59 @@ async def create_booking(
         )
 
 
+# =========================
+# Create Recurring Bookings (USER)
+# =========================
+@router.post(
+    "/series",
+    response_model=BookingSeriesResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_booking_series(
+    spec: BookingSeriesCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Books every occurrence of a weekly pattern on one slot, all at once
+    (PAYMENT_PENDING). Conflicts are listed per occurrence: 409 with
+    nothing booked, or alongside the bookings with skip_conflicts.
+    """
+    try:
+        return await booking_service.create_series(
+            spec=spec,
+            user_id=current_user.uid,
+            session=session,
+        )
+    except BookingConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(e), "conflicts": jsonable_encoder(e.conflicts)},
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
 # =========================
 # Get My Bookings (USER)
 # =========================
 @router.get("/my", response_model=list[BookingResponse])
 async def get_my_bookings(
+    page: BookingPage = Depends(),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    return await booking_service.get_user_bookings(
+    bookings = await booking_service.get_user_bookings(
         user_id=current_user.uid,
         session=session,
+        limit=page.limit,
+        after=page.after,
+        upcoming=page.upcoming,
     )
+    return booking_list.response(bookings)
 
 
 # =========================
@@ -152,17 +231,20 @@ async def cancel_booking(
 )
 async def get_all_bookings(
     status: BookingStatus | None = None,
+    page: BookingPage = Depends(),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     ensure_admin(current_user)
 
-    stmt = select(Booking)
-    if status:
-        stmt = stmt.where(Booking.status == status)
-
-    result = await session.execute(stmt)
-    return result.scalars().all()
+    bookings = await booking_service.get_all_bookings(
+        session,
+        status=status,
+        limit=page.limit,
+        after=page.after,
+        upcoming=page.upcoming,
+    )
+    return booking_list.response(bookings)
 
 
 # =========================
@@ -179,10 +261,11 @@ async def get_slot_bookings(
 ):
     ensure_admin(current_user)
 
-    return await booking_service.get_slot_bookings(
+    bookings = await booking_service.get_slot_bookings(
         slot_id=slot_id,
         session=session,
     )
+    return booking_list.response(bookings)
 
 
 # =========================
@@ -199,10 +282,11 @@ async def complete_booking(
 ):
     """
     Only ADMIN
-    Only CONFIRMED → COMPLETED
+    Only BOOKED / CONFIRMED → COMPLETED
     """
     ensure_admin(current_user)
 
+    await shard_map.pin_owner(session, Booking, booking_id, write=True)
     booking = await session.get(Booking, booking_id)
     if not booking:
         raise HTTPException(
@@ -210,14 +294,53 @@ async def complete_booking(
             detail="Booking not found",
         )
 
-    if booking.status != BookingStatus.BOOKED:
+    if not booking_state_machine.can_transition(booking.status, BookingStatus.COMPLETED):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only booked bookings can be completed",
         )
 
-    booking.status = BookingStatus.COMPLETED
+    booking_state_machine.transition(
+        session,
+        booking,
+        BookingStatus.COMPLETED,
+        actor_id=current_user.uid,
+        reason="admin_complete",
+    )
     await session.commit()
     await session.refresh(booking)
 
-    return booking
\ No newline at end of file
+    return booking
+
+
+# =========================
+# Bulk Status Change (ADMIN)
+# =========================
+@router.post(
+    "/bulk-status",
+    response_model=BookingBulkTransitionResult,
+)
+async def bulk_change_status(
+    payload: BookingBulkTransition,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    One UPDATE for the whole list. Bookings whose current status
+    cannot move to the requested one, or whose lot is being moved
+    between shards, are returned as skipped.
+    """
+    ensure_admin(current_user)
+
+    rows = await booking_service.bulk_transition(
+        payload.booking_ids,
+        payload.status,
+        actor_id=current_user.uid,
+        session=session,
+    )
+
+    updated = {row.uid for row in rows}
+    return {
+        "updated": list(updated),
+        "skipped": [uid for uid in payload.booking_ids if uid not in updated],
+    }
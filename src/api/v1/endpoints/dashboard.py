@@ -0,0 +1,58 @@
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import AwareDatetime
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.v1.dependencies import get_current_user
+from src.db.accessor.schemas.dashboard import OccupancyHour, RevenueDay
+from src.db.database import get_session
+from src.db.models.user import User
+from src.services.rollup_services import rollup_service
+
+router = APIRouter(prefix="/lots/{parking_lot_id}/dashboard", tags=["Dashboards"])
+
+
+def ensure_admin(user: User):
+    if user.role != "ADMIN":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+
+
+# ===================== REVENUE PER DAY (ADMIN ONLY) =====================
+@router.get("/revenue", response_model=list[RevenueDay])
+async def get_lot_revenue(
+    parking_lot_id: UUID,
+    start: date,
+    end: date,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Days are UTC, inclusive on both ends; read from the daily rollup."""
+    ensure_admin(current_user)
+
+    try:
+        return await rollup_service.get_revenue(parking_lot_id, start, end, session)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ===================== OCCUPANCY PER HOUR (ADMIN ONLY) =====================
+@router.get("/occupancy", response_model=list[OccupancyHour])
+async def get_lot_occupancy(
+    parking_lot_id: UUID,
+    start: AwareDatetime,
+    end: AwareDatetime,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Hourly series over [start, end), read from the hourly rollup."""
+    ensure_admin(current_user)
+
+    try:
+        return await rollup_service.get_occupancy(parking_lot_id, start, end, session)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
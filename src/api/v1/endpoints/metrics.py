@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.core.metrics import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+# ===================== PROMETHEUS SCRAPE =====================
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    return metrics.render()
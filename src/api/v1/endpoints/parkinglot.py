@@ -1,18 +1,35 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
 
-from src.db.database import get_session
-from src.services.parking_services import parking_service
+from src.db.database import get_session, release
+from src.services.parking_services import parking_service, parking_lot_list
+from src.services.catalog_snapshot import lot_directory
 from src.services.slots_services import parking_slot_service
+from src.services.refund_services import lot_closure_refund_service
+from src.services.forecast_services import MAX_FORECAST_HOURS, forecast_service
+from src.services.availability_services import availability_service
 from src.db.accessor.schemas.parkinglot import (
     ParkingLotCreate,
     ParkingLotResponse,
+    ForecastHour,
 )
+from src.db.accessor.schemas.refund_job import LotClosureCreate, RefundJobResponse
 
 from src.api.v1.dependencies import get_current_user
+from src.core.http_cache import (
+    VARY_ENCODING,
+    encoding_etag,
+    make_etag,
+    not_modified,
+    precompressed_response,
+    versioned_response,
+)
 from src.db.models.user import User
+from src.db.models.parkinglot import ParkingLot
 
 router = APIRouter(prefix="/lots", tags=["ParkingLots"])
 
@@ -37,14 +54,30 @@ async def create_parking_lot(
         admin_id=current_user.uid,
         session=session
     )
+    lot_directory.invalidate()  # other workers hear it via NOTIFY
     return parking_lot
 
 @router.get("", response_model=list[ParkingLotResponse])
 async def get_all_parking_lots(
+    request: Request,
     session: AsyncSession = Depends(get_session),
     current_user:User =Depends(get_current_user)
 ):
-    return await parking_service.get_all_parking_lots(session)
+    # served from the worker's prebuilt snapshot; no catalog query
+    snapshot = await lot_directory.get(session)
+
+    cached = not_modified(
+        request,
+        encoding_etag(request, snapshot.etag),
+        route="lots",
+        vary=VARY_ENCODING,
+    )
+    if cached:
+        return cached
+
+    return precompressed_response(
+        request, snapshot.body, snapshot.gzip_body, snapshot.etag
+    )
 
 
 @router.get("/search", response_model=list[ParkingLotResponse])
@@ -54,19 +87,31 @@ async def search_parking_lots(
         current_user:User=Depends(get_current_user)
     ):
         q = q.strip()
-        return await parking_service.search_parking_lots(q, session)
+        lots = await parking_service.search_parking_lots(q, session)
+        return parking_lot_list.response(lots)
 
 
 @router.get("/{parking_lot_id}/slots")
 async def get_parking_lot_slots(
         parking_lot_id: UUID,
+        request: Request,
         session: AsyncSession = Depends(get_session),
         current_user:User=Depends(get_current_user)
     ):
-        return await parking_slot_service.get_slots_by_parking_lot(
+        scope = f"lot:{parking_lot_id}"
+        version = await parking_service.get_catalog_version(scope, session)
+        etag = make_etag(scope, version)
+
+        cached = not_modified(request, etag, route="lot_slots")
+        if cached:
+            return cached
+
+        slots = await parking_slot_service.get_slots_by_parking_lot(
             parking_lot_id,
-            session
+            session,
+            version=version
         )
+        return versioned_response(slots, etag)
 @router.get("/{parking_lot_id}/available-slots")
 async def get_available_slots(
         parking_lot_id: UUID,
@@ -81,3 +126,138 @@ async def get_available_slots(
             end_time,
             session
         )
+
+
+# ===================== LIVE AVAILABILITY (SSE) =====================
+@router.get("/{parking_lot_id}/availability/stream")
+async def stream_availability(
+        parking_lot_id: UUID,
+        session: AsyncSession = Depends(get_session),
+        current_user: User = Depends(get_current_user)
+    ):
+        """
+        Server-Sent Events instead of polling the slot endpoints: a
+        `snapshot` of slot -> free now, then `delta` events with only the
+        slots that changed (and a fresh `snapshot` now and then).
+        """
+        hub = availability_service.hub
+        subscriber = await hub.subscribe(parking_lot_id)
+        if subscriber is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many live subscriptions; poll instead",
+                headers={"Retry-After": "30"},
+            )
+
+        try:
+            # subscribed first, so nothing published after the snapshot is missed
+            snapshot = await availability_service.get_snapshot(parking_lot_id, session)
+            if not snapshot and not await session.get(ParkingLot, parking_lot_id):
+                raise HTTPException(status_code=404, detail="Parking lot not found")
+        except BaseException:
+            await hub.unsubscribe(subscriber)
+            raise
+        # the stream can stay open for hours; don't keep a connection
+        await release(session)
+
+        return StreamingResponse(
+            availability_service.stream(parking_lot_id, subscriber, snapshot),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            background=BackgroundTask(hub.unsubscribe, subscriber),
+        )
+
+
+# ===================== OCCUPANCY FORECAST =====================
+@router.get("/{parking_lot_id}/forecast", response_model=list[ForecastHour])
+async def get_occupancy_forecast(
+        parking_lot_id: UUID,
+        start: datetime | None = None,
+        hours: int = Query(24, ge=1, le=MAX_FORECAST_HOURS),
+        session: AsyncSession = Depends(get_session),
+        current_user: User = Depends(get_current_user)
+    ):
+        """Predicted occupancy per hour from the lot's weekly profile."""
+        forecast = await forecast_service.predict(
+            parking_lot_id,
+            start or datetime.now(timezone.utc),
+            hours,
+            session
+        )
+        if forecast is None:
+            raise HTTPException(status_code=404, detail="No forecast for this lot yet")
+        return forecast
+
+
+# ===================== LOT CLOSURE REFUNDS (ADMIN ONLY) =====================
+@router.post(
+    "/{parking_lot_id}/closures",
+    response_model=RefundJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def close_parking_lot(
+        parking_lot_id: UUID,
+        data: LotClosureCreate,
+        session: AsyncSession = Depends(get_session),
+        current_user: User = Depends(get_current_user)
+    ):
+        """
+        Cancels and refunds every active booking in the window.
+        Runs in the background; poll GET /lots/closures/{job_id}.
+        """
+        if current_user.role != "ADMIN":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only admins can close parking lots"
+            )
+
+        try:
+            return await lot_closure_refund_service.create_job(
+                parking_lot_id=parking_lot_id,
+                window_start=data.window_start,
+                window_end=data.window_end,
+                admin_id=current_user.uid,
+                session=session
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/closures/{job_id}", response_model=RefundJobResponse)
+async def get_closure_progress(
+        job_id: UUID,
+        session: AsyncSession = Depends(get_session),
+        current_user: User = Depends(get_current_user)
+    ):
+        if current_user.role != "ADMIN":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Admin access required"
+            )
+
+        job = await lot_closure_refund_service.get_job(job_id, session)
+        if not job:
+            raise HTTPException(status_code=404, detail="Refund job not found")
+        return job
+
+
+@router.post("/closures/{job_id}/resume", response_model=RefundJobResponse)
+async def resume_closure(
+        job_id: UUID,
+        session: AsyncSession = Depends(get_session),
+        current_user: User = Depends(get_current_user)
+    ):
+        if current_user.role != "ADMIN":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Admin access required"
+            )
+
+        try:
+            job = await lot_closure_refund_service.resume_job(job_id, session)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if not job:
+            raise HTTPException(status_code=404, detail="Refund job not found")
+        return job
@@ -1,14 +1,21 @@
+import hmac
 from uuid import UUID
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.core.config import Config
 from src.db.database import get_session
 from src.api.v1.dependencies import get_current_user
+from src.core.http_cache import make_etag, not_modified, versioned_response
 from src.db.models.user import User
+from src.services.parking_services import parking_service
+from src.services.sensor_services import sensor_ingest_service
 from src.services.slots_services import parking_slot_service
 from src.db.accessor.schemas.parkingslot import (
+    SensorBatch,
+    SensorBatchResponse,
     SlotCreate,
     SlotUpdate,
     SlotResponse,
@@ -20,6 +27,32 @@ router = APIRouter(
 )
 
 
+# ===================== SENSOR READINGS (SENSOR GATEWAYS) =====================
+# declared before "/{parking_lot_id}" so that route does not capture the path
+@router.post(
+    "/sensor-readings",
+    response_model=SensorBatchResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def ingest_sensor_readings(
+    payload: SensorBatch,
+    sensor_token: str | None = Header(None, alias="X-Sensor-Token"),
+):
+    """Buffered and applied within SENSOR_FLUSH_SECONDS; only real changes are written."""
+    if not Config.SENSOR_INGEST_TOKEN:
+        raise HTTPException(status_code=503, detail="Sensor ingestion is disabled")
+    if not sensor_token or not hmac.compare_digest(sensor_token, Config.SENSOR_INGEST_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid sensor token")
+
+    try:
+        coalesced = sensor_ingest_service.submit(
+            [(r.slot_id, r.is_available, r.observed_at) for r in payload.readings]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"accepted": len(payload.readings) - coalesced, "coalesced": coalesced}
+
+
 # ===================== CREATE SLOT (ADMIN ONLY) =====================
 @router.post(
     "/{parking_lot_id}",
@@ -52,13 +85,25 @@ async def create_parking_slot(
 )
 async def get_slots_by_parking_lot(
     parking_lot_id: UUID,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)  # user or admin
 ):
-    return await parking_slot_service.get_slots_by_parking_lot(
+    # same representation (and ETag) as GET /lots/{id}/slots
+    scope = f"lot:{parking_lot_id}"
+    version = await parking_service.get_catalog_version(scope, session)
+    etag = make_etag(scope, version)
+
+    cached = not_modified(request, etag, route="slots_by_lot")
+    if cached:
+        return cached
+
+    slots = await parking_slot_service.get_slots_by_parking_lot(
         parking_lot_id=parking_lot_id,
-        session=session
+        session=session,
+        version=version
     )
+    return versioned_response(slots, etag)
 
 
 # ===================== UPDATE SLOT (ADMIN ONLY) =====================
@@ -1,17 +1,19 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from src.api.v1.dependencies import get_current_user
-from src.db.database import get_session
+from src.core.config import Config
+from src.db.database import get_session, release, shard_map
 
 from src.db.models.user import User
 from src.db.models.booking import Booking, BookingStatus
 from src.db.models.payment import Payment, PaymentStatus
 
 from src.services.payment_services import payment_service
+from src.services.payment_status_services import payment_status_broker, payment_waits
 from src.db.accessor.schemas.payment import (
     PaymentCreate,
     RazorpayOrderResponse,
@@ -36,7 +38,8 @@ async def create_payment_order(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    # 1️⃣ Fetch booking
+    # 1️⃣ Fetch booking (on its lot's shard)
+    await shard_map.pin_owner(session, Booking, payload.booking_id, write=True)
     booking = await session.get(Booking, payload.booking_id)
     if not booking:
         raise HTTPException(
@@ -71,12 +74,11 @@ async def create_payment_order(
             detail="Payment already completed for this booking",
         )
 
-    # 5️⃣ Create Razorpay order
+    # 5️⃣ Price the booking and create the Razorpay order
     payment = await payment_service.create_payment_order(
         booking_id=payload.booking_id,
-        amount=payload.amount,
-        currency=payload.currency,
         session=session,
+        expected_amount=payload.amount,
     )
 
     return {
@@ -99,10 +101,7 @@ async def get_payment_by_booking(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    result = await session.execute(
-        select(Payment).where(Payment.booking_id == booking_id)
-    )
-    payment = result.scalars().first()
+    payment = await payment_service.get_payment_by_booking(booking_id, session)
 
     if not payment:
         raise HTTPException(
@@ -120,6 +119,56 @@ async def get_payment_by_booking(
     return payment
 
 
+# =====================================================
+# WAIT FOR PAYMENT STATUS CHANGE (long-poll)
+# =====================================================
+@router.get(
+    "/booking/{booking_id}/wait",
+    response_model=PaymentResponse,
+)
+async def wait_for_payment_status(
+    booking_id: UUID,
+    current_status: PaymentStatus = Query(..., alias="status"),
+    timeout: float = Query(
+        Config.PAYMENT_WAIT_DEFAULT_SECONDS, gt=0, le=Config.PAYMENT_WAIT_MAX_SECONDS
+    ),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Answers as soon as the booking's payment is no longer in `status`
+    (the one the client already shows), or with the unchanged payment
+    after `timeout` seconds. Replaces polling GET /booking/{booking_id}.
+    """
+    # park first: a change committed after this point will wake us
+    future = payment_status_broker.park(booking_id)
+    try:
+        row = await payment_service.get_payment_with_owner(booking_id, session)
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Payment not found for this booking",
+            )
+
+        payment, user_id = row
+        if user_id != current_user.uid:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not allowed",
+            )
+
+        if payment.status != current_status:
+            payment_waits.inc(outcome="changed")
+            return payment
+
+        # nothing else to read; don't hold a connection while parked
+        await release(session)
+        changed = await payment_status_broker.wait(future, timeout)
+        return changed if changed is not None else payment
+    finally:
+        payment_status_broker.unpark(booking_id, future)
+
+
 # =====================================================
 # GET PAYMENT BY PAYMENT ID
 # =====================================================
@@ -132,7 +181,7 @@ async def get_payment_by_id(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    payment = await session.get(Payment, payment_id)
+    payment = await payment_service.get_payment(payment_id, session)
 
     if not payment:
         raise HTTPException(
@@ -0,0 +1,65 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.v1.dependencies import get_current_user
+from src.db.accessor.schemas.pricing import (
+    QuoteRequest,
+    QuoteResponse,
+    RateCardResponse,
+    RateCardUpdate,
+)
+from src.db.database import get_session
+from src.db.models.user import User
+from src.services.pricing_services import PricingError, pricing_engine
+
+router = APIRouter(tags=["Pricing"])
+
+
+# ===================== BATCHED QUOTES =====================
+@router.post("/quotes", response_model=list[QuoteResponse])
+async def get_quotes(
+    payload: QuoteRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Prices many (slot, window) pairs at once, in request order."""
+    try:
+        return await pricing_engine.quote_many(
+            [(item.slot_id, item.start_time, item.end_time) for item in payload.items],
+            session,
+        )
+    except PricingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ===================== RATE CARDS =====================
+@router.get("/lots/{parking_lot_id}/rate-card", response_model=RateCardResponse)
+async def get_rate_card(
+    parking_lot_id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    card = await pricing_engine.get_rate_card(parking_lot_id, session)
+    if not card:
+        raise HTTPException(status_code=404, detail="Rate card not found")
+    return card
+
+
+@router.put("/lots/{parking_lot_id}/rate-card", response_model=RateCardResponse)
+async def set_rate_card(
+    parking_lot_id: UUID,
+    payload: RateCardUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Creates or replaces the lot's rate card (admin of the lot only)."""
+    try:
+        return await pricing_engine.set_rate_card(
+            parking_lot_id, payload.model_dump(), session, current_user
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
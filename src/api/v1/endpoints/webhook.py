@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
 import json
 import hmac
 import hashlib
 
-from src.db.database import get_session
+from src.db.database import get_session, shard_map
+from src.db.statements import payment_by_order_id, payment_by_payment_id
 from src.db.models.payment import Payment, PaymentStatus
-from src.db.models.booking import Booking, BookingStatus
 from src.core.config import Config
+from src.services.webhook_services import webhook_event_guard, webhook_events
+from src.services.payment_services import payment_service
+from src.services.payment_status_services import payment_status_broker
 
 router = APIRouter(
     prefix="/webhooks",
@@ -43,8 +45,15 @@ async def razorpay_webhook(
 ):
     body = await request.body()
 
+    # 🔁 Replay / redelivery guard (before signature check and JSON parse)
+    event_id = request.headers.get("X-Razorpay-Event-Id")
+    if event_id and webhook_event_guard.is_duplicate(event_id):
+        webhook_events.inc(outcome="duplicate")
+        return {"status": "duplicate"}
+
     signature = request.headers.get("X-Razorpay-Signature")
     if not signature:
+        webhook_events.inc(outcome="rejected")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Missing Razorpay signature",
@@ -55,6 +64,7 @@ async def razorpay_webhook(
         signature=signature,
         secret=Config.RAZORPAY_WEBHOOK_SECRET,
     ):
+        webhook_events.inc(outcome="rejected")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid webhook signature",
@@ -63,15 +73,35 @@ async def razorpay_webhook(
     payload = json.loads(body)
     event = payload.get("event")
 
-    if event == "payment.captured":
-        await handle_payment_captured(payload, session)
+    try:
+        webhook_event_guard.check_timestamp(payload.get("created_at"))
+    except ValueError as e:
+        webhook_events.inc(outcome="stale")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    if event_id and not webhook_event_guard.claim(event_id):
+        webhook_events.inc(outcome="duplicate")
+        return {"status": "duplicate"}
+
+    try:
+        if event == "payment.captured":
+            await handle_payment_captured(payload, session)
 
-    elif event == "payment.failed":
-        await handle_payment_failed(payload, session)
+        elif event == "payment.failed":
+            await handle_payment_failed(payload, session)
 
-    elif event == "refund.processed":
-        await handle_refund_processed(payload, session)
+        elif event == "refund.processed":
+            await handle_refund_processed(payload, session)
+    except Exception:
+        # let Razorpay's retry go through the handlers again
+        if event_id:
+            webhook_event_guard.release(event_id)
+        raise
 
+    webhook_events.inc(outcome="processed")
     return {"status": "ok"}
 
 
@@ -83,70 +113,66 @@ async def handle_payment_captured(payload: dict, session: AsyncSession):
     razorpay_order_id = entity["order_id"]
     razorpay_payment_id = entity["id"]
 
-    result = await session.exec(
-        select(Payment).where(
-            Payment.razorpay_order_id == razorpay_order_id
-        )
+    await shard_map.pin_owner(
+        session, Payment, razorpay_order_id, column=Payment.razorpay_order_id, write=True
     )
-    payment = result.first()
+    result = await session.execute(payment_by_order_id(razorpay_order_id))
+    payment = result.scalars().first()
 
     # Idempotency guard
     if not payment or payment.status == PaymentStatus.paid:
         return
 
-    # Update payment
-    payment.status = PaymentStatus.paid
+    # Update payment and booking
     payment.razorpay_payment_id = razorpay_payment_id
-
-    # Update booking
-    booking = await session.get(Booking, payment.booking_id)
-    if booking and booking.status == BookingStatus.PAYMENT_PENDING:
-        booking.status = BookingStatus.BOOKED
+    await payment_service.apply_status(
+        session, payment, PaymentStatus.paid, reason="webhook:payment.captured"
+    )
 
     await session.commit()
+    # wake clients long-polling this booking's payment
+    await payment_status_broker.publish(payment)
 
 
 async def handle_payment_failed(payload: dict, session: AsyncSession):
     entity = payload["payload"]["payment"]["entity"]
     razorpay_order_id = entity["order_id"]
 
-    result = await session.exec(
-        select(Payment).where(
-            Payment.razorpay_order_id == razorpay_order_id
-        )
+    await shard_map.pin_owner(
+        session, Payment, razorpay_order_id, column=Payment.razorpay_order_id, write=True
     )
-    payment = result.first()
+    result = await session.execute(payment_by_order_id(razorpay_order_id))
+    payment = result.scalars().first()
 
     if not payment or payment.status == PaymentStatus.failed:
         return
 
-    payment.status = PaymentStatus.failed
-
-    booking = await session.get(Booking, payment.booking_id)
-    if booking and booking.status == BookingStatus.PAYMENT_PENDING:
-        booking.status = BookingStatus.PAYMENT_FAILED
+    await payment_service.apply_status(
+        session, payment, PaymentStatus.failed, reason="webhook:payment.failed"
+    )
 
     await session.commit()
+    # wake clients long-polling this booking's payment
+    await payment_status_broker.publish(payment)
 
 
 async def handle_refund_processed(payload: dict, session: AsyncSession):
     entity = payload["payload"]["refund"]["entity"]
     razorpay_payment_id = entity["payment_id"]
 
-    result = await session.exec(
-        select(Payment).where(
-            Payment.razorpay_payment_id == razorpay_payment_id
-        )
+    await shard_map.pin_owner(
+        session, Payment, razorpay_payment_id, column=Payment.razorpay_payment_id, write=True
     )
-    payment = result.first()
+    result = await session.execute(payment_by_payment_id(razorpay_payment_id))
+    payment = result.scalars().first()
 
     if not payment or payment.status == PaymentStatus.refunded:
         return
 
-    payment.status = PaymentStatus.refunded
-
-    booking = await session.get(Booking, payment.booking_id)
-    if booking:
-        booking.status = BookingStatus.CANCELLED
+    await payment_service.apply_status(
+        session, payment, PaymentStatus.refunded, reason="webhook:refund.processed"
+    )
 
-    await session.commit()
\ No newline at end of file
+    await session.commit()
+    # wake clients long-polling this booking's payment
+    await payment_status_broker.publish(payment)
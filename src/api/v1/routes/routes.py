@@ -5,6 +5,9 @@ from src.api.v1.endpoints.parkingslot import router as parkingslot_router
 from src.api.v1.endpoints.booking import router as booking_router
 from src.api.v1.endpoints.payment import router as payment_router
 from src.api.v1.endpoints.webhook import router as webhook_router
+from src.api.v1.endpoints.metrics import router as metrics_router
+from src.api.v1.endpoints.dashboard import router as dashboard_router
+from src.api.v1.endpoints.pricing import router as pricing_router
 
 
 
@@ -16,4 +19,7 @@ router.include_router(parkingslot_router)
 router.include_router(booking_router)
 router.include_router(webhook_router)
 router.include_router(payment_router)
-router.include_router(webhook_router)
\ No newline at end of file
+router.include_router(webhook_router)
+router.include_router(dashboard_router)
+router.include_router(pricing_router)
+router.include_router(metrics_router)
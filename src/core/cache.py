@@ -0,0 +1,262 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.core.redis import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+cache_requests = metrics.counter(
+    "cache_requests_total",
+    "Read-through cache lookups by cache, tier (local/redis) and result",
+)
+cache_fill_seconds = metrics.summary(
+    "cache_fill_seconds",
+    "Time spent loading a cold key from the database",
+)
+
+_MISSING = object()
+
+
+# ===================== IN-PROCESS LRU =====================
+class LRUCache:
+    """Bounded LRU with a per-entry TTL. Not thread-safe; one per event loop."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def pop_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._data if isinstance(k, str) and k.startswith(prefix)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ===================== SINGLE FLIGHT =====================
+class _LeaderGone(Exception):
+    """The leading call was cancelled before its load finished."""
+
+
+class SingleFlight:
+    """
+    Concurrent calls for the same key share one in-flight load.
+
+    The load runs in the first caller (it may use that caller's session).
+    Its errors are shared; its cancellation is not: waiting callers see
+    the slot freed and the next one starts its own load.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except _LeaderGone:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.set_exception(_LeaderGone())
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            # mark retrieved so an unawaited failure does not log a warning
+            if future.done() and not future.cancelled():
+                future.exception()
+            self._inflight.pop(key, None)
+
+
+# ===================== TWO-TIER VERSIONED CACHE =====================
+class VersionedCache:
+    """
+    Read-through cache: in-process LRU -> Redis -> loader (the database).
+
+    Every key lives under a scope (e.g. "lots" or "lot:<uid>") whose
+    version counter is stored in Redis. Writers bump the version, which
+    orphans every key of the scope at once; orphans age out by TTL. The
+    version itself is cached locally for CACHE_VERSION_TTL_SECONDS, which
+    bounds how stale another worker can be. Values must be JSON-able.
+
+    Redis is optional at runtime: any Redis error degrades to a local-only
+    cache in front of the loader.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        redis=async_redis_client,
+        local_maxsize: int = Config.CACHE_LOCAL_MAXSIZE,
+        local_ttl: float = Config.CACHE_LOCAL_TTL_SECONDS,
+        redis_ttl: int = Config.CACHE_REDIS_TTL_SECONDS,
+        version_ttl: float = Config.CACHE_VERSION_TTL_SECONDS,
+    ):
+        self.name = name
+        self.redis = redis
+        self.redis_ttl = redis_ttl
+        self.version_ttl = version_ttl
+        self.local = LRUCache(local_maxsize, local_ttl)
+        self._versions: Dict[str, Tuple[float, int]] = {}
+        self._flight = SingleFlight()
+
+    # ---------------- VERSIONS ----------------
+
+    def _version_key(self, scope: str) -> str:
+        return f"cachever:{self.name}:{scope}"
+
+    async def version(self, scope: str) -> int:
+        cached = self._versions.get(scope)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        try:
+            version = int(await self.redis.get(self._version_key(scope)) or 0)
+        except RedisError:
+            version = cached[1] if cached else 0
+
+        self._versions[scope] = (time.monotonic() + self.version_ttl, version)
+        return version
+
+    async def bump(self, scope: str) -> int:
+        """Invalidate every key of `scope`, in this worker immediately."""
+        try:
+            version = int(await self.redis.incr(self._version_key(scope)))
+        except RedisError:
+            logger.warning("Cache version bump for %s failed", scope, exc_info=True)
+            cached = self._versions.get(scope)
+            version = (cached[1] if cached else 0) + 1
+
+        self._versions[scope] = (time.monotonic() + self.version_ttl, version)
+        return version
+
+    def forget_versions(self, scope: Optional[str] = None) -> None:
+        """Drop locally cached versions so the next read asks Redis."""
+        if scope is None:
+            self._versions.clear()
+        else:
+            self._versions.pop(scope, None)
+
+    def invalidate_local(self, scope: str) -> None:
+        """Targeted invalidation of this worker's copy of a scope."""
+        self.forget_versions(scope)
+        self.local.pop_prefix(f"cache:{self.name}:{scope}:")
+
+    def flush_local(self) -> None:
+        """Full flush of this worker's tier (e.g. after missed notifications)."""
+        self.forget_versions()
+        self.local.clear()
+
+    # ---------------- READ THROUGH ----------------
+
+    async def get_or_load(
+        self,
+        scope: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        version: Optional[int] = None,
+    ) -> Any:
+        """
+        Pass `version` when the caller already knows the scope version
+        it is answering for (e.g. the catalog_versions row behind an
+        ETag), so the value cached is the one that version names.
+        """
+        if version is None:
+            tag = f"v{await self.version(scope)}"
+        else:
+            tag = f"db{version}"  # apart from the Redis-counter versions
+        full_key = f"cache:{self.name}:{scope}:{tag}:{key}"
+
+        value = self.local.get(full_key)
+        if value is not _MISSING:
+            cache_requests.inc(cache=self.name, tier="local", result="hit")
+            return value
+        cache_requests.inc(cache=self.name, tier="local", result="miss")
+
+        return await self._flight.do(full_key, lambda: self._fill(full_key, loader))
+
+    async def _fill(self, full_key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            raw = await self.redis.get(full_key)
+        except RedisError:
+            raw = None
+
+        if raw is not None:
+            cache_requests.inc(cache=self.name, tier="redis", result="hit")
+            value = json.loads(raw)["v"]
+            self.local.set(full_key, value)
+            return value
+        cache_requests.inc(cache=self.name, tier="redis", result="miss")
+
+        started = time.perf_counter()
+        value = await loader()
+        cache_fill_seconds.observe(time.perf_counter() - started, cache=self.name)
+
+        try:
+            await self.redis.set(
+                full_key,
+                json.dumps({"v": value}, separators=(",", ":")),
+                ex=self.redis_ttl,
+            )
+        except RedisError:
+            logger.warning("Cache write for %s failed", full_key, exc_info=True)
+
+        self.local.set(full_key, value)
+        return value
+
+
+# lot and slot reads (see ParkingService / ParkingSlotService)
+catalog_cache = VersionedCache("catalog")
+
+
+def invalidate_catalog(change: dict) -> None:
+    """Maps a row-change notification onto catalog cache scopes."""
+    table = change.get("table")
+    if table == "parking_lots":
+        catalog_cache.invalidate_local("lots")
+    elif table == "parking_slots" and change.get("lot"):
+        catalog_cache.invalidate_local(f"lot:{change['lot']}")
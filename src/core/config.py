@@ -12,6 +12,99 @@ class Settings(BaseSettings):
 
     RAZORPAY_KEY_ID:str
     RAZORPAY_KEY_SECRET:str
+    RAZORPAY_WEBHOOK_SECRET: str
+
+    # Webhook replay protection
+    WEBHOOK_EVENT_TTL_SECONDS: int = 172800      # how long event ids are remembered
+    WEBHOOK_MAX_EVENT_AGE_SECONDS: int = 172800  # must not exceed the TTL above
+    WEBHOOK_MAX_CLOCK_SKEW_SECONDS: int = 300
+    WEBHOOK_BLOOM_CAPACITY: int = 100000
+
+    # Bulk refunds (lot closures)
+    REFUND_CONCURRENCY: int = 8
+    REFUND_RATE_PER_SECOND: float = 10.0
+    REFUND_BATCH_SIZE: int = 200
+
+    # Domain events (outbox -> Redis Streams)
+    EVENT_STREAM: str = "spotzy:events"
+    EVENT_STREAM_MAXLEN: int = 1000000
+    OUTBOX_RETENTION_HOURS: int = 72
+
+    # Read-through cache (in-process LRU in front of Redis)
+    CACHE_LOCAL_MAXSIZE: int = 2048
+    CACHE_LOCAL_TTL_SECONDS: float = 300.0
+    CACHE_REDIS_TTL_SECONDS: int = 600
+    CACHE_VERSION_TTL_SECONDS: float = 1.0
+
+    # Read replicas (comma-separated URLs; empty = primary only)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_HEALTH_INTERVAL_SECONDS: float = 1.0
+    READ_YOUR_WRITES_SECONDS: int = 60
+
+    # Lot shards ("name=url,..."; DATABASE_URL is always the "main" shard)
+    SHARD_URLS: str = ""
+    SHARD_DIRECTORY_TTL_SECONDS: float = 5.0
+    SHARD_MOVE_DRAIN_SECONDS: float = 15.0
+
+    # Booking partitions (monthly by start_time) and archival
+    BOOKING_MAX_DURATION_HOURS: int = 720
+    BOOKING_MAX_ADVANCE_DAYS: int = 180
+    BOOKING_START_GRACE_MINUTES: int = 5  # walk-up bookings may start just before now
+    BOOKING_PARTITIONS_AHEAD_MONTHS: int = 7
+    BOOKING_PARTITION_CHECK_SECONDS: float = 21600.0
+    BOOKING_ARCHIVE_AFTER_MONTHS: int = 24
+    BOOKING_ARCHIVE_DIR: str = "archive/bookings"
+
+    # Recurring bookings (POST /bookings/series)
+    BOOKING_SERIES_MAX_OCCURRENCES: int = 200
+    BOOKING_UTC_OFFSET_MINUTES: int = 330  # local clock for series times
+
+    # "Any slot in this lot" bookings (src/services/assignment_services.py)
+    SLOT_ASSIGN_HORIZON_HOURS: int = 12  # gaps longer than this count as open
+    SLOT_ASSIGN_INDEX_SECONDS: float = 2.0
+    SLOT_ASSIGN_ATTEMPTS: int = 3
+
+    # Dashboard rollups (src/jobs/refresh_rollups.py)
+    ROLLUP_BATCH_DAYS: int = 500
+    ROLLUP_REFRESH_INTERVAL_SECONDS: float = 60.0
+
+    # Occupancy forecasts (src/jobs/forecast_occupancy.py)
+    FORECAST_HISTORY_WEEKS: int = 104
+    FORECAST_HALF_LIFE_WEEKS: float = 8.0
+    FORECAST_UTC_OFFSET_MINUTES: int = 330  # fixed local offset for weekday/hour
+    FORECAST_LOT_CHUNK: int = 256
+    FORECAST_CACHE_SECONDS: float = 300.0
+
+    # Pricing (src/services/pricing_services.py)
+    PRICING_UTC_OFFSET_MINUTES: int = 330  # local clock for peak hours and daily caps
+    PRICING_CACHE_SECONDS: float = 300.0
+    PRICING_MAX_QUOTES: int = 500
+
+    # Live availability streams (src/services/availability_services.py)
+    AVAILABILITY_COALESCE_SECONDS: float = 0.25
+    AVAILABILITY_RESYNC_SECONDS: float = 60.0
+    AVAILABILITY_HEARTBEAT_SECONDS: float = 25.0
+    AVAILABILITY_MAX_SUBSCRIBERS: int = 50000  # per worker
+
+    # Long-poll payment status (GET /payments/booking/{id}/wait)
+    PAYMENT_WAIT_DEFAULT_SECONDS: float = 25.0
+    PAYMENT_WAIT_MAX_SECONDS: float = 55.0
+
+    # Slot sensor ingestion (POST /parking-slots/sensor-readings)
+    SENSOR_INGEST_TOKEN: str = ""  # shared with the sensor gateways; empty disables
+    SENSOR_MAX_READINGS: int = 10000  # per request
+    SENSOR_FLUSH_SECONDS: float = 0.5
+    SENSOR_FLUSH_SIZE: int = 20000  # pending slots that trigger an early flush
+    SENSOR_UPDATE_CHUNK: int = 5000  # slots per bulk UPDATE statement
+
+    # Statement caches
+    DB_QUERY_CACHE_SIZE: int = 1200
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 256
+
+    # Conditional GET on catalog endpoints; 0 = always revalidate
+    CATALOG_MAX_AGE_SECONDS: int = 0
+    CATALOG_SNAPSHOT_MAX_AGE_SECONDS: float = 60.0
 
     model_config = SettingsConfigDict(
         env_file=".env", 
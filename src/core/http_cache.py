@@ -0,0 +1,145 @@
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+from src.core.cache import LRUCache
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.core.responses import dumps
+
+conditional_requests = metrics.counter(
+    "http_conditional_requests_total",
+    "Catalog GETs by route and result (not_modified/modified/unconditional)",
+)
+bytes_saved = metrics.counter(
+    "http_not_modified_bytes_saved_total",
+    "Response body bytes not sent because the client's ETag still matched",
+)
+
+# body size last sent per ETag, so a 304 can report what it saved
+_body_sizes = LRUCache(maxsize=4096, ttl=3600)
+
+
+# ===================== CONDITIONAL GET =====================
+# ETags are strong and derived from catalog_versions (one primary-key
+# lookup), so a matching If-None-Match is answered before any row is
+# loaded or serialized.
+
+def make_etag(scope: str, version: int) -> str:
+    return f'"{scope}:v{version}"'
+
+
+def cache_headers(etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={Config.CATALOG_MAX_AGE_SECONDS}, must-revalidate",
+    }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(
+    request: Request,
+    etag: str,
+    route: str,
+    vary: Optional[str] = None,
+) -> Optional[Response]:
+    """
+    A 304 if the client already holds `etag`, else None. Pass the `vary`
+    the 200 would carry so caches key the 304 the same way.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not etag_matches(if_none_match, etag):
+        conditional_requests.inc(
+            route=route, result="modified" if if_none_match else "unconditional"
+        )
+        return None
+
+    conditional_requests.inc(route=route, result="not_modified")
+    size = _body_sizes.get(etag)
+    if isinstance(size, int):
+        bytes_saved.inc(size, route=route)
+    headers = cache_headers(etag)
+    if vary:
+        headers["Vary"] = vary
+    return Response(status_code=304, headers=headers)
+
+
+def versioned_response(content: Any, etag: str) -> Response:
+    """JSON 200 carrying the ETag; `content` must already be JSON-able."""
+    body = dumps(content)
+    _body_sizes.set(etag, len(body))
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=cache_headers(etag),
+    )
+
+
+def accepts_gzip(request: Request) -> bool:
+    """
+    Accept-Encoding with q-values (RFC 9110 12.5.3): gzip counts unless
+    its q is 0; without a gzip entry, a "*" entry decides.
+    """
+    gzip_q = wildcard_q = None
+    for entry in request.headers.get("accept-encoding", "").lower().split(","):
+        coding, *params = [part.strip() for part in entry.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding in ("gzip", "x-gzip"):
+            gzip_q = q if gzip_q is None else max(gzip_q, q)
+        elif coding == "*":
+            wildcard_q = q
+    if gzip_q is None:
+        gzip_q = wildcard_q
+    return bool(gzip_q)
+
+
+VARY_ENCODING = "Accept-Encoding"
+
+
+def encoding_etag(request: Request, etag: str) -> str:
+    """
+    The ETag of the representation `precompressed_response` will serve:
+    gzip and identity bodies differ byte for byte, so each gets its own
+    strong tag. Check If-None-Match against this one.
+    """
+    if accepts_gzip(request):
+        return f'{etag[:-1]}-gz"'
+    return etag
+
+
+def precompressed_response(
+    request: Request,
+    body: bytes,
+    gzip_body: bytes,
+    etag: str,
+) -> Response:
+    """Serves prebuilt bytes, gzipped when the client accepts it."""
+    etag = encoding_etag(request, etag)
+    headers = cache_headers(etag)
+    headers["Vary"] = VARY_ENCODING
+    if accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_body
+    _body_sizes.set(etag, len(body))
+    return Response(content=body, media_type="application/json", headers=headers)
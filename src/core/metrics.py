@@ -0,0 +1,98 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+
+# ===================== IN-PROCESS METRICS =====================
+# Tiny Prometheus-style registry. Every worker keeps its own numbers and
+# exposes them on GET /metrics; the scraper sums across workers.
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelKey, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] += amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} counter",
+        ]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return "\n".join(lines)
+
+
+class Summary:
+    """Keeps count and sum per label set (enough for averages/rates)."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._count: Dict[LabelKey, int] = defaultdict(int)
+        self._sum: Dict[LabelKey, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._count[key] += 1
+            self._sum[key] += value
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} summary",
+        ]
+        for key in sorted(self._count):
+            labels = _format_labels(key)
+            lines.append(f"{self.name}_count{labels} {self._count[key]}")
+            lines.append(f"{self.name}_sum{labels} {self._sum[key]}")
+        return "\n".join(lines)
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    inner = ",".join(f'{name}="{value}"' for name, value in key)
+    return "{" + inner + "}"
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def summary(self, name: str, description: str) -> Summary:
+        return self._get_or_create(Summary, name, description)
+
+    def _get_or_create(self, cls, name: str, description: str):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, description)
+                self._metrics[name] = metric
+            return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+metrics = MetricsRegistry()
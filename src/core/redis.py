@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio as aioredis
 from src.core.config import Config
 
 redis_client = redis.Redis(
@@ -7,3 +8,11 @@ redis_client = redis.Redis(
     db=Config.REDIS_DB,
     decode_responses=True
 )
+
+# for long-lived async work (streams, pub/sub) that must not block the loop
+async_redis_client = aioredis.Redis(
+    host=Config.REDIS_HOST,
+    port=Config.REDIS_PORT,
+    db=Config.REDIS_DB,
+    decode_responses=True
+)
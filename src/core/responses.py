@@ -0,0 +1,61 @@
+import json
+from typing import Any, Generic, Iterable, Type, TypeVar
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
+
+M = TypeVar("M", bound=BaseModel)
+
+
+# ===================== JSON ENCODING =====================
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes; orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """App-wide default response class (see main.py)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# ===================== LIST SERIALIZERS =====================
+class ListSerializer(Generic[M]):
+    """
+    Precompiled TypeAdapter for `list[model]`.
+
+    Going through FastAPI's response_model, each item is validated into
+    the model, dumped to Python dicts and then JSON-encoded. Here the
+    validated list goes straight to JSON bytes in pydantic-core, and the
+    route returns a Response, so FastAPI skips its own serialization.
+    Keep `response_model` on the route for the OpenAPI schema.
+    """
+
+    def __init__(self, model: Type[M]):
+        self.model = model
+        self.adapter = TypeAdapter(list[model])
+
+    def dump_jsonable(self, items: Iterable[Any]) -> list:
+        """JSON-mode Python objects, for caches that store dicts."""
+        validated = self.adapter.validate_python(list(items), from_attributes=True)
+        return self.adapter.dump_python(validated, mode="json")
+
+    def dump_json(self, items: Iterable[Any]) -> bytes:
+        validated = self.adapter.validate_python(list(items), from_attributes=True)
+        return self.adapter.dump_json(validated)
+
+    def response(self, items: Iterable[Any], status_code: int = 200) -> Response:
+        return Response(
+            content=self.dump_json(items),
+            status_code=status_code,
+            media_type="application/json",
+        )
@@ -1,15 +1,52 @@
-from pydantic import BaseModel
+from pydantic import AwareDatetime, BaseModel, Field, model_validator
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime, time
+from typing import Annotated, List, Optional
 
 from src.db.models.booking import BookingStatus
 
 
 # ===================== BOOKING CREATE =====================
 class BookingCreate(BaseModel):
+    """Either a `slot_id`, or a `parking_lot_id` to get any free slot there."""
+    slot_id: Optional[UUID] = None
+    parking_lot_id: Optional[UUID] = None
+    start_time: AwareDatetime
+    end_time: AwareDatetime
+
+    @model_validator(mode="after")
+    def one_target(self):
+        if (self.slot_id is None) == (self.parking_lot_id is None):
+            raise ValueError("Give exactly one of slot_id or parking_lot_id")
+        return self
+
+
+# ===================== RECURRING BOOKINGS =====================
+class BookingSeriesCreate(BaseModel):
+    """
+    One slot on `weekdays` (0 = Monday) from `start_date` to `end_date`
+    inclusive, `start_time`-`end_time` on the local clock
+    (`utc_offset_minutes`, defaulting to BOOKING_UTC_OFFSET_MINUTES).
+    An `end_time` at or before `start_time` runs past midnight. With
+    `skip_conflicts` the free occurrences are booked and the others
+    reported; otherwise any conflict books nothing.
+    """
     slot_id: UUID
+    start_date: date
+    end_date: date
+    weekdays: List[Annotated[int, Field(ge=0, le=6)]] = Field(
+        default_factory=lambda: [0, 1, 2, 3, 4], min_length=1
+    )
+    start_time: time
+    end_time: time
+    utc_offset_minutes: Optional[int] = Field(None, ge=-720, le=840)
+    skip_conflicts: bool = False
+
+
+class OccurrenceConflict(BaseModel):
     start_time: datetime
     end_time: datetime
+    booking_id: UUID  # an existing booking holding the slot then
 
 
 # ===================== BOOKING RESPONSE =====================
@@ -24,4 +61,20 @@ class BookingResponse(BaseModel):
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class BookingSeriesResult(BaseModel):
+    bookings: List[BookingResponse]
+    conflicts: List[OccurrenceConflict]
+
+
+# ===================== BULK STATUS CHANGE (ADMIN) =====================
+class BookingBulkTransition(BaseModel):
+    booking_ids: List[UUID] = Field(..., min_length=1, max_length=5000)
+    status: BookingStatus
+
+
+class BookingBulkTransitionResult(BaseModel):
+    updated: List[UUID]
+    skipped: List[UUID]
@@ -0,0 +1,24 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+
+# ===================== REVENUE (PER LOT, PER DAY) =====================
+class RevenueDay(BaseModel):
+    """paid_* is still-captured money; refunds move it to refunded_*."""
+    day: date
+    currency: str
+    paid_amount: Decimal
+    paid_count: int
+    refunded_amount: Decimal
+    refunded_count: int
+
+
+# ===================== OCCUPANCY (PER LOT, PER HOUR) =====================
+class OccupancyHour(BaseModel):
+    hour: datetime
+    occupied_seconds: int
+    booking_count: int
+    slot_count: int
+    occupancy: float  # 0..1 of the lot's slot-hours
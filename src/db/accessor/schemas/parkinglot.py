@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from uuid import UUID
+from datetime import datetime
 
 # ---------- PARKING LOT ----------
 class ParkingLotCreate(BaseModel):
@@ -26,3 +27,12 @@ class ParkingLotResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# ---------- OCCUPANCY FORECAST ----------
+class ForecastHour(BaseModel):
+    hour: datetime
+    weekday: int     # local, Monday = 0
+    local_hour: int
+    occupancy: float  # 0..1, predicted
+    expected_free_slots: int
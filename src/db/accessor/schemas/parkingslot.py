@@ -1,8 +1,8 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import AwareDatetime, BaseModel, Field
 
 
 # ===================== SLOT CREATE =====================
@@ -26,4 +26,21 @@ class SlotResponse(BaseModel):
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# ===================== SENSOR READINGS =====================
+class SensorReading(BaseModel):
+    slot_id: UUID
+    is_available: bool
+    observed_at: AwareDatetime
+
+
+class SensorBatch(BaseModel):
+    readings: List[SensorReading] = Field(..., min_length=1)
+
+
+class SensorBatchResponse(BaseModel):
+    """`coalesced` readings were superseded by a newer one for the same slot."""
+    accepted: int
+    coalesced: int
@@ -1,5 +1,6 @@
 from uuid import UUID
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum
 from pydantic import BaseModel, Field
 
@@ -17,11 +18,11 @@ class PaymentStatus(str, Enum):
 # =========================
 # CREATE PAYMENT (REQUEST)
 # =========================
-# Used when user clicks "Pay Now"
+# Used when user clicks "Pay Now". The server prices the booking; an
+# `amount` sent along is the price the user was shown and must match it.
 class PaymentCreate(BaseModel):
     booking_id: UUID
-    amount: float = Field(..., gt=0)
-    currency: str = "INR"
+    amount: Decimal | None = Field(None, gt=0)
 
 
 # =========================
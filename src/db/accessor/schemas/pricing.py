@@ -0,0 +1,50 @@
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+# ===================== QUOTES =====================
+class QuoteItem(BaseModel):
+    slot_id: UUID
+    start_time: datetime
+    end_time: datetime
+
+
+class QuoteRequest(BaseModel):
+    items: list[QuoteItem] = Field(..., min_length=1)
+
+
+class QuoteResponse(BaseModel):
+    """`amount` is None (and `error` set) when the window cannot be priced."""
+    slot_id: UUID
+    parking_lot_id: UUID | None
+    start_time: datetime
+    end_time: datetime
+    amount: Decimal | None
+    currency: str | None
+    error: str | None = None
+
+    class Config:
+        from_attributes = True
+
+
+# ===================== RATE CARDS =====================
+class RateCardUpdate(BaseModel):
+    currency: str = Field("INR", max_length=10)
+    hourly_rate: Decimal = Field(..., ge=0, max_digits=10, decimal_places=2)
+    daily_cap: Decimal | None = Field(None, gt=0, max_digits=10, decimal_places=2)
+    peak_multiplier: Decimal = Field(Decimal("1"), ge=1, max_digits=4, decimal_places=2)
+    peak_start_hour: int = Field(0, ge=0, le=23)
+    peak_end_hour: int = Field(0, ge=0, le=24)
+    peak_weekdays: int = Field(0b0011111, ge=0, le=0b1111111)  # bit 0 = Monday
+    billing_increment_minutes: int = Field(15, ge=1, le=1440)
+
+
+class RateCardResponse(RateCardUpdate):
+    parking_lot_id: UUID
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from src.db.models.refund_job import RefundJobStatus
+
+
+# ===================== LOT CLOSURE (REQUEST) =====================
+class LotClosureCreate(BaseModel):
+    window_start: datetime
+    window_end: datetime
+
+
+# ===================== REFUND JOB RESPONSE =====================
+class RefundJobResponse(BaseModel):
+    uid: UUID
+    parking_lot_id: UUID
+    window_start: datetime
+    window_end: datetime
+    status: RefundJobStatus
+    processed: int
+    refunded: int
+    cancelled: int
+    failed: int
+    last_error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,20 +1,128 @@
+import time
+
+from fastapi import Request
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from src.core.config import Config
+from src.core.metrics import metrics
+from src.db.routing import WROTE, Replica, ReplicaSet, RoutingAsyncSession, RoutingSession
+from src.db.sharding import MAIN_SHARD, ShardMap, parse_shard_urls
 
 DATABASE_URL = Config.DATABASE_URL
 
-engine = create_async_engine(
-    DATABASE_URL,
+ENGINE_OPTIONS = dict(
     echo=True,
+    # compiled-SQL cache shared by all connections (see src/db/statements.py)
+    query_cache_size=Config.DB_QUERY_CACHE_SIZE,
+    # asyncpg prepared statements kept per pooled connection
+    connect_args={
+        "prepared_statement_cache_size": Config.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    },
 )
 
+engine = create_async_engine(DATABASE_URL, **ENGINE_OPTIONS)
+
+# reads from @replica_read service methods go here (see src/db/routing.py)
+replica_set = ReplicaSet([
+    Replica(f"replica{i}", create_async_engine(url.strip(), **ENGINE_OPTIONS))
+    for i, url in enumerate(Config.DATABASE_REPLICA_URLS.split(","))
+    if url.strip()
+])
+
+# lot-scoped rows are spread over these by parking_lot_id (see src/db/sharding.py)
+shard_map = ShardMap({
+    MAIN_SHARD: engine,
+    **{
+        name: create_async_engine(url, **ENGINE_OPTIONS)
+        for name, url in parse_shard_urls(Config.SHARD_URLS).items()
+    },
+})
+
 async_session_maker = sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=RoutingAsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=replica_set,
+    shards=shard_map,
     expire_on_commit=False,
 )
 
-async def get_session():
-    async with async_session_maker() as session:
+db_connection_hold_seconds = metrics.summary(
+    "db_connection_hold_seconds",
+    "Time a request held pooled connections, by route",
+)
+db_session_requests = metrics.counter(
+    "db_session_requests_total",
+    "Requests that opened a session, by route and whether it ever connected",
+)
+
+
+# ===================== CONNECTION HOLD TRACKING =====================
+class ConnectionHold:
+    """Accumulates how long a session held a connection (one per request)."""
+
+    INFO_KEY = "connection_hold"
+
+    def __init__(self):
+        self.checkouts = 0
+        self.seconds = 0.0
+        self._since = None
+
+
+@event.listens_for(Session, "after_begin")
+def _connection_acquired(session, transaction, connection):
+    hold = session.info.get(ConnectionHold.INFO_KEY)
+    if hold is not None and hold._since is None:
+        hold.checkouts += 1
+        hold._since = time.perf_counter()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _connection_released(session, transaction):
+    hold = session.info.get(ConnectionHold.INFO_KEY)
+    if hold is not None and hold._since is not None and transaction.parent is None:
+        hold.seconds += time.perf_counter() - hold._since
+        hold._since = None
+
+
+# ===================== REQUEST UNIT OF WORK =====================
+async def get_session(request: Request):
+    """
+    Request-scoped unit of work.
+
+    The session checks out a pooled connection only when the first
+    statement runs, so requests rejected by auth, answered from a cache
+    or failing webhook verification never touch the pool.
+
+    Handlers and services commit their own writes: this teardown runs
+    after the response is sent, too late to report a failed commit, so
+    whatever is still open here is rolled back and the connection goes
+    back to the pool. Use `release()` to hand it back earlier.
+    """
+    session = async_session_maker()
+    hold = session.info[ConnectionHold.INFO_KEY] = ConnectionHold()
+    try:
         yield session
+    finally:
+        await session.close()  # rolls back anything left uncommitted
+
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        db_session_requests.inc(route=path, connected="yes" if hold.checkouts else "no")
+        if hold.checkouts:
+            db_connection_hold_seconds.observe(hold.seconds, route=path)
+
+
+async def release(session: AsyncSession) -> None:
+    """
+    Ends a read-only transaction so its connection returns to the pool
+    now; loaded objects stay usable (expire_on_commit=False) and the next
+    statement checks out a connection again. No-op once the session has
+    written: pending ORM changes, or any non-SELECT it executed (Core
+    update()/insert() included, which the routing layer flags as WROTE).
+    """
+    if not session.in_transaction() or session.info.get(WROTE):
+        return
+    if not (session.new or session.dirty or session.deleted):
+        await session.commit()
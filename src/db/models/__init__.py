@@ -3,3 +3,11 @@ from .parkinglot import *
 from .parkingslot import *
 from .user import *
 from .payment import *
+from .refund_job import *
+from .outbox import *
+from .booking_transition import *
+from .catalog_version import *
+from .lot_shard import *
+from .lot_rollup import *
+from .lot_forecast import *
+from .rate_card import *
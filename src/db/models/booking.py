@@ -4,7 +4,7 @@ from typing import Optional, TYPE_CHECKING
 from enum import Enum
 
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index
 from sqlalchemy.dialects import postgresql as pg
 
 if TYPE_CHECKING:
@@ -24,8 +24,20 @@ class BookingStatus(str, Enum):
 
 # ===================== BOOKING =====================
 class Booking(SQLModel, table=True):
+    """
+    Range-partitioned by month of start_time (bookings_YYYY_MM, see
+    src/services/partition_services.py). The database key is
+    (uid, start_time); the mapper keys on uid alone, which stays unique.
+    Filter on start_time wherever possible so only live partitions are
+    scanned.
+    """
     __tablename__ = "bookings"
 
+    __table_args__ = (
+        Index("ix_bookings_slot_id_start_time", "slot_id", "start_time"),
+        Index("ix_bookings_user_id_start_time", "user_id", "start_time"),
+    )
+
     uid: uuid.UUID = Field(
         default_factory=uuid.uuid4,
         sa_column=Column(pg.UUID(as_uuid=True), primary_key=True),
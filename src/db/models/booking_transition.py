@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column, DateTime
+from sqlalchemy.dialects import postgresql as pg
+
+
+# ===================== BOOKING TRANSITION (AUDIT) =====================
+class BookingTransition(SQLModel, table=True):
+    """
+    Append-only audit of booking status changes. No FK to bookings on
+    purpose: the log must outlive archived or deleted bookings.
+    """
+    __tablename__ = "booking_transitions"
+
+    id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(BigInteger, primary_key=True, autoincrement=True),
+    )
+
+    booking_id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID(as_uuid=True), nullable=False, index=True)
+    )
+    from_status: Optional[str] = Field(default=None, max_length=32)
+    to_status: str = Field(nullable=False, max_length=32)
+
+    actor_id: Optional[uuid.UUID] = Field(
+        default=None,
+        sa_column=Column(pg.UUID(as_uuid=True), nullable=True),
+    )
+    reason: Optional[str] = Field(default=None, max_length=64)
+
+    created_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            nullable=False,
+        )
+    )
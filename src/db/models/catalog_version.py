@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column, DateTime
+
+
+# ===================== CATALOG VERSION =====================
+class CatalogVersion(SQLModel, table=True):
+    """
+    Monotonic version per catalog scope, bumped by triggers:
+    "lots" for any parking_lots change, "lot:<uid>" for that lot's slots.
+    Used for ETags; one primary-key lookup per conditional GET.
+    """
+    __tablename__ = "catalog_versions"
+
+    scope: str = Field(primary_key=True, max_length=64)
+
+    version: int = Field(
+        default=0,
+        sa_column=Column(BigInteger, nullable=False, server_default="0"),
+    )
+
+    updated_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            nullable=False,
+        )
+    )
@@ -0,0 +1,36 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, DateTime, Integer, LargeBinary
+from sqlalchemy.dialects import postgresql as pg
+
+
+# ===================== OCCUPANCY FORECAST =====================
+class LotOccupancyForecast(SQLModel, table=True):
+    """
+    Seasonal occupancy profile of a lot: 168 bytes, one per local
+    (weekday, hour) with Monday 00:00 first, each the predicted
+    occupancy in percent. Written by src/jobs/forecast_occupancy.py.
+    """
+    __tablename__ = "lot_occupancy_forecasts"
+
+    parking_lot_id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID(as_uuid=True), primary_key=True),
+    )
+
+    profile: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+    # slots when the profile was computed; free slots = slot_count * (1 - p)
+    slot_count: int = Field(sa_column=Column(Integer, nullable=False))
+
+    # weeks of history behind the profile (fewer for young lots)
+    weeks: int = Field(sa_column=Column(Integer, nullable=False))
+
+    computed_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            nullable=False,
+        )
+    )
@@ -0,0 +1,74 @@
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column, Date, DateTime, Integer, Numeric
+from sqlalchemy.dialects import postgresql as pg
+
+
+# ===================== DASHBOARD ROLLUPS =====================
+# Rebuilt per (lot, UTC day) by src/services/rollup_services.py from the
+# days the triggers marked dirty; dashboards only read these tables.
+
+class LotRevenueDaily(SQLModel, table=True):
+    """Payments of bookings starting on `day`, per currency."""
+    __tablename__ = "lot_revenue_daily"
+
+    parking_lot_id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID(as_uuid=True), primary_key=True),
+    )
+    day: date = Field(sa_column=Column(Date, primary_key=True))
+    currency: str = Field(primary_key=True, max_length=10)
+
+    paid_amount: Decimal = Field(
+        sa_column=Column(Numeric(14, 2), nullable=False, server_default="0")
+    )
+    paid_count: int = Field(
+        sa_column=Column(Integer, nullable=False, server_default="0")
+    )
+    refunded_amount: Decimal = Field(
+        sa_column=Column(Numeric(14, 2), nullable=False, server_default="0")
+    )
+    refunded_count: int = Field(
+        sa_column=Column(Integer, nullable=False, server_default="0")
+    )
+
+    refreshed_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            nullable=False,
+        )
+    )
+
+
+class LotOccupancyHourly(SQLModel, table=True):
+    """Slot-seconds held by confirmed bookings in the hour starting at `hour`."""
+    __tablename__ = "lot_occupancy_hourly"
+
+    parking_lot_id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID(as_uuid=True), primary_key=True),
+    )
+    hour: datetime = Field(sa_column=Column(DateTime(timezone=True), primary_key=True))
+
+    occupied_seconds: int = Field(
+        sa_column=Column(BigInteger, nullable=False, server_default="0")
+    )
+    booking_count: int = Field(
+        sa_column=Column(Integer, nullable=False, server_default="0")
+    )
+    # slots in the lot when the hour was rolled up (occupancy denominator)
+    slot_count: int = Field(
+        sa_column=Column(Integer, nullable=False, server_default="0")
+    )
+
+
+class RollupDirtyDay(SQLModel, table=True):
+    """(lot, day) whose rollups are stale; written by triggers, drained by the job."""
+    __tablename__ = "rollup_dirty_days"
+
+    parking_lot_id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID(as_uuid=True), primary_key=True),
+    )
+    day: date = Field(sa_column=Column(Date, primary_key=True))
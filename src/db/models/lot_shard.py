@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, DateTime
+from sqlalchemy.dialects import postgresql as pg
+
+
+# ===================== SHARD DIRECTORY =====================
+class LotShard(SQLModel, table=True):
+    """
+    Where a lot (and its slots, bookings and payments) lives. Kept on the
+    main database only; lots without a row predate sharding and live on
+    the main shard. `moving` blocks writes while the lot is rebalanced.
+    """
+    __tablename__ = "lot_shards"
+
+    parking_lot_id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID(as_uuid=True), primary_key=True),
+    )
+
+    shard: str = Field(max_length=64, nullable=False)
+
+    moving: bool = Field(default=False, nullable=False)
+
+    updated_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            onupdate=lambda: datetime.now(timezone.utc),
+            nullable=False,
+        )
+    )
@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column, DateTime, Index, text
+from sqlalchemy.dialects import postgresql as pg
+
+
+# ===================== OUTBOX EVENT =====================
+class OutboxEvent(SQLModel, table=True):
+    """
+    Domain event written in the same transaction as the state change it
+    describes. The relay publishes unpublished rows to Redis Streams.
+    """
+    __tablename__ = "outbox_events"
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_events_unpublished",
+            "id",
+            postgresql_where=text("published_at IS NULL"),
+        ),
+    )
+
+    id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(BigInteger, primary_key=True, autoincrement=True),
+    )
+
+    aggregate_type: str = Field(nullable=False, max_length=32)
+    aggregate_id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID(as_uuid=True), nullable=False)
+    )
+    event_type: str = Field(nullable=False, max_length=64)
+
+    payload: dict = Field(
+        default_factory=dict,
+        sa_column=Column(pg.JSONB, nullable=False),
+    )
+
+    created_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            nullable=False,
+        )
+    )
+
+    published_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
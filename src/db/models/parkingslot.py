@@ -53,6 +53,13 @@ class ParkingSlot(SQLModel, table=True):
         )
     )
 
+    # sensor time of the reading behind `is_available`; sensor readings
+    # are only ordered against each other, never against server clocks
+    state_observed_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+
     parking_lot: Optional["ParkingLot"] = Relationship(
         back_populates="slots",
         sa_relationship_kwargs={"lazy": "selectin"}
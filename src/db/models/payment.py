@@ -3,8 +3,8 @@ from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy import Column, Index, text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, ENUM as PG_ENUM
 
 if TYPE_CHECKING:
     from src.db.models.booking import Booking
@@ -15,6 +15,8 @@ class PaymentStatus(str, Enum):
     created = "created"
     paid = "paid"
     failed = "failed"
+    # refund intent committed before the gateway call; see LotClosureRefundService
+    refund_pending = "refund_pending"
     refunded = "refunded"
     
 
@@ -22,11 +24,22 @@ class PaymentStatus(str, Enum):
 class Payment(SQLModel, table=True):
     __tablename__ = "payments"
 
+    __table_args__ = (
+        # keyset scan for the reconciliation job (only unsettled rows)
+        Index(
+            "ix_payments_created_pending",
+            "created_at",
+            "uid",
+            postgresql_where=text("status = 'created'"),
+        ),
+    )
+
     uid: uuid.UUID = Field(
         default_factory=uuid.uuid4,
         sa_column=Column(PG_UUID(as_uuid=True), primary_key=True),
     )
 
+    # ORM-only: bookings is partitioned, so the database has no such FK
     booking_id: uuid.UUID = Field(
         foreign_key="bookings.uid",
         nullable=False,
@@ -44,6 +57,11 @@ class Payment(SQLModel, table=True):
     status: PaymentStatus = Field(
         sa_column=Column(
             "status",
+            PG_ENUM(
+                PaymentStatus,
+                name="payment_status_enum",
+                create_type=False,
+            ),
             nullable=False,
         ),
         default=PaymentStatus.created,
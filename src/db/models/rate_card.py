@@ -0,0 +1,86 @@
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, Integer, Numeric
+from sqlalchemy.dialects import postgresql as pg
+
+
+# Monday..Friday; bit 0 is Monday
+WEEKDAYS = 0b0011111
+
+
+# ===================== RATE CARD =====================
+class LotRateCard(SQLModel, table=True):
+    """
+    How a lot charges for a booking window (see src/services/pricing_services.py).
+
+    Each started billing increment is charged at the hourly rate, times
+    `peak_multiplier` inside the peak hours of the peak weekdays (local
+    clock; a peak window may wrap midnight). Each local day is then capped
+    at `daily_cap`.
+    """
+    __tablename__ = "lot_rate_cards"
+    __table_args__ = (
+        CheckConstraint("hourly_rate >= 0", name="ck_lot_rate_cards_hourly_rate"),
+        CheckConstraint("peak_multiplier >= 1", name="ck_lot_rate_cards_peak_multiplier"),
+        CheckConstraint(
+            "peak_start_hour BETWEEN 0 AND 23 AND peak_end_hour BETWEEN 0 AND 24",
+            name="ck_lot_rate_cards_peak_hours",
+        ),
+        CheckConstraint(
+            "billing_increment_minutes BETWEEN 1 AND 1440",
+            name="ck_lot_rate_cards_increment",
+        ),
+    )
+
+    uid: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        sa_column=Column(pg.UUID(as_uuid=True), primary_key=True)
+    )
+
+    parking_lot_id: uuid.UUID = Field(
+        sa_column=Column(
+            pg.UUID(as_uuid=True),
+            ForeignKey("parking_lots.uid", ondelete="CASCADE"),
+            unique=True,
+            nullable=False,
+        )
+    )
+
+    currency: str = Field(default="INR", max_length=10)
+
+    hourly_rate: Decimal = Field(sa_column=Column(Numeric(10, 2), nullable=False))
+    daily_cap: Optional[Decimal] = Field(
+        default=None, sa_column=Column(Numeric(10, 2), nullable=True)
+    )
+
+    peak_multiplier: Decimal = Field(
+        default=Decimal("1"),
+        sa_column=Column(Numeric(4, 2), nullable=False, server_default="1"),
+    )
+    peak_start_hour: int = Field(
+        default=0, sa_column=Column(Integer, nullable=False, server_default="0")
+    )
+    peak_end_hour: int = Field(
+        default=0, sa_column=Column(Integer, nullable=False, server_default="0")
+    )
+    peak_weekdays: int = Field(
+        default=WEEKDAYS,
+        sa_column=Column(Integer, nullable=False, server_default=str(WEEKDAYS)),
+    )
+
+    billing_increment_minutes: int = Field(
+        default=15, sa_column=Column(Integer, nullable=False, server_default="15")
+    )
+
+    updated_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            onupdate=lambda: datetime.now(timezone.utc),
+            nullable=False,
+        )
+    )
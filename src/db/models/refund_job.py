@@ -0,0 +1,79 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from enum import Enum
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, DateTime
+from sqlalchemy.dialects import postgresql as pg
+
+
+class RefundJobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+# ===================== LOT CLOSURE REFUND JOB =====================
+class RefundJob(SQLModel, table=True):
+    __tablename__ = "refund_jobs"
+
+    uid: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        sa_column=Column(pg.UUID(as_uuid=True), primary_key=True),
+    )
+
+    parking_lot_id: uuid.UUID = Field(
+        foreign_key="parking_lots.uid",
+        nullable=False,
+        index=True,
+    )
+
+    window_start: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
+    window_end: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
+
+    status: RefundJobStatus = Field(
+        sa_column=Column(pg.VARCHAR, nullable=False),
+        default=RefundJobStatus.PENDING,
+    )
+
+    # progress counters
+    processed: int = Field(default=0, nullable=False)
+    refunded: int = Field(default=0, nullable=False)
+    cancelled: int = Field(default=0, nullable=False)
+    failed: int = Field(default=0, nullable=False)
+    last_error: Optional[str] = Field(default=None)
+
+    # checkpoint: keyset position of the last booking handled
+    cursor_start_time: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    cursor_booking_id: Optional[uuid.UUID] = Field(
+        default=None,
+        sa_column=Column(pg.UUID(as_uuid=True), nullable=True),
+    )
+
+    created_by: uuid.UUID = Field(foreign_key="users.uid", nullable=False)
+
+    created_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            nullable=False,
+        )
+    )
+
+    updated_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            onupdate=lambda: datetime.now(timezone.utc),
+            nullable=False,
+        )
+    )
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+from typing import Callable, List, Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from src.core.config import Config
+from src.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# channel fed by the notify_row_change() trigger (see alembic migration)
+CHANGES_CHANNEL = "spotzy_changes"
+
+db_notifications = metrics.counter(
+    "db_notifications_total",
+    "LISTEN/NOTIFY change notifications received, by table",
+)
+db_listener_resets = metrics.counter(
+    "db_listener_resets_total",
+    "Full cache flushes after the change listener (re)connected",
+)
+
+
+def _asyncpg_dsn(database_url: str) -> str:
+    """asyncpg wants a plain postgresql:// URL, not the SQLAlchemy one."""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+
+
+class DatabaseChangeListener:
+    """
+    Long-lived LISTEN connection, one per worker.
+
+    Each notification is a small JSON object written by the trigger:
+        {"table": "parking_lots", "op": "UPDATE", "uid": ..., "lot": ...}
+    and is handed to every subscriber. Notifications sent while we were
+    disconnected are lost, so after every (re)connect subscribers'
+    `on_reset` callbacks run first and flush whatever they cache.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str = CHANGES_CHANNEL,
+        health_check_interval: float = 10.0,
+        max_backoff: float = 30.0,
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.health_check_interval = health_check_interval
+        self.max_backoff = max_backoff
+        self._handlers: List[Callable[[dict], None]] = []
+        self._reset_handlers: List[Callable[[], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._backoff = 0.5
+
+    def subscribe(
+        self,
+        handler: Callable[[dict], None],
+        on_reset: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._handlers.append(handler)
+        if on_reset is not None:
+            self._reset_handlers.append(on_reset)
+
+    # ---------------- DISPATCH ----------------
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed change notification: %r", payload)
+            return
+
+        db_notifications.inc(table=change.get("table", "unknown"))
+        for handler in self._handlers:
+            try:
+                handler(change)
+            except Exception:
+                logger.exception("Change handler failed for %s", change)
+
+    def _reset(self) -> None:
+        db_listener_resets.inc()
+        for on_reset in self._reset_handlers:
+            try:
+                on_reset()
+            except Exception:
+                logger.exception("Change listener reset handler failed")
+
+    # ---------------- CONNECTION LOOP ----------------
+
+    async def _listen_once(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            await connection.add_listener(self.channel, self._on_notification)
+            self._backoff = 0.5
+            # anything may have changed while we were not listening
+            self._reset()
+
+            while True:
+                await asyncio.sleep(self.health_check_interval)
+                await connection.execute("SELECT 1")
+        finally:
+            if not connection.is_closed():
+                await connection.close()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._listen_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    "Change listener disconnected; retrying in %.1fs",
+                    self._backoff,
+                    exc_info=True,
+                )
+            await asyncio.sleep(self._backoff)
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+db_change_listener = DatabaseChangeListener(_asyncpg_dsn(Config.DATABASE_URL))
+
+
+def shard_change_listeners(shard_map) -> List[DatabaseChangeListener]:
+    """The main listener plus one per extra lot shard (triggers fire where rows live)."""
+    return [db_change_listener] + [
+        DatabaseChangeListener(_asyncpg_dsn(engine.url.render_as_string(hide_password=False)))
+        for name, engine in shard_map.engines.items()
+        if name != shard_map.default
+    ]
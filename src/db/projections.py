@@ -0,0 +1,53 @@
+from dataclasses import make_dataclass
+from typing import Any, Iterable, List, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Select, Table, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.booking import Booking
+from src.db.models.parkinglot import ParkingLot
+from src.db.models.parkingslot import ParkingSlot
+from src.db.accessor.schemas.booking import BookingResponse
+from src.db.accessor.schemas.parkinglot import ParkingLotResponse
+from src.db.accessor.schemas.parkingslot import SlotResponse
+
+
+# ===================== READ-ONLY PROJECTIONS =====================
+class Projection:
+    """
+    Core-level read path for list endpoints.
+
+    Selects exactly the columns a response model needs and maps each row
+    into a `__slots__` record: no ORM instances, no identity map, no
+    relationship loading, nothing to expire on commit. Records are plain
+    read-only snapshots and are not attached to the session, so write
+    paths keep using the ORM models.
+    """
+
+    def __init__(self, table: Table, model: Type[BaseModel]):
+        self.table = table
+        self.model = model
+        self.fields = tuple(model.model_fields)
+        self.columns = [table.c[name] for name in self.fields]
+        self.record = make_dataclass(
+            f"{model.__name__.removesuffix('Response')}Row",
+            self.fields,
+            slots=True,
+        )
+
+    def select(self) -> Select:
+        return select(*self.columns)
+
+    def map_rows(self, rows: Iterable[Any]) -> List[Any]:
+        record = self.record
+        return [record(*row) for row in rows]
+
+    async def fetch(self, session: AsyncSession, stmt: Optional[Select] = None) -> List[Any]:
+        result = await session.execute(stmt if stmt is not None else self.select())
+        return self.map_rows(result.tuples())
+
+
+booking_rows = Projection(Booking.__table__, BookingResponse)
+parking_lot_rows = Projection(ParkingLot.__table__, ParkingLotResponse)
+slot_rows = Projection(ParkingSlot.__table__, SlotResponse)
@@ -0,0 +1,288 @@
+import asyncio
+import functools
+import logging
+import random
+from typing import List, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import Select, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.core.redis import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+db_routed = metrics.counter(
+    "db_routed_statements_total",
+    "Session statements by target (primary/replica) and reason",
+)
+db_replica_checks = metrics.counter(
+    "db_replica_health_checks_total",
+    "Replica health checks by replica and result",
+)
+
+# session.info keys
+READ_REPLICA = "read_replica"   # >0 inside a @replica_read method
+WROTE = "wrote"                 # this session wrote; keep its reads on primary
+USER_ID = "user_id"             # set by get_current_user
+MIN_LSN = "min_lsn"             # replicas must have replayed at least this
+PINNED = "replica"              # replica chosen for this session
+SHARD = "shard"                 # lot shard the session is pinned to (src/db/sharding.py)
+WRITE_COMMITTED = "write_committed"  # a user's write committed; publish its position
+
+# stored when the commit LSN could not be read: primary for the whole window
+ALWAYS_PRIMARY = 2 ** 64
+
+
+def parse_lsn(lsn: str) -> int:
+    """'16/B374D848' -> comparable int."""
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+def _ryw_key(user_id) -> str:
+    return f"ryw:{user_id}"
+
+
+# ===================== REPLICAS =====================
+class Replica:
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = False
+        self.replay_lsn = 0
+        self.lag_seconds: Optional[float] = None
+
+
+class ReplicaSet:
+    """
+    Polls every replica for its replay position and lag. A replica is
+    eligible when it answers, is in recovery and lags at most `max_lag`
+    seconds; reads that must see a given write additionally need
+    `replay_lsn` past that write. The cached position is never ahead of
+    the real one, so a stale poll only makes selection more conservative.
+    """
+
+    HEALTH_SQL = text(
+        """
+        SELECT pg_is_in_recovery(),
+               pg_last_wal_replay_lsn()::text,
+               CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+               END
+        """
+    )
+
+    def __init__(
+        self,
+        replicas: List[Replica],
+        max_lag: float = Config.REPLICA_MAX_LAG_SECONDS,
+        interval: float = Config.REPLICA_HEALTH_INTERVAL_SECONDS,
+    ):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as connection:
+                in_recovery, lsn, lag = (await connection.execute(self.HEALTH_SQL)).one()
+        except Exception:
+            logger.warning("Replica %s health check failed", replica.name, exc_info=True)
+            replica.healthy = False
+            db_replica_checks.inc(replica=replica.name, result="error")
+            return
+
+        replica.replay_lsn = parse_lsn(lsn) if lsn else 0
+        replica.lag_seconds = float(lag or 0)
+        replica.healthy = bool(in_recovery) and replica.lag_seconds <= self.max_lag
+        db_replica_checks.inc(
+            replica=replica.name, result="healthy" if replica.healthy else "lagging"
+        )
+
+    def choose(self, min_lsn: int = 0) -> Optional[Replica]:
+        candidates = [
+            r for r in self.replicas if r.healthy and r.replay_lsn >= min_lsn
+        ]
+        return random.choice(candidates) if candidates else None
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.gather(*(self.check(r) for r in self.replicas))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.replicas and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# ===================== ROUTING SESSION =====================
+class RoutingSession(Session):
+    """
+    Primary unless every condition for a replica read holds: we are inside
+    a @replica_read method, the statement is a plain SELECT (no FOR
+    UPDATE), the session is not flushing and has not written, and some
+    replica has caught up with the user's last write. A session sticks
+    to the replica it picked first while that one stays eligible.
+
+    A session pinned to another lot shard sends everything there;
+    replicas only exist for the main database.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, shards=None, **kw):
+        super().__init__(*args, **kw)
+        self.replicas = replicas
+        self.shards = shards
+
+    def on_main_shard(self) -> bool:
+        return self.shards is None or self.info.get(SHARD, self.shards.default) == self.shards.default
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self.on_main_shard() and not self.shards.is_global(mapper):
+            db_routed.inc(target="shard", reason=self.info[SHARD])
+            return self.shards.engines[self.info[SHARD]].sync_engine
+
+        replica = self._replica_for(clause)
+        if replica is not None:
+            return replica.engine.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+    def _replica_for(self, clause) -> Optional[Replica]:
+        if not self.replicas or not self.info.get(READ_REPLICA):
+            return None
+
+        statement = getattr(clause, "_resolved", clause)  # lambda statements
+        if self._flushing or not isinstance(statement, Select):
+            db_routed.inc(target="primary", reason="write")
+            return None
+        if statement._for_update_arg is not None:
+            db_routed.inc(target="primary", reason="locking_read")
+            return None
+        if self.info.get(WROTE):
+            db_routed.inc(target="primary", reason="session_wrote")
+            return None
+
+        # one replica per session keeps its reads monotonic
+        min_lsn = self.info.get(MIN_LSN, 0)
+        replica = self.info.get(PINNED)
+        if replica is None or not replica.healthy or replica.replay_lsn < min_lsn:
+            replica = self.info[PINNED] = self.replicas.choose(min_lsn)
+        if replica is None:
+            db_routed.inc(target="primary", reason="no_replica")
+            return None
+
+        db_routed.inc(target="replica", reason=replica.name)
+        return replica
+
+
+@event.listens_for(Session, "after_flush")
+def _flushed(session, flush_context):
+    session.info[WROTE] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _executed(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[WROTE] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _flag_write_position(session):
+    """
+    Runs inside the sync commit while the connection is still checked out,
+    so it only flags the write; RoutingAsyncSession.commit publishes it.
+    """
+    if not getattr(session, "replicas", None) or not session.info.get(WROTE):
+        return
+    if not session.on_main_shard() or session.info.get(USER_ID) is None:
+        return
+    session.info[WRITE_COMMITTED] = True
+
+
+LSN_SQL = text("SELECT pg_current_wal_lsn()::text")
+
+
+class RoutingAsyncSession(AsyncSession):
+    """
+    After a commit that wrote on behalf of a user, publishes the primary's
+    WAL position so their next requests, on any worker, only read from
+    replicas that replayed it.
+    """
+
+    async def commit(self) -> None:
+        await super().commit()
+        if self.info.pop(WRITE_COMMITTED, False):
+            await self._remember_write_position()
+
+    async def _remember_write_position(self) -> None:
+        user_id = self.info[USER_ID]
+        try:
+            # after COMMIT, so the position includes the commit record; the
+            # session has just handed its connection back, so this is the
+            # only one it holds
+            async with self.bind.connect() as connection:
+                lsn = parse_lsn((await connection.execute(LSN_SQL)).scalar())
+        except Exception:
+            logger.warning("Could not read primary WAL position", exc_info=True)
+            lsn = ALWAYS_PRIMARY
+
+        self.info[MIN_LSN] = max(self.info.get(MIN_LSN, 0), lsn)
+        try:
+            await async_redis_client.set(
+                _ryw_key(user_id), lsn, ex=Config.READ_YOUR_WRITES_SECONDS
+            )
+        except RedisError:
+            logger.warning("Could not record read-your-writes marker", exc_info=True)
+
+
+async def bind_user(session: AsyncSession, user_id: UUID) -> None:
+    """Attach the caller and their last write position to the session."""
+    session.info[USER_ID] = user_id
+    if not getattr(session.sync_session, "replicas", None):
+        return
+    try:
+        marker = await async_redis_client.get(_ryw_key(user_id))
+    except RedisError:
+        marker = ALWAYS_PRIMARY  # can't tell; don't risk a stale read
+    if marker is not None:
+        session.info[MIN_LSN] = max(session.info.get(MIN_LSN, 0), int(marker))
+
+
+# ===================== READ-ONLY SERVICE METHODS =====================
+def replica_read(method):
+    """
+    Marks an async service method as read-only: its SELECTs may be served
+    by a replica. The session is taken from the `session` argument.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        session = kwargs.get("session")
+        if session is None:
+            session = next(a for a in args if isinstance(a, AsyncSession))
+
+        session.info[READ_REPLICA] = session.info.get(READ_REPLICA, 0) + 1
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            session.info[READ_REPLICA] -= 1
+
+    return wrapper
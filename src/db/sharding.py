@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import heapq
+import logging
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, TypeVar
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.core.cache import LRUCache
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.db.models.booking import Booking
+from src.db.models.lot_shard import LotShard
+from src.db.models.parkingslot import ParkingSlot
+from src.db.models.payment import Payment
+from src.db.models.refund_job import RefundJob
+from src.db.routing import SHARD
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAIN_SHARD = "main"
+
+shard_lookups = metrics.counter(
+    "shard_owner_lookups_total",
+    "Owner lookups for shard routing by table and result (cache/scatter/missing)",
+)
+shard_scatters = metrics.counter(
+    "shard_scatter_queries_total",
+    "Queries fanned out to every shard, by purpose",
+)
+
+lot_shards = LotShard.__table__
+
+# tables that only exist on the main database
+GLOBAL_TABLES = frozenset({"users", "lot_shards"})
+
+# how to find the lot that owns a row, given a column value
+OWNER_QUERIES = {
+    ParkingSlot: lambda column, value: select(ParkingSlot.parking_lot_id).where(column == value),
+    Booking: lambda column, value: (
+        select(ParkingSlot.parking_lot_id)
+        .join(Booking, Booking.slot_id == ParkingSlot.uid)
+        .where(column == value)
+    ),
+    Payment: lambda column, value: (
+        select(ParkingSlot.parking_lot_id)
+        .join(Booking, Booking.slot_id == ParkingSlot.uid)
+        .join(Payment, Payment.booking_id == Booking.uid)
+        .where(column == value)
+    ),
+    RefundJob: lambda column, value: select(RefundJob.parking_lot_id).where(column == value),
+}
+
+
+class ShardMovingError(Exception):
+    """Writes to a lot are refused while it is being moved (HTTP 503)."""
+
+
+class Placement(NamedTuple):
+    shard: str
+    moving: bool
+
+
+def parse_shard_urls(value: str) -> Dict[str, str]:
+    """'east=postgresql+asyncpg://...,west=...' -> {name: url}"""
+    shards = {}
+    for item in value.split(","):
+        if item.strip():
+            name, url = item.split("=", 1)
+            shards[name.strip()] = url.strip()
+    return shards
+
+
+# ===================== SHARD MAP =====================
+class ShardMap:
+    """
+    Routes lot-scoped data to the database that owns the lot.
+
+    A lot's slots, bookings, payments, transitions and refund jobs live
+    on the lot's shard; users and the `lot_shards` directory stay on the
+    main database. New lots are placed by rendezvous hashing (adding a
+    shard only moves lots onto the new one); existing placements come
+    from the directory, cached for SHARD_DIRECTORY_TTL_SECONDS.
+
+    Services call `pin` / `pin_owner` before touching lot data; the
+    session's RoutingSession then sends every statement to that shard.
+    One transaction never spans shards. Cross-shard reads go through
+    `scatter` / `gather_sorted`, each shard on its own connection.
+
+    With a single shard every method is a no-op on the request session.
+    """
+
+    def __init__(
+        self,
+        engines: Dict[str, AsyncEngine],
+        default: str = MAIN_SHARD,
+        directory_ttl: float = Config.SHARD_DIRECTORY_TTL_SECONDS,
+    ):
+        self.engines = engines
+        self.default = default
+        self._placements = LRUCache(maxsize=100000, ttl=directory_ttl)
+        # a row never changes lots, so owners can be cached for long
+        self._owners = LRUCache(maxsize=200000, ttl=86400)
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.engines) > 1
+
+    @staticmethod
+    def is_global(mapper) -> bool:
+        return mapper is not None and mapper.local_table.name in GLOBAL_TABLES
+
+    def session(self, shard: str) -> AsyncSession:
+        return AsyncSession(self.engines[shard], expire_on_commit=False)
+
+    # ---------------- PLACEMENT ----------------
+
+    def place(self, lot_id: UUID) -> str:
+        """Rendezvous (highest random weight) hashing over shard names."""
+        return max(
+            self.engines,
+            key=lambda name: hashlib.blake2b(
+                f"{name}:{lot_id}".encode(), digest_size=8
+            ).digest(),
+        )
+
+    async def lookup(self, lot_id: UUID, fresh: bool = False) -> Placement:
+        if not fresh:
+            cached = self._placements.get(lot_id)
+            if isinstance(cached, Placement):
+                return cached
+
+        async with self.engines[self.default].connect() as connection:
+            row = (
+                await connection.execute(
+                    select(lot_shards.c.shard, lot_shards.c.moving).where(
+                        lot_shards.c.parking_lot_id == lot_id
+                    )
+                )
+            ).first()
+
+        # lots created before sharding live on the main database
+        placement = Placement(row.shard, row.moving) if row else Placement(self.default, False)
+        self._placements.set(lot_id, placement)
+        return placement
+
+    async def set_placement(self, lot_id: UUID, shard: str, moving: bool = False) -> None:
+        stmt = pg_insert(lot_shards).values(
+            parking_lot_id=lot_id,
+            shard=shard,
+            moving=moving,
+            updated_at=datetime.now(timezone.utc),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[lot_shards.c.parking_lot_id],
+            set_={"shard": shard, "moving": moving, "updated_at": stmt.excluded.updated_at},
+        )
+        async with self.engines[self.default].begin() as connection:
+            await connection.execute(stmt)
+        self._placements.set(lot_id, Placement(shard, moving))
+
+    async def moving_lots(self) -> List[UUID]:
+        """Lots whose writes are frozen for a move (always none unsharded)."""
+        if not self.sharded:
+            return []
+        async with self.engines[self.default].connect() as connection:
+            result = await connection.execute(
+                select(lot_shards.c.parking_lot_id).where(lot_shards.c.moving)
+            )
+            return list(result.scalars())
+
+    async def assign(self, session: AsyncSession, lot_id: UUID) -> str:
+        """Places a new lot and pins the session to its shard."""
+        if not self.sharded:
+            return self.default
+        shard = self.place(lot_id)
+        await self.set_placement(lot_id, shard)
+        await self._switch(session, shard)
+        return shard
+
+    # ---------------- PINNING ----------------
+
+    async def _switch(self, session: AsyncSession, shard: str) -> None:
+        current = session.info.get(SHARD, self.default)
+        if current != shard and session.in_transaction():
+            if session.new or session.dirty or session.deleted:
+                raise RuntimeError("A transaction cannot span shards")
+            await session.commit()  # ends the read transaction on the old shard
+        session.info[SHARD] = shard
+
+    async def pin(self, session: AsyncSession, lot_id: UUID, write: bool = False) -> str:
+        if not self.sharded:
+            return self.default
+        placement = await self.lookup(lot_id)
+        if write and placement.moving:
+            raise ShardMovingError("Parking lot is being moved; retry shortly")
+        await self._switch(session, placement.shard)
+        return placement.shard
+
+    async def owner_lot(self, model, value, column=None) -> Optional[UUID]:
+        """Lot owning the `model` row whose `column` (default: uid) is `value`."""
+        column = column if column is not None else model.uid
+        key = (column.key, model.__tablename__, value)
+        cached = self._owners.get(key)
+        if isinstance(cached, UUID):
+            shard_lookups.inc(table=model.__tablename__, result="cache")
+            return cached
+
+        stmt = OWNER_QUERIES[model](column, value).limit(1)
+
+        async def find(session: AsyncSession):
+            return (await session.execute(stmt)).scalar()
+
+        found = [lot for lot in await self.scatter(find, purpose="owner") if lot is not None]
+        if not found:
+            shard_lookups.inc(table=model.__tablename__, result="missing")
+            return None
+
+        shard_lookups.inc(table=model.__tablename__, result="scatter")
+        self._owners.set(key, found[0])
+        return found[0]
+
+    async def pin_owner(
+        self,
+        session: AsyncSession,
+        model,
+        value,
+        column=None,
+        write: bool = False,
+    ) -> Optional[str]:
+        """Pins to the shard holding a row; None if no shard has it."""
+        if not self.sharded:
+            return self.default
+        lot_id = await self.owner_lot(model, value, column)
+        if lot_id is None:
+            return None
+        return await self.pin(session, lot_id, write=write)
+
+    # ---------------- SCATTER / GATHER ----------------
+
+    async def scatter(
+        self,
+        fn: Callable[[AsyncSession], Awaitable[T]],
+        session: Optional[AsyncSession] = None,
+        purpose: str = "query",
+    ) -> List[T]:
+        """
+        Runs `fn` once per shard, in parallel, each on its own session.
+        Unsharded, `fn` simply runs on `session` when one is given.
+        """
+        if not self.sharded and session is not None:
+            return [await fn(session)]
+
+        shard_scatters.inc(purpose=purpose)
+
+        async def run(shard: str) -> T:
+            async with self.session(shard) as shard_session:
+                return await fn(shard_session)
+
+        return list(await asyncio.gather(*(run(shard) for shard in self.engines)))
+
+    async def gather_sorted(
+        self,
+        fn: Callable[[AsyncSession], Awaitable[List[Any]]],
+        key: Callable[[Any], Any],
+        limit: Optional[int] = None,
+        session: Optional[AsyncSession] = None,
+        purpose: str = "list",
+    ) -> List[Any]:
+        """
+        Merge of per-shard results that are each sorted by `key` (and each
+        already cut at `limit` after the caller's keyset cursor), so the
+        first `limit` merged rows are the global page.
+        """
+        parts = await self.scatter(fn, session=session, purpose=purpose)
+        merged = heapq.merge(*parts, key=key)
+        return list(islice(merged, limit)) if limit else list(merged)
@@ -0,0 +1,74 @@
+from typing import Iterable
+from uuid import UUID
+from datetime import datetime, timedelta
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from src.core.config import Config
+from src.db.models.booking import Booking
+from src.db.models.parkingslot import ParkingSlot
+from src.db.models.payment import Payment
+from src.db.models.user import User
+
+
+# ===================== HOT-PATH STATEMENTS =====================
+# Built as lambda statements: the construct is created once per lambda
+# (keyed on its code location) and its compiled SQL is cached, so each
+# call only extracts the closure values as bound parameters instead of
+# rebuilding the select and recomputing its cache key. asyncpg then
+# reuses the server-side prepared statement on every pooled connection
+# (DB_PREPARED_STATEMENT_CACHE_SIZE).
+#
+# Closure variables must stay plain values; anything that changes the
+# shape of the SQL belongs outside the lambda.
+
+# No booking is longer than this (enforced on create), so a booking that
+# overlaps [t, ...) starts after t - MAX_BOOKING_DURATION. Adding that
+# bound on start_time lets Postgres prune bookings partitions.
+MAX_BOOKING_DURATION = timedelta(hours=Config.BOOKING_MAX_DURATION_HOURS)
+
+
+def user_by_email(email: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.email == email))
+
+
+def lock_slot(slot_id: UUID) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(ParkingSlot.uid)
+        .where(ParkingSlot.uid == slot_id)
+        .with_for_update()
+    )
+
+
+def slot_overlap(
+    slot_id: UUID,
+    start_time: datetime,
+    end_time: datetime,
+    statuses: Iterable,
+) -> StatementLambdaElement:
+    statuses = list(statuses)
+    earliest_start = start_time - MAX_BOOKING_DURATION
+    return lambda_stmt(
+        lambda: select(Booking.uid)
+        .where(
+            Booking.slot_id == slot_id,
+            Booking.start_time > earliest_start,
+            Booking.start_time < end_time,
+            Booking.end_time > start_time,
+            Booking.status.in_(statuses),
+        )
+        .limit(1)
+    )
+
+
+def payment_by_order_id(razorpay_order_id: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Payment).where(Payment.razorpay_order_id == razorpay_order_id)
+    )
+
+
+def payment_by_payment_id(razorpay_payment_id: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Payment).where(Payment.razorpay_payment_id == razorpay_payment_id)
+    )
@@ -0,0 +1,33 @@
+"""
+Publishes live slot availability to Redis for the SSE streams.
+
+    python -m src.jobs.availability_publisher
+
+Listens for row changes on every shard and publishes coalesced per-lot
+deltas (plus periodic snapshots) on spotzy:availability:<lot>, for lots
+some worker has a stream open for. Run one copy.
+"""
+import asyncio
+import logging
+
+from src.db.database import shard_map
+from src.db.notifications import shard_change_listeners
+from src.services.availability_services import AvailabilityPublisher
+
+
+async def main() -> None:
+    publisher = AvailabilityPublisher()
+    listeners = shard_change_listeners(shard_map)
+    for listener in listeners:
+        listener.subscribe(publisher.on_change, on_reset=publisher.on_reset)
+        listener.start()
+    try:
+        await publisher.run()
+    finally:
+        for listener in listeners:
+            await listener.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Booking partition maintenance.
+
+    python -m src.jobs.booking_partitions ensure
+    python -m src.jobs.booking_partitions archive [--older-than-months 24] [--dry-run]
+    python -m src.jobs.booking_partitions restore 2024-03
+
+Every shard is processed unless --shard picks one. Archives are written
+under BOOKING_ARCHIVE_DIR on this host; restore reads them from there.
+"""
+import argparse
+import asyncio
+import json
+import logging
+from datetime import date
+
+from src.db.database import shard_map
+from src.services.partition_services import partition_manager
+
+
+async def main(args: argparse.Namespace) -> dict:
+    results = {}
+    for shard in [args.shard] if args.shard else shard_map.engines:
+        if args.command == "ensure":
+            await partition_manager.ensure_future(shard)
+            results[shard] = "ok"
+        elif args.command == "archive":
+            results[shard] = await partition_manager.archive(
+                shard, older_than_months=args.older_than_months, dry_run=args.dry_run
+            )
+        else:
+            results[shard] = await partition_manager.restore(shard, args.month)
+    return results
+
+
+def parse_month(value: str) -> date:
+    return date.fromisoformat(f"{value}-01")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create, archive and restore booking partitions")
+    parser.add_argument("--shard", choices=sorted(shard_map.engines), default=None)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("ensure", help="create the next months' partitions")
+
+    archive = commands.add_parser("archive", help="detach, export and drop old months")
+    archive.add_argument("--older-than-months", type=int, default=None)
+    archive.add_argument("--dry-run", action="store_true")
+
+    restore = commands.add_parser("restore", help="load an archived month back")
+    restore.add_argument("month", type=parse_month, help="YYYY-MM")
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asyncio.run(main(parse_args())), indent=2, default=str))
@@ -0,0 +1,41 @@
+"""
+Recomputes every lot's weekly occupancy profile (run e.g. nightly).
+
+    python -m src.jobs.forecast_occupancy [--shard NAME] [--weeks 104]
+
+Needs numpy.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from src.core.config import Config
+from src.db.database import shard_map
+from src.services.forecast_services import OccupancyForecaster
+
+
+async def main(args: argparse.Namespace) -> dict:
+    forecaster = OccupancyForecaster(
+        history_weeks=args.weeks,
+        half_life_weeks=args.half_life,
+        chunk=args.chunk,
+    )
+    return {
+        shard: await forecaster.run_shard(shard)
+        for shard in ([args.shard] if args.shard else shard_map.engines)
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recompute lot occupancy forecasts")
+    parser.add_argument("--shard", choices=sorted(shard_map.engines), default=None)
+    parser.add_argument("--weeks", type=int, default=Config.FORECAST_HISTORY_WEEKS)
+    parser.add_argument("--half-life", type=float, default=Config.FORECAST_HALF_LIFE_WEEKS)
+    parser.add_argument("--chunk", type=int, default=Config.FORECAST_LOT_CHUNK)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asyncio.run(main(parse_args())), indent=2))
@@ -0,0 +1,40 @@
+"""
+Moves a parking lot (with its slots, bookings and payments) to another shard.
+
+    python -m src.jobs.move_lot <lot_uid> <target_shard>
+    python -m src.jobs.move_lot <lot_uid> --cleanup-shard <shard>
+
+Writes to the lot get 503 + Retry-After for about SHARD_MOVE_DRAIN_SECONDS
+plus the copy time; reads keep working. --cleanup-shard deletes a copy a
+crashed move left on a shard that no longer owns the lot.
+"""
+import argparse
+import asyncio
+import json
+import logging
+from uuid import UUID
+
+from src.services.rebalance_services import lot_mover
+
+
+async def main(args: argparse.Namespace) -> dict:
+    if args.cleanup_shard:
+        await lot_mover.cleanup(args.lot_id, args.cleanup_shard)
+        return {"cleaned": args.cleanup_shard}
+    return await lot_mover.move(args.lot_id, args.target)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Move a parking lot to another shard")
+    parser.add_argument("lot_id", type=UUID)
+    parser.add_argument("target", nargs="?", default=None)
+    parser.add_argument("--cleanup-shard", default=None)
+    args = parser.parse_args(argv)
+    if not args.target and not args.cleanup_shard:
+        parser.error("give a target shard or --cleanup-shard")
+    return args
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asyncio.run(main(parse_args())), indent=2))
@@ -0,0 +1,35 @@
+"""
+Publishes committed outbox events to the Redis event stream, one relay
+per lot shard.
+
+    python -m src.jobs.outbox_relay [--shard main]
+"""
+import argparse
+import asyncio
+import functools
+import logging
+
+from src.core.redis import async_redis_client
+from src.db.database import shard_map
+from src.services.outbox_services import OutboxRelay
+
+
+async def main(args: argparse.Namespace) -> None:
+    shards = [args.shard] if args.shard else list(shard_map.engines)
+    await asyncio.gather(*(
+        OutboxRelay(async_redis_client, source=shard).run(
+            functools.partial(shard_map.session, shard)
+        )
+        for shard in shards
+    ))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Relay outbox events to Redis")
+    parser.add_argument("--shard", choices=sorted(shard_map.engines), default=None)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parse_args()))
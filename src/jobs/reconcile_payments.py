@@ -0,0 +1,66 @@
+"""
+Nightly payment reconciliation.
+
+    python -m src.jobs.reconcile_payments --stale-minutes 30 --concurrency 20
+
+Every lot shard is reconciled in turn unless --shard picks one.
+
+Use --fake-orders orders.json to run against a local in-memory gateway
+instead of Razorpay (order id -> list of payment attempts).
+"""
+import argparse
+import asyncio
+import json
+import logging
+from datetime import timedelta
+
+from src.db.database import shard_map
+from src.services.payment_gateway import FakePaymentGateway, RazorpayGateway
+from src.services.reconciliation_services import PaymentReconciliationService
+
+
+def build_gateway(fake_orders_path: str | None):
+    if fake_orders_path:
+        with open(fake_orders_path) as f:
+            return FakePaymentGateway(json.load(f))
+
+    from src.services.payment_services import razorpay_client
+    return RazorpayGateway(razorpay_client)
+
+
+async def main(args: argparse.Namespace) -> dict:
+    service = PaymentReconciliationService(
+        gateway=build_gateway(args.fake_orders),
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+    )
+
+    summaries = {}
+    for shard in [args.shard] if args.shard else shard_map.engines:
+        async with shard_map.session(shard) as session:
+            summary = await service.run(
+                session,
+                stale_after=timedelta(minutes=args.stale_minutes),
+                limit=args.limit,
+                dry_run=args.dry_run,
+            )
+        summaries[shard] = summary.as_dict()
+
+    return summaries
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Reconcile stale payments with the gateway")
+    parser.add_argument("--stale-minutes", type=int, default=30)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--fake-orders", default=None)
+    parser.add_argument("--shard", choices=sorted(shard_map.engines), default=None)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asyncio.run(main(parse_args())), indent=2))
@@ -0,0 +1,37 @@
+"""
+Rolls up the (lot, day) buckets that changed since the last run.
+
+    python -m src.jobs.refresh_rollups           # keep running
+    python -m src.jobs.refresh_rollups --once    # drain once and exit
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from src.core.config import Config
+from src.db.database import shard_map
+from src.services.rollup_services import rollup_service
+
+
+async def main(args: argparse.Namespace) -> dict:
+    if not args.once:
+        await rollup_service.run(interval=args.interval)
+
+    return {
+        shard: await rollup_service.refresh_shard(shard)
+        for shard in ([args.shard] if args.shard else shard_map.engines)
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Refresh dashboard rollups")
+    parser.add_argument("--once", action="store_true")
+    parser.add_argument("--interval", type=float, default=Config.ROLLUP_REFRESH_INTERVAL_SECONDS)
+    parser.add_argument("--shard", choices=sorted(shard_map.engines), default=None)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asyncio.run(main(parse_args())), indent=2))
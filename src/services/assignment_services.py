@@ -0,0 +1,187 @@
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import LRUCache
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.db.models.booking import Booking
+from src.db.models.parkingslot import ParkingSlot
+from src.db.statements import MAX_BOOKING_DURATION
+from src.services.booking_state_machine import BLOCKING_STATUSES
+
+slot_assignments = metrics.counter(
+    "slot_assignments_total",
+    "Lot-level slot picks by outcome (picked/conflict/full)",
+)
+slot_assign_seconds = metrics.summary(
+    "slot_assign_pick_seconds",
+    "Time to pick a slot from a lot timeline (excludes the database check)",
+)
+
+INF = float("inf")
+
+
+class LotTimeline:
+    """
+    Blocking bookings of one lot inside [lo, hi), per slot.
+
+    A slot's bookings never overlap, so its start and end lists are both
+    sorted and one bisect finds the free gap around any window. `pick`
+    is best fit: the slot where the window sits closest to a neighbour
+    (smallest lead or trail), then the one with the tightest gap, so
+    bookings pack end to end and long gaps stay whole for long stays.
+    Gaps are clamped to `horizon` on either side; ties go to
+    slot_number order.
+
+    `reserve` picks and records the window in one synchronous step, so
+    concurrent requests in this worker spread over different slots.
+    """
+
+    def __init__(self, lo: float, hi: float, slots: List[UUID], horizon: float):
+        self.lo = lo
+        self.hi = hi
+        self.horizon = horizon
+        self.slots = slots  # slot_number order
+        self.starts: Dict[UUID, List[float]] = {slot: [] for slot in slots}
+        self.ends: Dict[UUID, List[float]] = {slot: [] for slot in slots}
+
+    def covers(self, start: float, end: float) -> bool:
+        return self.lo <= start - self.horizon and end + self.horizon <= self.hi
+
+    def add(self, slot: UUID, start: float, end: float) -> None:
+        insort(self.starts[slot], start)
+        insort(self.ends[slot], end)
+
+    def remove(self, slot: UUID, start: float, end: float) -> None:
+        starts, ends = self.starts[slot], self.ends[slot]
+        i = bisect_left(starts, start)
+        if i < len(starts) and starts[i] == start and ends[i] == end:
+            del starts[i], ends[i]
+
+    def pick(self, start: float, end: float) -> Optional[UUID]:
+        floor, ceiling = start - self.horizon, end + self.horizon
+        best, best_key = None, (INF, INF)
+        for slot in self.slots:
+            starts, ends = self.starts[slot], self.ends[slot]
+            i = bisect_right(ends, start)  # bookings [0, i) end by `start`
+            if i < len(starts) and starts[i] < end:
+                continue  # overlaps booking i
+            free_from = max(ends[i - 1] if i else -INF, floor)
+            free_to = min(starts[i] if i < len(starts) else INF, ceiling)
+            key = (min(start - free_from, free_to - end), free_to - free_from)
+            if key < best_key:
+                best, best_key = slot, key
+        return best
+
+    def reserve(self, start: float, end: float) -> Optional[UUID]:
+        slot = self.pick(start, end)
+        if slot is not None:
+            self.add(slot, start, end)
+        return slot
+
+
+class SlotAssigner:
+    """
+    Picks a slot for "any slot in this lot" bookings.
+
+    Timelines are built per (lot, day) from one query and cached for
+    SLOT_ASSIGN_INDEX_SECONDS. They only rank candidates: the caller
+    still locks the slot and checks overlap in the database, so a stale
+    timeline costs a retry, never a double booking. A conflict drops the
+    timeline so the retry ranks against fresh data; this worker's own
+    picks are recorded as they happen.
+    """
+
+    def __init__(
+        self,
+        horizon: timedelta = timedelta(hours=Config.SLOT_ASSIGN_HORIZON_HOURS),
+        ttl: float = Config.SLOT_ASSIGN_INDEX_SECONDS,
+    ):
+        self.horizon = horizon
+        self.timelines = LRUCache(maxsize=4096, ttl=ttl)
+
+    @staticmethod
+    def _key(parking_lot_id: UUID, start: datetime) -> tuple:
+        return parking_lot_id, int(start.timestamp() // 86400)
+
+    async def _load(
+        self,
+        session: AsyncSession,
+        parking_lot_id: UUID,
+        lo: datetime,
+        hi: datetime,
+    ) -> LotTimeline:
+        slots = (
+            await session.execute(
+                select(ParkingSlot.uid)
+                .where(ParkingSlot.parking_lot_id == parking_lot_id)
+                .order_by(ParkingSlot.slot_number)
+            )
+        ).scalars().all()
+
+        rows = await session.execute(
+            select(Booking.slot_id, Booking.start_time, Booking.end_time)
+            .join(ParkingSlot, ParkingSlot.uid == Booking.slot_id)
+            .where(
+                ParkingSlot.parking_lot_id == parking_lot_id,
+                Booking.start_time > lo - MAX_BOOKING_DURATION,
+                Booking.start_time < hi,
+                Booking.end_time > lo,
+                Booking.status.in_(BLOCKING_STATUSES),
+            )
+            .order_by(Booking.slot_id, Booking.start_time)
+        )
+
+        timeline = LotTimeline(
+            lo.timestamp(), hi.timestamp(), list(slots), self.horizon.total_seconds()
+        )
+        for slot_id, start_time, end_time in rows:
+            timeline.starts[slot_id].append(start_time.timestamp())
+            timeline.ends[slot_id].append(end_time.timestamp())
+        return timeline
+
+    async def timeline(
+        self,
+        session: AsyncSession,
+        parking_lot_id: UUID,
+        start: datetime,
+        end: datetime,
+    ) -> LotTimeline:
+        """Cached day timeline around the window; `session` must be pinned to the lot."""
+        key = self._key(parking_lot_id, start)
+        cached = self.timelines.get(key)
+        if isinstance(cached, LotTimeline) and cached.covers(start.timestamp(), end.timestamp()):
+            return cached
+
+        day = datetime.fromtimestamp(key[1] * 86400, tz=timezone.utc)
+        day_end = day + timedelta(days=1)
+        timeline = await self._load(
+            session, parking_lot_id, day - self.horizon, max(day_end, end) + self.horizon
+        )
+        if end <= day_end:
+            self.timelines.set(key, timeline)  # longer stays get a one-off timeline
+        return timeline
+
+    def reserve(self, timeline: LotTimeline, start: datetime, end: datetime) -> Optional[UUID]:
+        started = time.perf_counter()
+        slot = timeline.reserve(start.timestamp(), end.timestamp())
+        slot_assign_seconds.observe(time.perf_counter() - started)
+        slot_assignments.inc(outcome="picked" if slot is not None else "full")
+        return slot
+
+    def release(self, timeline: LotTimeline, slot: UUID, start: datetime, end: datetime) -> None:
+        timeline.remove(slot, start.timestamp(), end.timestamp())
+
+    def conflict(self, parking_lot_id: UUID, start: datetime) -> None:
+        """The database disagreed with the timeline; rebuild it next time."""
+        slot_assignments.inc(outcome="conflict")
+        self.timelines.pop(self._key(parking_lot_id, start))
+
+
+slot_assigner = SlotAssigner()
@@ -0,0 +1,384 @@
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import and_, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.core.redis import async_redis_client
+from src.db.database import async_session_maker, shard_map
+from src.db.models.booking import Booking
+from src.db.models.parkingslot import ParkingSlot
+from src.db.routing import replica_read
+from src.db.statements import MAX_BOOKING_DURATION
+from src.services.booking_state_machine import BLOCKING_STATUSES
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "spotzy:availability:"
+
+availability_published = metrics.counter(
+    "availability_published_total",
+    "Availability messages published to Redis, by kind (delta/snapshot)",
+)
+availability_subscribers = metrics.counter(
+    "availability_subscriptions_total",
+    "Live availability subscriptions opened/closed/refused on this worker",
+)
+availability_coalesced = metrics.counter(
+    "availability_coalesced_total",
+    "Messages merged into a subscriber's pending state before it was sent",
+)
+
+
+def channel(parking_lot_id) -> str:
+    return f"{CHANNEL_PREFIX}{parking_lot_id}"
+
+
+def free_now(lot_ids: List[UUID]):
+    """(lot, slot, free) for every slot of the lots, as of now."""
+    now = datetime.now(timezone.utc)
+    busy = exists().where(
+        Booking.slot_id == ParkingSlot.uid,
+        Booking.status.in_(BLOCKING_STATUSES),
+        Booking.start_time > now - MAX_BOOKING_DURATION,
+        Booking.start_time <= now,
+        Booking.end_time > now,
+    )
+    return select(
+        ParkingSlot.parking_lot_id,
+        ParkingSlot.uid,
+        and_(ParkingSlot.is_available, ~busy).label("free"),
+    ).where(ParkingSlot.parking_lot_id.in_(lot_ids))
+
+
+async def load_states(session: AsyncSession, lot_ids: List[UUID]) -> Dict[str, Dict[str, bool]]:
+    states: Dict[str, Dict[str, bool]] = {str(lot): {} for lot in lot_ids}
+    for lot, slot, free in (await session.execute(free_now(lot_ids))).all():
+        states[str(lot)][str(slot)] = bool(free)
+    return states
+
+
+# ======================= PUBLISHER (ONE PROCESS) =======================
+class AvailabilityPublisher:
+    """
+    Turns row-change notifications into per-lot availability messages.
+
+    Notifications for slots and bookings only mark their lot dirty; every
+    AVAILABILITY_COALESCE_SECONDS the dirty lots that have subscribers
+    somewhere (PUBSUB CHANNELS) are re-read in one query per shard,
+    diffed against what was last published, and only changed slots go
+    out as a `delta`. Every AVAILABILITY_RESYNC_SECONDS each watched lot
+    also gets a full `snapshot`, which covers bookings starting or ending
+    with no write, lost notifications, and subscribers that missed a
+    message. Run it once (src/jobs/availability_publisher.py); a second
+    copy only duplicates messages, which subscribers apply idempotently.
+    """
+
+    def __init__(
+        self,
+        redis=async_redis_client,
+        coalesce: float = Config.AVAILABILITY_COALESCE_SECONDS,
+        resync: float = Config.AVAILABILITY_RESYNC_SECONDS,
+    ):
+        self.redis = redis
+        self.coalesce = coalesce
+        self.resync = resync
+        self._dirty: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._published: Dict[str, Dict[str, bool]] = {}
+        self._next_resync = 0.0
+
+    # ---------------- NOTIFICATIONS ----------------
+
+    def on_change(self, change: dict) -> None:
+        if change.get("table") in ("parking_slots", "bookings") and change.get("lot"):
+            self._dirty.add(change["lot"])
+            self._wakeup.set()
+
+    def on_reset(self) -> None:
+        self._next_resync = 0.0  # anything may have changed
+        self._wakeup.set()
+
+    # ---------------- PUBLISHING ----------------
+
+    async def _watched(self) -> Set[str]:
+        channels = await self.redis.pubsub_channels(f"{CHANNEL_PREFIX}*")
+        return {name[len(CHANNEL_PREFIX):] for name in channels}
+
+    async def _read(self, lots: Iterable[str]) -> Dict[str, Dict[str, bool]]:
+        by_shard: Dict[str, List[UUID]] = defaultdict(list)
+        for lot in lots:
+            by_shard[(await shard_map.lookup(UUID(lot))).shard].append(UUID(lot))
+
+        states = {}
+        for shard, lot_ids in by_shard.items():
+            async with shard_map.session(shard) as session:
+                states.update(await load_states(session, lot_ids))
+        return states
+
+    async def _publish(self, lot: str, kind: str, slots: Dict[str, bool]) -> None:
+        message = json.dumps({"type": kind, "lot": lot, "slots": slots}, separators=(",", ":"))
+        await self.redis.publish(channel(lot), message)
+        availability_published.inc(kind=kind)
+
+    async def flush(self) -> int:
+        dirty, self._dirty = self._dirty, set()
+        full = time.monotonic() >= self._next_resync
+
+        watched = await self._watched()
+        for lot in set(self._published) - watched:
+            del self._published[lot]  # nobody listens; forget it
+        lots = watched if full else dirty & watched
+        if not lots:
+            return 0
+
+        states = await self._read(lots)
+        sent = 0
+        for lot, slots in states.items():
+            previous = self._published.get(lot)
+            self._published[lot] = slots
+            if full or previous is None:
+                await self._publish(lot, "snapshot", slots)
+                sent += 1
+                continue
+            changed = {slot: free for slot, free in slots.items() if previous.get(slot) != free}
+            if changed:
+                await self._publish(lot, "delta", changed)
+                sent += 1
+
+        if full:
+            self._next_resync = time.monotonic() + self.resync
+        return sent
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=max(self._next_resync - time.monotonic(), 0.01),
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await asyncio.sleep(self.coalesce)  # let the burst finish
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Availability publish failed; retrying")
+                self._next_resync = 0.0
+                await asyncio.sleep(1.0)
+
+
+# ======================= SUBSCRIBERS (EVERY WORKER) =======================
+class AvailabilitySubscriber:
+    """
+    One open stream. Messages are merged into `pending` (slot -> free)
+    instead of queued, so a burst or a slow client costs at most one
+    entry per slot of the lot, and the client gets the latest state.
+    """
+
+    __slots__ = ("lot", "pending", "full", "resync", "wakeup")
+
+    def __init__(self, lot: str):
+        self.lot = lot
+        self.pending: Dict[str, bool] = {}
+        self.full = False
+        self.resync = False
+        self.wakeup = asyncio.Event()
+
+    def push(self, kind: str, slots: Dict[str, bool]) -> None:
+        if self.wakeup.is_set():
+            availability_coalesced.inc()
+        if kind == "snapshot":
+            self.pending = dict(slots)
+            self.full = True
+        else:
+            self.pending.update(slots)
+        self.wakeup.set()
+
+    def take(self):
+        """(kind, slots) to send now."""
+        self.wakeup.clear()
+        pending, self.pending = self.pending, {}
+        kind = "snapshot" if self.full else "delta"
+        self.full = False
+        return kind, pending
+
+
+class AvailabilityHub:
+    """
+    Per-worker fan-out: one Redis pub/sub connection, subscribed to the
+    channels of lots that have at least one local stream, and a single
+    reader task that hands each message to those streams. Idle streams
+    cost a coroutine waiting on an Event. After a Redis error every
+    stream is flagged to reload its snapshot from the database.
+    """
+
+    def __init__(
+        self,
+        redis=async_redis_client,
+        max_subscribers: int = Config.AVAILABILITY_MAX_SUBSCRIBERS,
+    ):
+        self.redis = redis
+        self.max_subscribers = max_subscribers
+        self.pubsub = None
+        self._subscribers: Dict[str, Set[AvailabilitySubscriber]] = defaultdict(set)
+        self._count = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------------- SUBSCRIPTIONS ----------------
+
+    async def subscribe(self, parking_lot_id: UUID) -> Optional[AvailabilitySubscriber]:
+        """None when this worker is at AVAILABILITY_MAX_SUBSCRIBERS."""
+        if self._count >= self.max_subscribers:
+            availability_subscribers.inc(event="refused")
+            return None
+
+        lot = str(parking_lot_id)
+        subscriber = AvailabilitySubscriber(lot)
+        async with self._lock:
+            if self.pubsub is None:
+                self.pubsub = self.redis.pubsub()
+            if not self._subscribers.get(lot):
+                await self.pubsub.subscribe(channel(lot))
+            self._subscribers[lot].add(subscriber)
+            self._count += 1
+        self.start()
+        availability_subscribers.inc(event="opened")
+        return subscriber
+
+    async def unsubscribe(self, subscriber: AvailabilitySubscriber) -> None:
+        async with self._lock:
+            local = self._subscribers.get(subscriber.lot)
+            if not local or subscriber not in local:
+                return
+            local.discard(subscriber)
+            self._count -= 1
+            if not local:
+                del self._subscribers[subscriber.lot]
+                try:
+                    await self.pubsub.unsubscribe(channel(subscriber.lot))
+                except RedisError:
+                    logger.warning("Unsubscribe from %s failed", subscriber.lot, exc_info=True)
+        availability_subscribers.inc(event="closed")
+
+    # ---------------- READER ----------------
+
+    def _dispatch(self, message: dict) -> None:
+        try:
+            data = json.loads(message["data"])
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed availability message: %r", message)
+            return
+        for subscriber in self._subscribers.get(data.get("lot"), ()):
+            subscriber.push(data["type"], data["slots"])
+
+    def _resync_all(self) -> None:
+        for local in self._subscribers.values():
+            for subscriber in local:
+                subscriber.resync = True
+                subscriber.wakeup.set()
+
+    async def run(self) -> None:
+        backoff = 0.5
+        while True:
+            try:
+                message = await self.pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                backoff = 0.5
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    "Availability pub/sub failed; retrying in %.1fs", backoff, exc_info=True
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                # messages were lost; redis-py resubscribes on reconnect
+                self._resync_all()
+                continue
+            if message is not None:
+                self._dispatch(message)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+            self.pubsub = None
+
+
+# ======================= STREAM =======================
+class AvailabilityService:
+
+    def __init__(self, hub: AvailabilityHub):
+        self.hub = hub
+
+    @replica_read
+    async def get_snapshot(self, parking_lot_id: UUID, session: AsyncSession) -> Dict[str, bool]:
+        await shard_map.pin(session, parking_lot_id)
+        return (await load_states(session, [parking_lot_id]))[str(parking_lot_id)]
+
+    async def _reload(self, parking_lot_id: UUID) -> Dict[str, bool]:
+        async with async_session_maker() as session:
+            return await self.get_snapshot(parking_lot_id, session)
+
+    @staticmethod
+    def _event(kind: str, lot: str, slots: Dict[str, bool]) -> str:
+        data = json.dumps({"lot": lot, "slots": slots}, separators=(",", ":"))
+        return f"event: {kind}\ndata: {data}\n\n"
+
+    async def stream(
+        self,
+        parking_lot_id: UUID,
+        subscriber: AvailabilitySubscriber,
+        snapshot: Dict[str, bool],
+        heartbeat: float = Config.AVAILABILITY_HEARTBEAT_SECONDS,
+    ):
+        """
+        Server-Sent Events: the snapshot, then deltas (and periodic
+        snapshots) as they arrive, with a comment line as heartbeat.
+        """
+        lot = subscriber.lot
+        try:  # the endpoint also unsubscribes in case this never starts
+            yield self._event("snapshot", lot, snapshot)
+            while True:
+                try:
+                    await asyncio.wait_for(subscriber.wakeup.wait(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+
+                if subscriber.resync:
+                    subscriber.resync = False
+                    subscriber.push("snapshot", await self._reload(parking_lot_id))
+                kind, slots = subscriber.take()
+                if slots or kind == "snapshot":
+                    yield self._event(kind, lot, slots)
+        finally:
+            await self.hub.unsubscribe(subscriber)
+
+
+availability_hub = AvailabilityHub()
+availability_service = AvailabilityService(availability_hub)
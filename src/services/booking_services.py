@@ -1,12 +1,72 @@
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
 
-from sqlmodel import select
+from sqlalchemy import DateTime, and_, bindparam, func, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.db.database import shard_map
 from src.db.models.booking import Booking, BookingStatus
 from src.db.models.parkingslot import ParkingSlot
-from src.db.accessor.schemas.booking import BookingCreate
+from src.db.accessor.schemas.booking import BookingCreate, BookingSeriesCreate
+from src.db.projections import booking_rows
+from src.core.config import Config
+from src.db.statements import MAX_BOOKING_DURATION, lock_slot, slot_overlap
+from src.db.routing import replica_read
+from src.services.assignment_services import slot_assigner
+from src.services.booking_state_machine import (
+    BLOCKING_STATUSES,
+    USER_CANCELLABLE,
+    booking_state_machine,
+)
+
+
+class BookingConflictError(ValueError):
+    """Occurrences of a series that overlap existing bookings."""
+
+    def __init__(self, conflicts: List[dict]):
+        super().__init__(f"{len(conflicts)} occurrence(s) overlap existing bookings")
+        self.conflicts = conflicts
+
+
+def expand_series(spec: BookingSeriesCreate) -> List[tuple[datetime, datetime]]:
+    """(start, end) of every occurrence, in order, as aware datetimes."""
+    if spec.end_date < spec.start_date:
+        raise ValueError("start_date must not be after end_date")
+
+    offset = spec.utc_offset_minutes
+    if offset is None:
+        offset = Config.BOOKING_UTC_OFFSET_MINUTES
+    tz = timezone(timedelta(minutes=offset))
+    overnight = timedelta(days=1 if spec.end_time <= spec.start_time else 0)
+    weekdays = set(spec.weekdays)
+
+    occurrences = []
+    day = spec.start_date
+    while day <= spec.end_date:
+        if day.weekday() in weekdays:
+            if len(occurrences) == Config.BOOKING_SERIES_MAX_OCCURRENCES:
+                raise ValueError(
+                    f"A series can have at most {Config.BOOKING_SERIES_MAX_OCCURRENCES} occurrences"
+                )
+            occurrences.append((
+                datetime.combine(day, spec.start_time, tzinfo=tz),
+                datetime.combine(day + overnight, spec.end_time, tzinfo=tz),
+            ))
+        day += timedelta(days=1)
+    return occurrences
+
+
+# the series' occurrences as a row set, numbered from 1 in order
+series_occurrences = (
+    func.unnest(
+        bindparam("starts", type_=ARRAY(DateTime(timezone=True))),
+        bindparam("ends", type_=ARRAY(DateTime(timezone=True))),
+    )
+    .table_valued("start_time", "end_time", with_ordinality="idx")
+    .render_derived(name="occurrences")
+)
 
 
 class BookingService:
@@ -24,74 +84,331 @@ class BookingService:
         if booking_data.start_time >= booking_data.end_time:
             raise ValueError("start_time must be before end_time")
 
+        # bounds that keep bookings inside the live partitions
+        if booking_data.end_time - booking_data.start_time > MAX_BOOKING_DURATION:
+            raise ValueError(
+                f"Bookings can last at most {Config.BOOKING_MAX_DURATION_HOURS} hours"
+            )
+        # past months may have no partition (before the first booking, or
+        # archived), where the INSERT would fail
+        if booking_data.start_time < datetime.now(timezone.utc) - timedelta(
+            minutes=Config.BOOKING_START_GRACE_MINUTES
+        ):
+            raise ValueError("start_time must not be in the past")
+        if booking_data.start_time > datetime.now(timezone.utc) + timedelta(
+            days=Config.BOOKING_MAX_ADVANCE_DAYS
+        ):
+            raise ValueError(
+                f"Bookings open at most {Config.BOOKING_MAX_ADVANCE_DAYS} days ahead"
+            )
+
+        if booking_data.slot_id is None:
+            return await self._create_in_lot(booking_data, user_id, session)
+
+        # the booking lives on the slot's lot shard
+        if await shard_map.pin_owner(
+            session, ParkingSlot, booking_data.slot_id, write=True
+        ) is None:
+            raise ValueError("Parking slot not found")
+
         # 🔒 lock parking slot row (prevents race conditions)
-        slot_stmt = (
-            select(ParkingSlot)
-            .where(ParkingSlot.uid == booking_data.slot_id)
-            .with_for_update()
-        )
-        slot = (await session.execute(slot_stmt)).one_or_none()
+        slot = (
+            await session.execute(lock_slot(booking_data.slot_id))
+        ).scalar_one_or_none()
 
         if not slot:
             raise ValueError("Parking slot not found")
 
+        if not await self._slot_free(session, booking_data.slot_id, booking_data):
+            raise ValueError("Slot already booked for this time")
+
+        return await self._insert(session, booking_data.slot_id, booking_data, user_id)
+
+    async def _create_in_lot(
+        self,
+        booking_data: BookingCreate,
+        user_id: UUID,
+        session: AsyncSession
+    ) -> Booking:
+        """
+        "Any slot in this lot": the lot's timeline proposes a best-fit
+        slot, which is then locked and checked exactly like an explicit
+        one. If another worker got there first the timeline is rebuilt
+        and the next pick tried.
+        """
+        parking_lot_id = booking_data.parking_lot_id
+        start, end = booking_data.start_time, booking_data.end_time
+
+        await shard_map.pin(session, parking_lot_id, write=True)
+
+        for _ in range(Config.SLOT_ASSIGN_ATTEMPTS):
+            timeline = await slot_assigner.timeline(session, parking_lot_id, start, end)
+            if not timeline.slots:
+                raise ValueError("Parking lot not found or has no slots")
+
+            slot_id = slot_assigner.reserve(timeline, start, end)
+            if slot_id is None:
+                raise ValueError("No free slot in this parking lot for this time")
+
+            try:
+                slot = (await session.execute(lock_slot(slot_id))).scalar_one_or_none()
+                if slot and await self._slot_free(session, slot_id, booking_data):
+                    return await self._insert(session, slot_id, booking_data, user_id)
+            except BaseException:
+                slot_assigner.release(timeline, slot_id, start, end)
+                raise
+
+            # taken (or deleted) behind the timeline's back
+            slot_assigner.release(timeline, slot_id, start, end)
+            slot_assigner.conflict(parking_lot_id, start)
+            await session.rollback()  # let go of the slot lock before the next pick
+
+        raise ValueError("Could not assign a slot; please retry")
+
+    async def _slot_free(
+        self,
+        session: AsyncSession,
+        slot_id: UUID,
+        booking_data: BookingCreate
+    ) -> bool:
         # ⏱ overlap check
-        overlap_stmt = select(Booking).where(
-            Booking.slot_id == booking_data.slot_id,
-            Booking.start_time < booking_data.end_time,
-            Booking.end_time > booking_data.start_time,
-            Booking.status == BookingStatus.PAYMENT_PENDING,
+        overlap_stmt = slot_overlap(
+            slot_id,
+            booking_data.start_time,
+            booking_data.end_time,
+            BLOCKING_STATUSES,
         )
+        return (await session.execute(overlap_stmt)).first() is None
 
-        overlap = (await session.execute(overlap_stmt)).first()
-        if overlap:
-            raise ValueError("Slot already booked for this time")
-
+    async def _insert(
+        self,
+        session: AsyncSession,
+        slot_id: UUID,
+        booking_data: BookingCreate,
+        user_id: UUID
+    ) -> Booking:
         # ✅ create booking
         booking = Booking(
             user_id=user_id,
-            slot_id=booking_data.slot_id,
+            slot_id=slot_id,
             start_time=booking_data.start_time,
             end_time=booking_data.end_time,
             status=BookingStatus.PAYMENT_PENDING,
         )
 
         session.add(booking)
+        booking_state_machine.transition(
+            session,
+            booking,
+            BookingStatus.PAYMENT_PENDING,
+            actor_id=user_id,
+            reason="created",
+            is_new=True,
+        )
         await session.commit()
         await session.refresh(booking)
 
         return booking
 
+    # ======================= RECURRING BOOKINGS =======================
+
+    async def _series_conflicts(
+        self,
+        session: AsyncSession,
+        slot_id: UUID,
+        occurrences: List[tuple[datetime, datetime]],
+    ) -> Dict[int, UUID]:
+        """
+        One join of all occurrences against the slot's blocking bookings
+        in the series' span: {occurrence index: an overlapping booking}.
+        """
+        occ = series_occurrences
+        stmt = (
+            select(occ.c.idx, Booking.uid)
+            .join(
+                Booking,
+                and_(
+                    Booking.slot_id == slot_id,
+                    Booking.start_time < occ.c.end_time,
+                    Booking.end_time > occ.c.start_time,
+                ),
+            )
+            .where(
+                Booking.start_time > occurrences[0][0] - MAX_BOOKING_DURATION,
+                Booking.start_time < occurrences[-1][1],
+                Booking.status.in_(BLOCKING_STATUSES),
+            )
+        )
+        starts, ends = zip(*occurrences)
+        result = await session.execute(stmt, {"starts": list(starts), "ends": list(ends)})
+
+        conflicts: Dict[int, UUID] = {}
+        for idx, booking_id in result:
+            conflicts.setdefault(idx - 1, booking_id)
+        return conflicts
+
+    async def create_series(
+        self,
+        spec: BookingSeriesCreate,
+        user_id: UUID,
+        session: AsyncSession
+    ) -> dict:
+        """
+        Expands the pattern, then under the slot lock checks every
+        occurrence with one query and books the free ones with one
+        multi-row INSERT, in a single transaction. Without
+        `skip_conflicts` any conflict raises BookingConflictError and
+        nothing is booked.
+        """
+        occurrences = expand_series(spec)
+        if not occurrences:
+            raise ValueError("The pattern has no occurrences in that date range")
+
+        if occurrences[0][1] - occurrences[0][0] > MAX_BOOKING_DURATION:
+            raise ValueError(
+                f"Bookings can last at most {Config.BOOKING_MAX_DURATION_HOURS} hours"
+            )
+        if occurrences[0][0] < datetime.now(timezone.utc) - timedelta(
+            minutes=Config.BOOKING_START_GRACE_MINUTES
+        ):
+            raise ValueError("The series must not start in the past")
+        if occurrences[-1][0] > datetime.now(timezone.utc) + timedelta(
+            days=Config.BOOKING_MAX_ADVANCE_DAYS
+        ):
+            raise ValueError(
+                f"Bookings open at most {Config.BOOKING_MAX_ADVANCE_DAYS} days ahead"
+            )
+
+        if await shard_map.pin_owner(
+            session, ParkingSlot, spec.slot_id, write=True
+        ) is None:
+            raise ValueError("Parking slot not found")
+
+        # 🔒 same slot lock as a single booking, held for the whole series
+        slot = (
+            await session.execute(lock_slot(spec.slot_id))
+        ).scalar_one_or_none()
+
+        if not slot:
+            raise ValueError("Parking slot not found")
+
+        taken = await self._series_conflicts(session, spec.slot_id, occurrences)
+        conflicts = [
+            {"start_time": start, "end_time": end, "booking_id": taken[i]}
+            for i, (start, end) in enumerate(occurrences)
+            if i in taken
+        ]
+        if conflicts and not spec.skip_conflicts:
+            raise BookingConflictError(conflicts)
+
+        bookings = await booking_state_machine.bulk_create(
+            session,
+            [
+                {"slot_id": spec.slot_id, "user_id": user_id, "start_time": start, "end_time": end}
+                for i, (start, end) in enumerate(occurrences)
+                if i not in taken
+            ],
+            actor_id=user_id,
+            reason="series",
+        )
+        await session.commit()
+
+        return {"bookings": bookings, "conflicts": conflicts}
+
     # ======================= GET SINGLE BOOKING =======================
 
+    @replica_read
     async def get_booking_by_uid(
         self,
         booking_uid: UUID,
         session: AsyncSession
     ) -> Booking | None:
+        if await shard_map.pin_owner(session, Booking, booking_uid) is None:
+            return None
         return await session.get(Booking, booking_uid)
 
     # ======================= USER BOOKINGS =======================
 
+    # List reads return read-only BookingRow records (src/db/projections.py),
+    # ordered by (start_time, uid). Pass the last row's pair as `after` for
+    # the next page. `upcoming` keeps to bookings not yet over, which only
+    # live in the current and future partitions.
+
+    @staticmethod
+    def _upcoming(stmt):
+        now = datetime.now(timezone.utc)
+        return stmt.where(
+            Booking.start_time > now - MAX_BOOKING_DURATION,
+            Booking.end_time > now,
+        )
+
+    async def _list_bookings(
+        self,
+        session: AsyncSession,
+        stmt,
+        limit: int | None,
+        after: tuple[datetime, UUID] | None,
+        purpose: str,
+    ):
+        """Keyset page per shard, merged into the global page."""
+        stmt = stmt.order_by(Booking.start_time, Booking.uid)
+        if after is not None:
+            stmt = stmt.where(tuple_(Booking.start_time, Booking.uid) > after)
+        if limit:
+            stmt = stmt.limit(limit)
+
+        return await shard_map.gather_sorted(
+            lambda shard_session: booking_rows.fetch(shard_session, stmt),
+            key=lambda row: (row.start_time, row.uid),
+            limit=limit,
+            session=session,
+            purpose=purpose,
+        )
+
+    @replica_read
     async def get_user_bookings(
         self,
         user_id: UUID,
-        session: AsyncSession
+        session: AsyncSession,
+        limit: int | None = None,
+        after: tuple[datetime, UUID] | None = None,
+        upcoming: bool = False
+    ):
+        stmt = booking_rows.select().where(Booking.user_id == user_id)
+        if upcoming:
+            stmt = self._upcoming(stmt)
+        return await self._list_bookings(session, stmt, limit, after, "user_bookings")
+
+    # ======================= ALL BOOKINGS (ADMIN) =======================
+
+    @replica_read
+    async def get_all_bookings(
+        self,
+        session: AsyncSession,
+        status: BookingStatus | None = None,
+        limit: int | None = None,
+        after: tuple[datetime, UUID] | None = None,
+        upcoming: bool = False
     ):
-        stmt = select(Booking).where(Booking.user_id == user_id)
-        result = await session.execute(stmt)
-        return result.scalars().all()
+        stmt = booking_rows.select()
+        if status:
+            stmt = stmt.where(Booking.status == status)
+        if upcoming:
+            stmt = self._upcoming(stmt)
+        return await self._list_bookings(session, stmt, limit, after, "all_bookings")
 
     # ======================= SLOT BOOKINGS (ADMIN) =======================
 
+    @replica_read
     async def get_slot_bookings(
         self,
         slot_id: UUID,
         session: AsyncSession
     ):
-        stmt = select(Booking).where(Booking.slot_id == slot_id)
-        result = await session.execute(stmt)
-        return result.scalars().all()
+        if await shard_map.pin_owner(session, ParkingSlot, slot_id) is None:
+            return []
+        stmt = booking_rows.select().where(Booking.slot_id == slot_id)
+        return await booking_rows.fetch(session, stmt)
 
     # ======================= CANCEL BOOKING =======================
 
@@ -102,6 +419,8 @@ class BookingService:
         session: AsyncSession
     ) -> Booking | None:
 
+        if await shard_map.pin_owner(session, Booking, booking_uid, write=True) is None:
+            return None
         booking = await session.get(Booking, booking_uid)
         if not booking:
             return None
@@ -110,16 +429,70 @@ class BookingService:
         if booking.user_id != user_id:
             raise PermissionError("You cannot cancel this booking")
 
-        # 🚫 already cancelled/completed
-        if booking.status != BookingStatus.BOOKED:
-            raise ValueError("Only active bookings can be cancelled")
+        # 🚫 only unpaid bookings; paid ones go through refunds
+        if booking.status not in USER_CANCELLABLE:
+            raise ValueError("Only unpaid bookings can be cancelled")
 
-        booking.status = BookingStatus.CANCELLED
+        booking_state_machine.transition(
+            session,
+            booking,
+            BookingStatus.CANCELLED,
+            allowed_from=USER_CANCELLABLE,
+            actor_id=user_id,
+            reason="user_cancel",
+        )
 
         await session.commit()
         await session.refresh(booking)
 
         return booking
 
+    # ======================= BULK STATUS (ADMIN) =======================
+
+    async def bulk_transition(
+        self,
+        booking_ids: list[UUID],
+        to_status: BookingStatus,
+        actor_id: UUID,
+        session: AsyncSession
+    ):
+        """
+        One UPDATE per shard holding any of the bookings; each shard
+        commits on its own, so a failure can leave earlier shards applied.
+        Bookings of a lot being moved between shards are left alone (and
+        so come back as skipped), like sensor updates.
+        """
+        moving = await shard_map.moving_lots()
+
+        async def apply(shard_session):
+            ids = booking_ids
+            if moving:
+                frozen = set(
+                    (
+                        await shard_session.execute(
+                            select(Booking.uid)
+                            .join(ParkingSlot, ParkingSlot.uid == Booking.slot_id)
+                            .where(
+                                Booking.uid.in_(booking_ids),
+                                ParkingSlot.parking_lot_id.in_(moving),
+                            )
+                        )
+                    ).scalars()
+                )
+                ids = [uid for uid in booking_ids if uid not in frozen]
+
+            rows = await booking_state_machine.bulk_transition(
+                shard_session,
+                ids,
+                to_status,
+                actor_id=actor_id,
+                reason="admin_bulk",
+            )
+            await shard_session.commit()
+            return rows
+
+        parts = await shard_map.scatter(apply, session=session, purpose="bulk_status")
+        return [row for rows in parts for row in rows]
+
 
 booking_service = BookingService()
\ No newline at end of file
@@ -0,0 +1,305 @@
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, Iterable, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.db.models.booking import Booking, BookingStatus
+from src.db.models.booking_transition import BookingTransition
+from src.services.outbox_services import BOOKING_STATUS_CHANGED, outbox_service
+
+bookings_table = Booking.__table__
+transitions_table = BookingTransition.__table__
+
+
+# ======================= TRANSITION TABLE =======================
+# None is "not created yet". BOOKED is what a captured payment produces
+# today; CONFIRMED is accepted everywhere BOOKED is.
+TRANSITIONS: Dict[Optional[BookingStatus], FrozenSet[BookingStatus]] = {
+    None: frozenset({BookingStatus.PAYMENT_PENDING}),
+    BookingStatus.PAYMENT_PENDING: frozenset({
+        BookingStatus.BOOKED,
+        BookingStatus.CONFIRMED,
+        BookingStatus.PAYMENT_FAILED,
+        BookingStatus.CANCELLED,
+    }),
+    BookingStatus.PAYMENT_FAILED: frozenset({BookingStatus.CANCELLED}),
+    BookingStatus.BOOKED: frozenset({BookingStatus.COMPLETED, BookingStatus.CANCELLED}),
+    BookingStatus.CONFIRMED: frozenset({BookingStatus.COMPLETED, BookingStatus.CANCELLED}),
+    BookingStatus.COMPLETED: frozenset(),
+    BookingStatus.CANCELLED: frozenset(),
+}
+
+# statuses that hold the slot for their time range
+BLOCKING_STATUSES = frozenset({
+    BookingStatus.PAYMENT_PENDING,
+    BookingStatus.BOOKED,
+    BookingStatus.CONFIRMED,
+})
+
+# a user may only cancel bookings that were never paid; paid bookings go
+# through the refund flow
+USER_CANCELLABLE = frozenset({
+    BookingStatus.PAYMENT_PENDING,
+    BookingStatus.PAYMENT_FAILED,
+})
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+# ======================= AUDIT WRITER =======================
+class TransitionAuditWriter:
+    """
+    Buffers audit rows on the session and writes them with one multi-row
+    INSERT right before the session commits (or earlier, once the buffer
+    reaches `max_buffer`). Rows therefore commit or roll back together
+    with the transitions they describe.
+    """
+
+    INFO_KEY = "booking_transition_audit"
+
+    def __init__(self, max_buffer: int = 1000):
+        self.max_buffer = max_buffer
+
+    def _buffer(self, sync_session: Session) -> List[dict]:
+        return sync_session.info.setdefault(self.INFO_KEY, [])
+
+    async def add_many(self, session: AsyncSession, rows: Iterable[dict]) -> None:
+        buffer = self._buffer(session.sync_session)
+        buffer.extend(rows)
+        if len(buffer) >= self.max_buffer:
+            await session.run_sync(self.flush)
+
+    def add(self, session: AsyncSession, row: dict) -> None:
+        self._buffer(session.sync_session).append(row)
+
+    def flush(self, sync_session: Session) -> None:
+        rows = sync_session.info.pop(self.INFO_KEY, None)
+        if rows:
+            sync_session.execute(insert(transitions_table), rows)
+
+    def discard(self, sync_session: Session) -> None:
+        sync_session.info.pop(self.INFO_KEY, None)
+
+
+audit_writer = TransitionAuditWriter()
+
+
+@event.listens_for(Session, "before_commit")
+def _flush_transition_audit(sync_session: Session) -> None:
+    audit_writer.flush(sync_session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_transition_audit(sync_session: Session) -> None:
+    audit_writer.discard(sync_session)
+
+
+def _audit_row(booking_id, from_status, to_status, actor_id, reason) -> dict:
+    return {
+        "booking_id": booking_id,
+        "from_status": from_status.value if from_status is not None else None,
+        "to_status": to_status.value,
+        "actor_id": actor_id,
+        "reason": reason,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+# ======================= STATE MACHINE =======================
+class BookingStateMachine:
+
+    def can_transition(
+        self,
+        from_status: Optional[BookingStatus],
+        to_status: BookingStatus,
+    ) -> bool:
+        return to_status in TRANSITIONS.get(from_status, frozenset())
+
+    def sources(
+        self,
+        to_status: BookingStatus,
+        allowed_from: Optional[Iterable[BookingStatus]] = None,
+    ) -> FrozenSet[BookingStatus]:
+        """Statuses that may move to `to_status`, optionally narrowed."""
+        sources = frozenset(
+            status
+            for status, targets in TRANSITIONS.items()
+            if status is not None and to_status in targets
+        )
+        if allowed_from is not None:
+            sources &= frozenset(allowed_from)
+        return sources
+
+    # ---------------- SINGLE BOOKING ----------------
+
+    def transition(
+        self,
+        session: AsyncSession,
+        booking: Booking,
+        to_status: BookingStatus,
+        allowed_from: Optional[Iterable[BookingStatus]] = None,
+        actor_id: Optional[UUID] = None,
+        reason: Optional[str] = None,
+        is_new: bool = False,
+    ) -> Booking:
+        """
+        Validates and applies one transition on a loaded booking, and
+        queues its outbox event and audit row. The caller commits.
+        """
+        from_status = None if is_new else booking.status
+        allowed_from = frozenset(allowed_from) if allowed_from is not None else None
+
+        if not self.can_transition(from_status, to_status) or (
+            allowed_from is not None and from_status not in allowed_from
+        ):
+            raise InvalidTransition(
+                f"Cannot move booking from {from_status.value if from_status else 'new'} "
+                f"to {to_status.value}"
+            )
+
+        booking.status = to_status
+        outbox_service.booking_transition(session, booking, from_status, to_status)
+        audit_writer.add(
+            session, _audit_row(booking.uid, from_status, to_status, actor_id, reason)
+        )
+        return booking
+
+    # ---------------- MANY NEW BOOKINGS ----------------
+
+    async def bulk_create(
+        self,
+        session: AsyncSession,
+        rows: List[dict],
+        actor_id: Optional[UUID] = None,
+        reason: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Inserts PAYMENT_PENDING bookings with one multi-row INSERT and
+        queues their outbox events and audit rows in bulk. Each dict
+        needs slot_id, user_id, start_time and end_time; the full rows
+        (uid, status, timestamps filled in) are returned. The caller
+        commits.
+        """
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "uid": uuid4(),
+                "status": BookingStatus.PAYMENT_PENDING,
+                "created_at": now,
+                "updated_at": now,
+                **row,
+            }
+            for row in rows
+        ]
+        if not rows:
+            return rows
+
+        # one INSERT ... VALUES (...), (...) rather than an executemany
+        await session.execute(insert(bookings_table).values(rows))
+
+        await outbox_service.record_many(
+            session,
+            (
+                {
+                    "aggregate_type": "booking",
+                    "aggregate_id": row["uid"],
+                    "event_type": BOOKING_STATUS_CHANGED,
+                    "payload": outbox_service.booking_payload(
+                        row["uid"], row["slot_id"], row["user_id"],
+                        None, BookingStatus.PAYMENT_PENDING,
+                    ),
+                }
+                for row in rows
+            ),
+        )
+        await audit_writer.add_many(
+            session,
+            (
+                _audit_row(row["uid"], None, BookingStatus.PAYMENT_PENDING, actor_id, reason)
+                for row in rows
+            ),
+        )
+        return rows
+
+    # ---------------- MANY BOOKINGS, ONE STATEMENT ----------------
+
+    async def bulk_transition(
+        self,
+        session: AsyncSession,
+        booking_ids: Iterable[UUID],
+        to_status: BookingStatus,
+        allowed_from: Optional[Iterable[BookingStatus]] = None,
+        actor_id: Optional[UUID] = None,
+        reason: Optional[str] = None,
+    ) -> List:
+        """
+        Moves every listed booking whose current status may reach
+        `to_status`, in a single statement:
+
+            WITH old AS (SELECT uid, status FROM bookings
+                         WHERE uid IN (...) AND status IN (...) FOR UPDATE)
+            UPDATE bookings SET status = :to FROM old
+            WHERE bookings.uid = old.uid
+            RETURNING bookings.uid, old.status, ...
+
+        Returns the changed rows (uid, from_status, slot_id, user_id);
+        bookings in any other status are left alone. The caller commits.
+        """
+        booking_ids = list(booking_ids)
+        sources = self.sources(to_status, allowed_from)
+        if not booking_ids or not sources:
+            return []
+
+        old = (
+            select(bookings_table.c.uid, bookings_table.c.status)
+            .where(
+                bookings_table.c.uid.in_(booking_ids),
+                bookings_table.c.status.in_(sources),
+            )
+            .with_for_update()
+            .cte("old")
+        )
+
+        result = await session.execute(
+            update(bookings_table)
+            .where(bookings_table.c.uid == old.c.uid)
+            .values(status=to_status)
+            .returning(
+                bookings_table.c.uid,
+                old.c.status.label("from_status"),
+                bookings_table.c.slot_id,
+                bookings_table.c.user_id,
+            )
+        )
+        rows = result.all()
+
+        await outbox_service.record_many(
+            session,
+            (
+                {
+                    "aggregate_type": "booking",
+                    "aggregate_id": row.uid,
+                    "event_type": BOOKING_STATUS_CHANGED,
+                    "payload": outbox_service.booking_payload(
+                        row.uid, row.slot_id, row.user_id, row.from_status, to_status
+                    ),
+                }
+                for row in rows
+            ),
+        )
+        await audit_writer.add_many(
+            session,
+            (
+                _audit_row(row.uid, row.from_status, to_status, actor_id, reason)
+                for row in rows
+            ),
+        )
+        return rows
+
+
+booking_state_machine = BookingStateMachine()
@@ -0,0 +1,103 @@
+import asyncio
+import gzip
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.http_cache import make_etag
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.core.responses import dumps
+from src.services.parking_services import parking_service
+
+snapshot_requests = metrics.counter(
+    "catalog_snapshot_requests_total",
+    "Lot directory reads by result (hit/rebuild)",
+)
+snapshot_build_seconds = metrics.summary(
+    "catalog_snapshot_build_seconds",
+    "Time spent rebuilding the lot directory snapshot",
+)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Pre-serialized GET /lots payload for one catalog version."""
+    version: int
+    etag: str
+    body: bytes
+    gzip_body: bytes
+    built_at: float
+
+
+class LotDirectory:
+    """
+    Per-worker, immutable snapshot of the lot directory.
+
+    Requests read `self._snapshot` without touching the database; a
+    change notification for parking_lots (or a listener reset) marks it
+    stale, and the next request rebuilds it once and swaps the reference.
+    A notification that lands mid-rebuild leaves the new snapshot stale,
+    so it is rebuilt again. `max_age` bounds staleness if notifications
+    are silently lost.
+    """
+
+    def __init__(self, max_age: float = Config.CATALOG_SNAPSHOT_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._generation = 0
+        self._valid_generation = -1
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._generation += 1
+
+    def on_change(self, change: dict) -> None:
+        if change.get("table") == "parking_lots":
+            self.invalidate()
+
+    def _fresh(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        return (
+            snapshot is not None
+            and self._valid_generation == self._generation
+            and time.monotonic() - snapshot.built_at < self.max_age
+        )
+
+    async def get(self, session: AsyncSession) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if self._fresh(snapshot):
+            snapshot_requests.inc(result="hit")
+            return snapshot
+
+        async with self._lock:
+            if self._fresh(self._snapshot):
+                snapshot_requests.inc(result="hit")
+                return self._snapshot
+            snapshot_requests.inc(result="rebuild")
+            return await self._rebuild(session)
+
+    async def _rebuild(self, session: AsyncSession) -> CatalogSnapshot:
+        started = time.perf_counter()
+        generation = self._generation
+
+        version = await parking_service.get_catalog_version("lots", session)
+        lots = await parking_service.get_all_parking_lots(session, version=version)
+        body = dumps(lots)
+
+        snapshot = CatalogSnapshot(
+            version=version,
+            etag=make_etag("lots", version),
+            body=body,
+            gzip_body=gzip.compress(body, mtime=0),
+            built_at=time.monotonic(),
+        )
+        self._snapshot = snapshot
+        self._valid_generation = generation
+
+        snapshot_build_seconds.observe(time.perf_counter() - started)
+        return snapshot
+
+
+lot_directory = LotDirectory()
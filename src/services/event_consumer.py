@@ -0,0 +1,114 @@
+import asyncio
+import json
+import logging
+from typing import List, Tuple
+
+from redis.exceptions import ResponseError
+
+from src.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class StreamConsumer:
+    """
+    Base class for consumers of the domain event stream.
+
+    Each consumer belongs to a Redis consumer group; the group's
+    last-delivered id plus per-message XACK is the checkpoint. A message
+    is acked only after `handle` returns, so a crash redelivers it:
+    on restart the consumer first drains its own pending list, and
+    messages left pending by dead consumers are taken over with
+    XAUTOCLAIM once idle for `claim_idle_ms`. Delivery is at-least-once;
+    `handle` should be idempotent (events carry `source` and `outbox_id`;
+    outbox ids are only unique per source shard).
+    """
+
+    def __init__(
+        self,
+        redis,
+        group: str,
+        consumer: str,
+        stream: str = Config.EVENT_STREAM,
+        batch_size: int = 100,
+        block_ms: int = 5000,
+        claim_idle_ms: int = 60000,
+    ):
+        self.redis = redis
+        self.group = group
+        self.consumer = consumer
+        self.stream = stream
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+
+    async def handle(self, event: dict) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def decode(fields: dict) -> dict:
+        event = dict(fields)
+        event["outbox_id"] = int(event["outbox_id"])
+        event.setdefault("source", "main")  # published before sharding
+        event["payload"] = json.loads(event["payload"])
+        return event
+
+    async def ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _process(self, entries: List[Tuple[str, dict]]) -> int:
+        acked = 0
+        for message_id, fields in entries:
+            if not fields:  # trimmed from the stream while pending
+                await self.redis.xack(self.stream, self.group, message_id)
+                continue
+            try:
+                await self.handle(self.decode(fields))
+            except Exception:
+                logger.exception("Consumer %s failed on %s", self.consumer, message_id)
+                continue
+            await self.redis.xack(self.stream, self.group, message_id)
+            acked += 1
+        return acked
+
+    async def _read(self, start_id: str):
+        response = await self.redis.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.stream: start_id},
+            count=self.batch_size,
+            block=None if start_id == "0" else self.block_ms,
+        )
+        return response[0][1] if response else []
+
+    async def run(self) -> None:
+        await self.ensure_group()
+
+        # 1️⃣ redeliver what this consumer read but never acked
+        while True:
+            entries = await self._read("0")
+            if not entries or await self._process(entries) == 0:
+                break
+
+        # 2️⃣ steady state: take over stale messages, then read new ones
+        while True:
+            _, claimed, *_ = await self.redis.xautoclaim(
+                self.stream,
+                self.group,
+                self.consumer,
+                min_idle_time=self.claim_idle_ms,
+                start_id="0-0",
+                count=self.batch_size,
+            )
+            if claimed:
+                await self._process(claimed)
+
+            entries = await self._read(">")
+            if entries:
+                await self._process(entries)
+            else:
+                await asyncio.sleep(0)
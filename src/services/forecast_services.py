@@ -0,0 +1,344 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import LRUCache
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.db.database import shard_map
+from src.db.models.lot_forecast import LotOccupancyForecast
+from src.db.routing import replica_read
+from src.db.statements import MAX_BOOKING_DURATION
+from src.services.rollup_services import OCCUPYING_STATUSES
+
+try:
+    import numpy as np
+except ImportError:  # only the forecasting job needs it
+    np = None
+
+logger = logging.getLogger(__name__)
+
+forecast_lookups = metrics.counter(
+    "forecast_lookups_total",
+    "Occupancy forecast reads by result (cache/db/missing)",
+)
+forecast_seconds = metrics.summary(
+    "forecast_compute_seconds",
+    "Time to compute one chunk of lot profiles, by stage",
+)
+
+HOUR = 3600
+WEEK_HOURS = 168
+WEEK = timedelta(weeks=1)
+MAX_FORECAST_HOURS = 2 * WEEK_HOURS
+
+forecasts = LotOccupancyForecast.__table__
+
+# one row per lot: its slot count and every occupying booking clipped to
+# [since, until) as epoch seconds, aggregated server-side into arrays
+HISTORY_SQL = text(
+    """
+    SELECT l.uid,
+           l.created_at,
+           slots.n AS slot_count,
+           history.starts,
+           history.ends
+    FROM parking_lots l
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS n FROM parking_slots WHERE parking_lot_id = l.uid
+    ) AS slots
+    CROSS JOIN LATERAL (
+        SELECT array_agg(extract(epoch FROM greatest(b.start_time, :since))::bigint) AS starts,
+               array_agg(extract(epoch FROM least(b.end_time, :until))::bigint) AS ends
+        FROM parking_slots s
+        JOIN bookings b ON b.slot_id = s.uid
+        WHERE s.parking_lot_id = l.uid
+          AND b.status IN :statuses
+          AND b.start_time > :earliest
+          AND b.start_time < :until
+          AND b.end_time > :since
+    ) AS history
+    ORDER BY l.uid
+    """
+).bindparams(bindparam("statuses", expanding=True))
+
+
+# ======================= VECTORIZED CORE =======================
+def expand_intervals(lot_index, starts, ends, n_lots: int, hours: int):
+    """
+    Occupied seconds per (lot, hour) for intervals given as seconds from
+    the window start, already clipped to [0, hours * 3600).
+
+    No per-interval loop: each interval contributes its partial first and
+    last hours through np.bincount, and its whole hours in between
+    through a +1/-1 difference array that a row-wise cumsum turns into
+    counts.
+    """
+    keep = ends > starts
+    lot_index, starts, ends = lot_index[keep], starts[keep], ends[keep]
+
+    first = starts // HOUR
+    last = (ends - 1) // HOUR
+    base = lot_index.astype(np.int64) * hours
+    size = n_lots * hours
+
+    single = first == last
+    seconds = np.bincount(
+        (base + first)[single], weights=(ends - starts)[single], minlength=size
+    )
+
+    multi = ~single
+    base, first, last = base[multi], first[multi], last[multi]
+    seconds += np.bincount(
+        base + first, weights=(first + 1) * HOUR - starts[multi], minlength=size
+    )
+    seconds += np.bincount(
+        base + last, weights=ends[multi] - last * HOUR, minlength=size
+    )
+
+    # hours strictly between first and last are fully occupied
+    diff = np.bincount(base + first + 1, minlength=size) - np.bincount(
+        base + last, minlength=size
+    )
+    full = np.cumsum(diff.reshape(n_lots, hours), axis=1)
+
+    return seconds.reshape(n_lots, hours) + full * HOUR
+
+
+def seasonal_profiles(seconds, slot_counts, first_weeks, half_life_weeks: float):
+    """
+    (lots, weeks * 168) occupied seconds -> (lots, 168) occupancy in 0..1.
+
+    Each week is weighted by 0.5 ** (age / half_life); weeks before a
+    lot existed (`first_weeks`) do not count.
+    """
+    n_lots, hours = seconds.shape
+    weeks = hours // WEEK_HOURS
+
+    capacity = np.maximum(slot_counts, 1).astype(np.float64)[:, None] * HOUR
+    occupancy = np.clip(seconds / capacity, 0.0, 1.0)
+    occupancy = occupancy.reshape(n_lots, weeks, WEEK_HOURS)
+
+    age = np.arange(weeks - 1, -1, -1, dtype=np.float64)
+    weights = np.power(0.5, age / half_life_weeks)[None, :] * (
+        np.arange(weeks)[None, :] >= first_weeks[:, None]
+    )
+    total = weights.sum(axis=1)
+
+    profile = np.einsum("lwh,lw->lh", occupancy, weights)
+    return np.divide(
+        profile, total[:, None], out=np.zeros_like(profile), where=total[:, None] > 0
+    )
+
+
+def encode_profiles(profiles) -> List[bytes]:
+    """Occupancy 0..1 -> 168 bytes of whole percents per lot."""
+    encoded = np.rint(profiles * 100).astype(np.uint8)
+    return [row.tobytes() for row in encoded]
+
+
+# ======================= JOB =======================
+@dataclass
+class ForecastWindow:
+    since: datetime  # a local Monday 00:00, as UTC
+    until: datetime
+    weeks: int
+
+    @classmethod
+    def ending_before(cls, now: datetime, weeks: int, offset_minutes: int) -> "ForecastWindow":
+        """The last `weeks` complete local weeks before `now`."""
+        offset = timedelta(minutes=offset_minutes)
+        local = (now.astimezone(timezone.utc) + offset).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        monday = local - timedelta(days=local.weekday())
+        until = monday - offset
+        return cls(since=until - weeks * WEEK, until=until, weeks=weeks)
+
+    @property
+    def hours(self) -> int:
+        return self.weeks * WEEK_HOURS
+
+
+class OccupancyForecaster:
+    """
+    Recomputes every lot's weekly occupancy profile on one shard.
+
+    Lots are streamed in chunks of FORECAST_LOT_CHUNK; for each chunk the
+    booking intervals become flat NumPy arrays, are expanded into an
+    hourly (lots x hours) matrix, folded into weeks and averaged with
+    recency weights, then upserted as 168-byte profiles.
+    """
+
+    def __init__(
+        self,
+        history_weeks: int = Config.FORECAST_HISTORY_WEEKS,
+        half_life_weeks: float = Config.FORECAST_HALF_LIFE_WEEKS,
+        offset_minutes: int = Config.FORECAST_UTC_OFFSET_MINUTES,
+        chunk: int = Config.FORECAST_LOT_CHUNK,
+    ):
+        self.history_weeks = history_weeks
+        self.half_life_weeks = half_life_weeks
+        self.offset_minutes = offset_minutes
+        self.chunk = chunk
+
+    def compute_chunk(self, rows: Sequence, window: ForecastWindow) -> List[dict]:
+        if np is None:
+            raise RuntimeError("numpy is required to compute forecasts")
+
+        started = time.perf_counter()
+        since = window.since.timestamp()
+        lengths = np.fromiter((len(r.starts or ()) for r in rows), dtype=np.int64, count=len(rows))
+        lot_index = np.repeat(np.arange(len(rows)), lengths)
+        starts = np.fromiter(
+            (t for r in rows for t in (r.starts or ())), dtype=np.int64, count=int(lengths.sum())
+        ) - int(since)
+        ends = np.fromiter(
+            (t for r in rows for t in (r.ends or ())), dtype=np.int64, count=int(lengths.sum())
+        ) - int(since)
+        forecast_seconds.observe(time.perf_counter() - started, stage="load")
+
+        started = time.perf_counter()
+        seconds = expand_intervals(
+            lot_index,
+            np.clip(starts, 0, window.hours * HOUR),
+            np.clip(ends, 0, window.hours * HOUR),
+            len(rows),
+            window.hours,
+        )
+        slot_counts = np.array([r.slot_count for r in rows], dtype=np.int64)
+        first_weeks = np.array(
+            [
+                max(0, math.ceil((r.created_at - window.since) / WEEK))
+                if r.created_at else 0
+                for r in rows
+            ],
+            dtype=np.int64,
+        )
+        profiles = seasonal_profiles(seconds, slot_counts, first_weeks, self.half_life_weeks)
+        forecast_seconds.observe(time.perf_counter() - started, stage="compute")
+
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                "parking_lot_id": r.uid,
+                "profile": profile,
+                "slot_count": r.slot_count,
+                "weeks": max(0, window.weeks - int(first)),
+                "computed_at": now,
+            }
+            for r, profile, first in zip(rows, encode_profiles(profiles), first_weeks)
+        ]
+
+    async def _save(self, session: AsyncSession, values: List[dict]) -> None:
+        stmt = pg_insert(forecasts)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[forecasts.c.parking_lot_id],
+                set_={
+                    "profile": stmt.excluded.profile,
+                    "slot_count": stmt.excluded.slot_count,
+                    "weeks": stmt.excluded.weeks,
+                    "computed_at": stmt.excluded.computed_at,
+                },
+            ),
+            values,
+        )
+
+    async def run_shard(self, shard: str, now: Optional[datetime] = None) -> int:
+        window = ForecastWindow.ending_before(
+            now or datetime.now(timezone.utc), self.history_weeks, self.offset_minutes
+        )
+        params = {
+            "since": window.since,
+            "until": window.until,
+            "earliest": window.since - MAX_BOOKING_DURATION,
+            "statuses": [status.value for status in OCCUPYING_STATUSES],
+        }
+
+        total = 0
+        async with shard_map.session(shard) as reader, shard_map.session(shard) as writer:
+            result = await reader.stream(
+                HISTORY_SQL.execution_options(yield_per=self.chunk), params
+            )
+            async for rows in result.partitions():
+                await self._save(writer, self.compute_chunk(rows, window))
+                await writer.commit()
+                total += len(rows)
+        return total
+
+
+# ======================= READS =======================
+class ForecastService:
+    """Serves predictions from the stored profiles, cached per worker."""
+
+    def __init__(self, cache_seconds: float = Config.FORECAST_CACHE_SECONDS):
+        self.cache = LRUCache(maxsize=20000, ttl=cache_seconds)
+        self.offset = timedelta(minutes=Config.FORECAST_UTC_OFFSET_MINUTES)
+
+    @replica_read
+    async def _load(self, parking_lot_id: UUID, session: AsyncSession):
+        await shard_map.pin(session, parking_lot_id)
+        forecast = await session.get(LotOccupancyForecast, parking_lot_id)
+        if forecast is None:
+            return None
+        return forecast.profile, forecast.slot_count
+
+    async def get_profile(self, parking_lot_id: UUID, session: AsyncSession):
+        """(profile bytes, slot_count) or None before the first forecast run."""
+        cached = self.cache.get(parking_lot_id)
+        if isinstance(cached, tuple):
+            forecast_lookups.inc(result="cache")
+            return cached
+
+        loaded = await self._load(parking_lot_id, session)
+        if loaded is None:
+            forecast_lookups.inc(result="missing")
+            return None
+        forecast_lookups.inc(result="db")
+        self.cache.set(parking_lot_id, loaded)
+        return loaded
+
+    async def predict(
+        self,
+        parking_lot_id: UUID,
+        start: datetime,
+        hours: int,
+        session: AsyncSession,
+    ) -> List[dict] | None:
+        """Predicted occupancy for `hours` hours from the hour containing `start`."""
+        if hours <= 0 or hours > MAX_FORECAST_HOURS:
+            raise ValueError(f"Pick 1 to {MAX_FORECAST_HOURS} hours")
+
+        forecast = await self.get_profile(parking_lot_id, session)
+        if forecast is None:
+            return None
+        profile, slot_count = forecast
+
+        first = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        predictions = []
+        for i in range(hours):
+            hour = first + timedelta(hours=i)
+            local = hour + self.offset
+            bucket = local.weekday() * 24 + local.hour
+            occupancy = profile[bucket] / 100
+            predictions.append({
+                "hour": hour,
+                "weekday": local.weekday(),
+                "local_hour": local.hour,
+                "occupancy": occupancy,
+                "expected_free_slots": round(slot_count * (1 - occupancy)),
+            })
+        return predictions
+
+
+occupancy_forecaster = OccupancyForecaster()
+forecast_service = ForecastService()
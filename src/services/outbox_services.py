@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import Config
+from src.db.models.booking import Booking, BookingStatus
+from src.db.models.outbox import OutboxEvent
+from src.db.models.payment import Payment, PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+outbox_table = OutboxEvent.__table__
+
+BOOKING_STATUS_CHANGED = "booking.status_changed"
+PAYMENT_STATUS_CHANGED = "payment.status_changed"
+
+
+def _value(status) -> Optional[str]:
+    return status.value if status is not None else None
+
+
+# =========================
+# OUTBOX (WRITE SIDE)
+# =========================
+class OutboxService:
+    """
+    Records domain events on the caller's session. Nothing is committed
+    here: the event becomes visible exactly when the state change does.
+    """
+
+    def record(
+        self,
+        session: AsyncSession,
+        aggregate_type: str,
+        aggregate_id: UUID,
+        event_type: str,
+        payload: dict,
+    ) -> OutboxEvent:
+        event = OutboxEvent(
+            aggregate_type=aggregate_type,
+            aggregate_id=aggregate_id,
+            event_type=event_type,
+            payload=payload,
+        )
+        session.add(event)
+        return event
+
+    def booking_transition(
+        self,
+        session: AsyncSession,
+        booking: Booking,
+        from_status: Optional[BookingStatus],
+        to_status: BookingStatus,
+    ) -> OutboxEvent:
+        return self.record(
+            session,
+            "booking",
+            booking.uid,
+            BOOKING_STATUS_CHANGED,
+            self.booking_payload(
+                booking.uid, booking.slot_id, booking.user_id, from_status, to_status
+            ),
+        )
+
+    def payment_transition(
+        self,
+        session: AsyncSession,
+        payment: Payment,
+        from_status: Optional[PaymentStatus],
+        to_status: PaymentStatus,
+    ) -> OutboxEvent:
+        return self.record(
+            session,
+            "payment",
+            payment.uid,
+            PAYMENT_STATUS_CHANGED,
+            self.payment_payload(payment.uid, payment.booking_id, from_status, to_status),
+        )
+
+    @staticmethod
+    def booking_payload(booking_id, slot_id, user_id, from_status, to_status) -> dict:
+        return {
+            "booking_id": str(booking_id),
+            "slot_id": str(slot_id) if slot_id else None,
+            "user_id": str(user_id) if user_id else None,
+            "from": _value(from_status),
+            "to": _value(to_status),
+        }
+
+    @staticmethod
+    def payment_payload(payment_id, booking_id, from_status, to_status) -> dict:
+        return {
+            "payment_id": str(payment_id),
+            "booking_id": str(booking_id),
+            "from": _value(from_status),
+            "to": _value(to_status),
+        }
+
+    async def record_many(self, session: AsyncSession, events: Iterable[dict]) -> None:
+        """
+        Bulk variant for set-based updates. Each dict needs aggregate_type,
+        aggregate_id, event_type and payload. One multi-row INSERT.
+        """
+        rows = [
+            {**event, "created_at": datetime.now(timezone.utc)}
+            for event in events
+        ]
+        if rows:
+            await session.execute(insert(outbox_table), rows)
+
+
+# =========================
+# RELAY (OUTBOX -> REDIS STREAM)
+# =========================
+class OutboxRelay:
+    """
+    Moves committed outbox rows to a Redis Stream.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED, published with one
+    pipelined XADD batch and marked published in the same transaction.
+    A crash between XADD and COMMIT republishes the batch, so delivery
+    is at-least-once; consumers dedupe on (`source`, `outbox_id`). Run a
+    single relay per lot shard (`source` names it); order is only kept
+    within one shard.
+    """
+
+    def __init__(
+        self,
+        redis,
+        stream: str = Config.EVENT_STREAM,
+        batch_size: int = 500,
+        maxlen: int = Config.EVENT_STREAM_MAXLEN,
+        source: str = "main",
+    ):
+        self.redis = redis
+        self.source = source
+        self.stream = stream
+        self.batch_size = batch_size
+        self.maxlen = maxlen
+        self._last_purge = 0.0
+
+    async def publish_batch(self, session: AsyncSession) -> int:
+        result = await session.execute(
+            select(outbox_table)
+            .where(outbox_table.c.published_at.is_(None))
+            .order_by(outbox_table.c.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = result.all()
+        if not rows:
+            await session.rollback()
+            return 0
+
+        pipe = self.redis.pipeline(transaction=False)
+        for row in rows:
+            pipe.xadd(
+                self.stream,
+                {
+                    "outbox_id": row.id,
+                    "source": self.source,
+                    "type": row.event_type,
+                    "aggregate_type": row.aggregate_type,
+                    "aggregate_id": str(row.aggregate_id),
+                    "payload": json.dumps(row.payload, separators=(",", ":")),
+                    "created_at": row.created_at.isoformat(),
+                },
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        await pipe.execute()
+
+        await session.execute(
+            update(outbox_table)
+            .where(outbox_table.c.id.in_([row.id for row in rows]))
+            .values(published_at=datetime.now(timezone.utc))
+        )
+        await session.commit()
+        return len(rows)
+
+    async def purge_published(self, session: AsyncSession) -> None:
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=Config.OUTBOX_RETENTION_HOURS)
+        await session.execute(
+            delete(outbox_table).where(outbox_table.c.published_at < cutoff)
+        )
+        await session.commit()
+
+    async def run(self, session_maker, poll_interval: float = 0.5) -> None:
+        while True:
+            try:
+                async with session_maker() as session:
+                    published = await self.publish_batch(session)
+
+                    if time.monotonic() - self._last_purge > 3600:
+                        await self.purge_published(session)
+                        self._last_purge = time.monotonic()
+            except Exception:
+                logger.exception("Outbox relay iteration failed (%s)", self.source)
+                published = 0
+
+            # keep draining while there is a backlog
+            if published < self.batch_size:
+                await asyncio.sleep(poll_interval)
+
+
+outbox_service = OutboxService()
@@ -6,11 +6,20 @@ from datetime import datetime
 
 from starlette.exceptions import HTTPException
 
+from src.core.cache import catalog_cache
+
+from src.db.database import shard_map
+from src.db.models.catalog_version import CatalogVersion
 from src.db.models.parkinglot import ParkingLot
 from src.db.models.parkingslot import ParkingSlot
 from src.db.models.booking import Booking
-from src.db.accessor.schemas.parkinglot import ParkingLotCreate
+from src.db.accessor.schemas.parkinglot import ParkingLotCreate, ParkingLotResponse
 from src.db.accessor.schemas.parkingslot import  SlotCreate
+from src.db.projections import parking_lot_rows
+from src.db.routing import replica_read
+from src.core.responses import ListSerializer
+
+parking_lot_list = ListSerializer(ParkingLotResponse)
 
 
 class ParkingService:
@@ -24,38 +33,91 @@ class ParkingService:
         admin_id:UUID
     ) -> ParkingLot:
         parking_lot = ParkingLot(**parking_data.model_dump(), admin_id=admin_id)
+        await shard_map.assign(session, parking_lot.uid)
 
         session.add(parking_lot)
         await session.commit()
         await session.refresh(parking_lot)
 
+        await catalog_cache.bump("lots")
         return parking_lot
 
-    async def get_all_parking_lots(
+    # ======================= CATALOG VERSIONS =======================
+
+    @replica_read
+    async def get_catalog_version(
         self,
+        scope: str,
         session: AsyncSession
-    ):
-        result = await session.execute(select(ParkingLot))
-        return result.scalars().all()
+    ) -> int:
+        """
+        Trigger-maintained version of "lots" or "lot:<uid>"; 0 if never
+        changed. Each shard counts its own lot changes, so "lots" is the
+        sum over shards (it only grows: moving a lot bumps both sides).
+        """
+        stmt = select(CatalogVersion.version).where(CatalogVersion.scope == scope)
+
+        async def version(shard_session) -> int:
+            return (await shard_session.execute(stmt)).scalar_one_or_none() or 0
+
+        if scope.startswith("lot:"):
+            await shard_map.pin(session, UUID(scope[4:]))
+            return await version(session)
+        return sum(await shard_map.scatter(version, session=session, purpose="catalog_version"))
+
+    # Cached reads return plain dicts shaped like ParkingLotResponse.
 
+    @replica_read
+    async def get_all_parking_lots(
+        self,
+        session: AsyncSession,
+        version: int | None = None
+    ) -> list[dict]:
+
+        async def load():
+            stmt = parking_lot_rows.select().order_by(ParkingLot.uid)
+            lots = await shard_map.gather_sorted(
+                lambda shard_session: parking_lot_rows.fetch(shard_session, stmt),
+                key=lambda lot: lot.uid,
+                session=session,
+                purpose="lots",
+            )
+            return parking_lot_list.dump_jsonable(lots)
+
+        return await catalog_cache.get_or_load("lots", "all", load, version=version)
+
+    @replica_read
     async def get_parking_lot_by_uid(
         self,
         parking_lot_id: UUID,
         session: AsyncSession
-    ) -> ParkingLot | None:
-        return await session.get(ParkingLot, parking_lot_id)
+    ) -> dict | None:
+
+        async def load():
+            await shard_map.pin(session, parking_lot_id)
+            lot = await session.get(ParkingLot, parking_lot_id)
+            if not lot:
+                return None
+            return ParkingLotResponse.model_validate(lot).model_dump(mode="json")
+
+        return await catalog_cache.get_or_load("lots", f"lot:{parking_lot_id}", load)
 
+    @replica_read
     async def search_parking_lots(
         self,
         query: str,
         session: AsyncSession
     ):
-        statement = select(ParkingLot).where(
+        statement = parking_lot_rows.select().where(
             ParkingLot.name.ilike(f"%{query}%") |
             ParkingLot.address.ilike(f"%{query}%")
+        ).order_by(ParkingLot.uid)
+        return await shard_map.gather_sorted(
+            lambda shard_session: parking_lot_rows.fetch(shard_session, statement),
+            key=lambda lot: lot.uid,
+            session=session,
+            purpose="lot_search",
         )
-        result = await session.execute(statement)
-        return result.scalars().all()
 
 
 parking_service=ParkingService()
\ No newline at end of file
@@ -0,0 +1,278 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.db.database import shard_map
+from src.db.sharding import ShardMap
+
+logger = logging.getLogger(__name__)
+
+partition_events = metrics.counter(
+    "booking_partition_events_total",
+    "Booking partition maintenance by shard and action (created/archived/restored)",
+)
+
+PARTITION_NAME = re.compile(r"^bookings_(\d{4})_(\d{2})$")
+
+PARTITIONS_SQL = text(
+    r"""
+    SELECT c.relname, i.inhparent IS NOT NULL
+    FROM pg_class c
+    LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+    WHERE c.relkind = 'r'
+      AND c.relnamespace = current_schema()::regnamespace
+      AND c.relname ~ '^bookings_\d{4}_\d{2}$'
+    ORDER BY c.relname
+    """
+)
+
+
+def month_start(value: datetime | date) -> date:
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc).date()
+    return value.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"bookings_{month:%Y_%m}"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class BookingPartition:
+    name: str
+    month: date
+    attached: bool  # False: detached by an archive run that did not finish
+
+
+class BookingPartitionManager:
+    """
+    Keeps the monthly bookings partitions in shape on every shard.
+
+    Future months are created ahead of time (`ensure_future`, run by the
+    API workers every BOOKING_PARTITION_CHECK_SECONDS) so inserts never
+    miss a partition. `archive` detaches months older than
+    BOOKING_ARCHIVE_AFTER_MONTHS, writes each one to
+    <archive_dir>/<shard>/bookings_YYYY_MM.csv.gz with a JSON manifest,
+    and drops the table; `restore` loads a file into a fresh table and
+    attaches it again. Archiving and restoring run from the
+    `src.jobs.booking_partitions` CLI on the host that keeps the files.
+    """
+
+    def __init__(
+        self,
+        shards: ShardMap = shard_map,
+        archive_dir: str = Config.BOOKING_ARCHIVE_DIR,
+        months_ahead: int = Config.BOOKING_PARTITIONS_AHEAD_MONTHS,
+        archive_after_months: int = Config.BOOKING_ARCHIVE_AFTER_MONTHS,
+        check_interval: float = Config.BOOKING_PARTITION_CHECK_SECONDS,
+    ):
+        self.shards = shards
+        self.archive_dir = Path(archive_dir)
+        self.months_ahead = months_ahead
+        self.archive_after_months = archive_after_months
+        self.check_interval = check_interval
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------------- INSPECTION ----------------
+
+    async def partitions(self, connection: AsyncConnection) -> List[BookingPartition]:
+        result = await connection.execute(PARTITIONS_SQL)
+        partitions = []
+        for name, attached in result.all():
+            year, month = PARTITION_NAME.match(name).groups()
+            partitions.append(BookingPartition(name, date(int(year), int(month), 1), attached))
+        return partitions
+
+    def archive_path(self, shard: str, month: date) -> Path:
+        return self.archive_dir / shard / f"{partition_name(month)}.csv.gz"
+
+    # ---------------- CREATION ----------------
+
+    async def ensure(self, connection, months: Iterable[date]) -> None:
+        """Creates missing partitions (works on a connection or a session)."""
+        for month in sorted(set(months)):
+            await connection.execute(
+                text("SELECT create_booking_partition(:month)"), {"month": month}
+            )
+
+    async def ensure_future(self, shard: str) -> None:
+        current = month_start(datetime.now(timezone.utc))
+        async with self.shards.engines[shard].begin() as connection:
+            await self.ensure(
+                connection,
+                (add_months(current, n) for n in range(self.months_ahead + 1)),
+            )
+        partition_events.inc(shard=shard, action="checked")
+
+    async def run(self) -> None:
+        while True:
+            for shard in self.shards.engines:
+                try:
+                    await self.ensure_future(shard)
+                except Exception:
+                    logger.warning("Partition check failed on %s", shard, exc_info=True)
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ---------------- ARCHIVE ----------------
+
+    async def archive(
+        self,
+        shard: str,
+        older_than_months: Optional[int] = None,
+        dry_run: bool = False,
+    ) -> List[dict]:
+        months = self.archive_after_months if older_than_months is None else older_than_months
+        cutoff = add_months(month_start(datetime.now(timezone.utc)), -months)
+
+        async with self.shards.engines[shard].connect() as connection:
+            candidates = [p for p in await self.partitions(connection) if p.month < cutoff]
+            await connection.rollback()
+
+            if dry_run:
+                return [{"partition": p.name, "attached": p.attached} for p in candidates]
+
+            archived = []
+            for partition in candidates:
+                archived.append(await self._archive_one(connection, shard, partition))
+            return archived
+
+    async def _archive_one(
+        self, connection: AsyncConnection, shard: str, partition: BookingPartition
+    ) -> dict:
+        # 1️⃣ detach: the month disappears from every query right away
+        if partition.attached:
+            await connection.execute(
+                text(f'ALTER TABLE bookings DETACH PARTITION "{partition.name}"')
+            )
+            await connection.commit()
+
+        rows = (
+            await connection.execute(text(f'SELECT count(*) FROM "{partition.name}"'))
+        ).scalar()
+        columns = list(
+            (await connection.execute(text(f'SELECT * FROM "{partition.name}" LIMIT 0'))).keys()
+        )
+        await connection.rollback()
+
+        # 2️⃣ export to a temp file, then rename into place
+        path = self.archive_path(shard, partition.month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".partial")
+        driver = (await connection.get_raw_connection()).driver_connection
+
+        with gzip.open(partial, "wb") as f:
+
+            async def write(chunk: bytes) -> None:
+                f.write(chunk)
+
+            await driver.copy_from_table(
+                partition.name, columns=columns, output=write, format="csv", header=True
+            )
+        with open(partial, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(partial, path)
+
+        manifest = {
+            "partition": partition.name,
+            "month": partition.month.isoformat(),
+            "shard": shard,
+            "rows": rows,
+            "columns": columns,
+            "sha256": file_sha256(path),
+            "archived_at": datetime.now(timezone.utc).isoformat(),
+        }
+        path.with_name(f"{partition.name}.json").write_text(json.dumps(manifest, indent=2))
+
+        # 3️⃣ only now drop the table
+        await connection.execute(text(f'DROP TABLE "{partition.name}"'))
+        await connection.commit()
+
+        partition_events.inc(shard=shard, action="archived")
+        logger.info("Archived %s on %s (%d rows) to %s", partition.name, shard, rows, path)
+        return {"partition": partition.name, "rows": rows, "file": str(path)}
+
+    # ---------------- RESTORE ----------------
+
+    async def restore(self, shard: str, month: date) -> dict:
+        month = month_start(month)
+        name = partition_name(month)
+        path = self.archive_path(shard, month)
+        manifest = json.loads(path.with_name(f"{name}.json").read_text())
+
+        if file_sha256(path) != manifest["sha256"]:
+            raise ValueError(f"{path} does not match its manifest")
+
+        async with self.shards.engines[shard].connect() as connection:
+            existing = {p.name: p for p in await self.partitions(connection)}.get(name)
+
+            if existing is not None:
+                rows = (await connection.execute(text(f'SELECT count(*) FROM "{name}"'))).scalar()
+                if rows:
+                    raise ValueError(f"{name} already exists on {shard} with {rows} rows")
+                # an empty month created since (e.g. by a lot move); replace it
+                await connection.execute(text(f'DROP TABLE "{name}"'))
+
+            await connection.execute(
+                text(f'CREATE TABLE "{name}" (LIKE bookings INCLUDING DEFAULTS)')
+            )
+            driver = (await connection.get_raw_connection()).driver_connection
+            with gzip.open(path, "rb") as f:
+                await driver.copy_to_table(
+                    name, source=f, columns=manifest["columns"], format="csv", header=True
+                )
+
+            # validates the rows against the bounds, builds the indexes
+            await connection.execute(
+                text(
+                    f'ALTER TABLE bookings ATTACH PARTITION "{name}" '
+                    f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') "
+                    f"TO ('{add_months(month, 1).isoformat()} 00:00+00')"
+                )
+            )
+            await connection.commit()
+
+        partition_events.inc(shard=shard, action="restored")
+        logger.info("Restored %s on %s (%d rows)", name, shard, manifest["rows"])
+        return {"partition": name, "rows": manifest["rows"]}
+
+
+partition_manager = BookingPartitionManager()
@@ -0,0 +1,126 @@
+import asyncio
+from typing import Dict, List, Optional
+
+import razorpay
+
+from src.db.models.payment import PaymentStatus
+
+
+# =========================
+# GATEWAY ORDER STATUS
+# =========================
+class GatewayOrderStatus:
+    """What the gateway knows about an order, reduced to our PaymentStatus."""
+
+    __slots__ = ("order_id", "status", "payment_id")
+
+    def __init__(
+        self,
+        order_id: str,
+        status: PaymentStatus,
+        payment_id: Optional[str] = None,
+    ):
+        self.order_id = order_id
+        self.status = status
+        self.payment_id = payment_id
+
+
+def resolve_order_status(order_id: str, attempts: List[dict]) -> GatewayOrderStatus:
+    """
+    Razorpay can hold several payment attempts per order. One captured
+    attempt makes the order paid; it is failed only when every attempt
+    failed. Anything else (no attempts, authorized, ...) stays created.
+    """
+    for attempt in attempts:
+        if attempt.get("status") == "captured":
+            return GatewayOrderStatus(order_id, PaymentStatus.paid, attempt.get("id"))
+        if attempt.get("status") == "refunded":
+            return GatewayOrderStatus(order_id, PaymentStatus.refunded, attempt.get("id"))
+
+    if attempts and all(a.get("status") == "failed" for a in attempts):
+        return GatewayOrderStatus(order_id, PaymentStatus.failed, attempts[-1].get("id"))
+
+    return GatewayOrderStatus(order_id, PaymentStatus.created)
+
+
+# =========================
+# GATEWAYS
+# =========================
+class PaymentGateway:
+
+    async def fetch_order_status(self, order_id: str) -> GatewayOrderStatus:
+        raise NotImplementedError
+
+    async def refund_payment(
+        self, payment_id: str, amount: float, idempotency_key: str | None = None
+    ) -> dict:
+        """
+        Refunds a captured payment in full. A payment that is already fully
+        refunded counts as success, so a retry after a lost response or a
+        crash is harmless.
+        """
+        raise NotImplementedError
+
+
+class RazorpayGateway(PaymentGateway):
+    """The razorpay SDK is blocking, so calls run in the default thread pool."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def fetch_order_status(self, order_id: str) -> GatewayOrderStatus:
+        response = await asyncio.to_thread(self.client.order.payments, order_id)
+        return resolve_order_status(order_id, response.get("items", []))
+
+    async def refund_payment(
+        self, payment_id: str, amount: float, idempotency_key: str | None = None
+    ) -> dict:
+        data = {"amount": int(round(amount * 100))}
+        options = {}
+        if idempotency_key:
+            data["receipt"] = idempotency_key[:40]
+            options["headers"] = {"X-Refund-Idempotency": idempotency_key}
+        try:
+            return await asyncio.to_thread(
+                self.client.payment.refund, payment_id, data, **options
+            )
+        except razorpay.errors.BadRequestError as e:
+            if "fully refunded" not in str(e).lower():
+                raise
+            return {"payment_id": payment_id, "status": "processed", "already_refunded": True}
+
+
+class FakePaymentGateway(PaymentGateway):
+    """
+    In-memory gateway for local runs and tests.
+
+    `orders` maps order id -> list of Razorpay-style payment attempts,
+    e.g. {"order_1": [{"id": "pay_1", "status": "captured"}]}.
+    """
+
+    def __init__(self, orders: Optional[Dict[str, List[dict]]] = None, latency: float = 0.0):
+        self.orders = orders or {}
+        self.latency = latency
+        self.calls = 0
+        self.refunds: List[tuple] = []
+        self._refund_keys: Dict[str, dict] = {}
+
+    async def fetch_order_status(self, order_id: str) -> GatewayOrderStatus:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return resolve_order_status(order_id, self.orders.get(order_id, []))
+
+    async def refund_payment(
+        self, payment_id: str, amount: float, idempotency_key: str | None = None
+    ) -> dict:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        key = idempotency_key or payment_id
+        if key not in self._refund_keys:
+            self.refunds.append((payment_id, amount))
+            self._refund_keys[key] = {
+                "id": f"rfnd_{len(self.refunds)}", "payment_id": payment_id, "status": "processed"
+            }
+        return self._refund_keys[key]
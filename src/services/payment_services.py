@@ -1,13 +1,21 @@
+from decimal import Decimal
 from uuid import UUID
 import razorpay
 
 from fastapi import HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
 from src.core.config import Config
+from src.db.database import shard_map
 from src.db.models.payment import Payment, PaymentStatus
-from src.db.models.booking import Booking
+from src.db.models.booking import Booking, BookingStatus
+from src.db.statements import payment_by_order_id
+from src.db.routing import replica_read
+from src.services.booking_state_machine import booking_state_machine
+from src.services.outbox_services import outbox_service
+from src.services.payment_status_services import payment_status_broker
+from src.services.pricing_services import PricingError, pricing_engine
 
 
 # =========================
@@ -18,23 +26,66 @@ razorpay_client = razorpay.Client(
 )
 
 
+# payment status -> (booking status it moves the booking to, from which)
+BOOKING_ON_PAYMENT = {
+    PaymentStatus.paid: (BookingStatus.BOOKED, {BookingStatus.PAYMENT_PENDING}),
+    PaymentStatus.failed: (BookingStatus.PAYMENT_FAILED, {BookingStatus.PAYMENT_PENDING}),
+    PaymentStatus.refunded: (BookingStatus.CANCELLED, None),
+}
+
+
 # =========================
 # PAYMENT SERVICE
 # =========================
 class PaymentService:
 
+    # -------------------------
+    # STATUS CHANGES
+    # -------------------------
+    async def apply_status(
+        self,
+        session: AsyncSession,
+        payment: Payment,
+        to_status: PaymentStatus,
+        reason: str | None = None,
+    ) -> Payment:
+        """
+        Moves a loaded payment to `to_status`, queues its outbox event and
+        moves its booking along (see BOOKING_ON_PAYMENT), all on `session`.
+        Client verify and the webhooks both go through here. The caller
+        commits, then publishes to payment_status_broker.
+        """
+        outbox_service.payment_transition(session, payment, payment.status, to_status)
+        payment.status = to_status
+
+        target = BOOKING_ON_PAYMENT.get(to_status)
+        if target is None:
+            return payment
+        booking_status, allowed_from = target
+
+        booking = await session.get(Booking, payment.booking_id)
+        if (
+            booking
+            and booking_state_machine.can_transition(booking.status, booking_status)
+            and (allowed_from is None or booking.status in allowed_from)
+        ):
+            booking_state_machine.transition(
+                session, booking, booking_status, reason=reason
+            )
+        return payment
+
     # -------------------------
     # CREATE PAYMENT ORDER
     # -------------------------
     async def create_payment_order(
         self,
         booking_id: UUID,
-        amount: float,
-        currency: str,
         session: AsyncSession,
+        expected_amount: Decimal | None = None,
     ) -> Payment:
 
         # 1️⃣ Validate booking
+        await shard_map.pin_owner(session, Booking, booking_id, write=True)
         booking = await session.get(Booking, booking_id)
         if not booking:
             raise HTTPException(
@@ -42,20 +93,35 @@ class PaymentService:
                 detail="Booking not found",
             )
 
-        # 2️⃣ Create Razorpay order (amount in paise)
+        # 2️⃣ Price it server-side; never trust the client's amount
+        try:
+            quote = await pricing_engine.quote_booking(booking, session)
+        except PricingError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        if expected_amount is not None and expected_amount != quote.amount:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Price changed to {quote.amount} {quote.currency}",
+            )
+        amount, currency = quote.amount, quote.currency
+
+        # 3️⃣ Create Razorpay order (amount in paise)
         order = razorpay_client.order.create(
             {
-                "amount": int(amount * 100),
+                "amount": int(amount.scaleb(2)),
                 "currency": currency,
                 "payment_capture": 1,
             }
         )
 
-        # 3️⃣ Save payment record
+        # 4️⃣ Save payment record
         payment = Payment(
             booking_id=booking_id,
             razorpay_order_id=order["id"],
-            amount=amount,
+            amount=float(amount),
             currency=currency,
             status=PaymentStatus.created,
         )
@@ -78,12 +144,12 @@ class PaymentService:
     ) -> Payment:
 
         # 1️⃣ Fetch payment record
-        result = await session.exec(
-            select(Payment).where(
-                Payment.razorpay_order_id == razorpay_order_id
-            )
+        await shard_map.pin_owner(
+            session, Payment, razorpay_order_id,
+            column=Payment.razorpay_order_id, write=True,
         )
-        payment = result.first()
+        result = await session.execute(payment_by_order_id(razorpay_order_id))
+        payment = result.scalars().first()
 
         if not payment:
             raise HTTPException(
@@ -101,26 +167,82 @@ class PaymentService:
                 }
             )
         except razorpay.errors.SignatureVerificationError:
-            payment.status = PaymentStatus.failed
-            await session.commit()
+            # a bad signature never undoes a payment the gateway confirmed
+            if payment.status == PaymentStatus.created:
+                await self.apply_status(
+                    session, payment, PaymentStatus.failed, reason="verify:bad_signature"
+                )
+                await session.commit()
+                await payment_status_broker.publish(payment)
 
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Payment verification failed",
             )
 
-        # 3️⃣ Update payment as SUCCESS
+        # 3️⃣ Update payment as SUCCESS (the captured webhook may have won)
+        if payment.status == PaymentStatus.paid:
+            return payment
+
         payment.razorpay_payment_id = razorpay_payment_id
         payment.razorpay_signature = razorpay_signature
-        payment.status = PaymentStatus.paid
+        await self.apply_status(session, payment, PaymentStatus.paid, reason="verify")
 
-        session.add(payment)
         await session.commit()
         await session.refresh(payment)
+        await payment_status_broker.publish(payment)
 
         return payment
 
 
+    # -------------------------
+    # LOOKUPS (replica reads)
+    # -------------------------
+    @replica_read
+    async def get_payment(
+        self,
+        payment_id: UUID,
+        session: AsyncSession,
+    ) -> Payment | None:
+        if await shard_map.pin_owner(session, Payment, payment_id) is None:
+            return None
+        return await session.get(Payment, payment_id)
+
+    @replica_read
+    async def get_payment_by_booking(
+        self,
+        booking_id: UUID,
+        session: AsyncSession,
+    ) -> Payment | None:
+        if await shard_map.pin_owner(session, Booking, booking_id) is None:
+            return None
+        result = await session.execute(
+            select(Payment).where(Payment.booking_id == booking_id)
+        )
+        return result.scalars().first()
+
+    async def get_payment_with_owner(
+        self,
+        booking_id: UUID,
+        session: AsyncSession,
+    ):
+        """
+        (latest payment, booking's user_id) in one statement, or None.
+        Always on the primary: a long-poll parks before this read, and a
+        lagging replica could hide a change whose wake-up came earlier.
+        """
+        if await shard_map.pin_owner(session, Booking, booking_id) is None:
+            return None
+        result = await session.execute(
+            select(Payment, Booking.user_id)
+            .join(Booking, Booking.uid == Payment.booking_id)
+            .where(Payment.booking_id == booking_id)
+            .order_by(Payment.created_at.desc())
+            .limit(1)
+        )
+        return result.first()
+
+
 # =========================
 # SERVICE INSTANCE
 # =========================
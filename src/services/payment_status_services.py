@@ -0,0 +1,140 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from src.core.metrics import metrics
+from src.core.redis import async_redis_client
+from src.db.accessor.schemas.payment import PaymentResponse
+from src.db.models.payment import Payment
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_STATUS_CHANNEL = "spotzy:payment_status"
+
+payment_waits = metrics.counter(
+    "payment_status_waits_total",
+    "Long-poll payment status waits by outcome (changed/woken/timeout/interrupted)",
+)
+
+
+class PaymentStatusBroker:
+    """
+    Wakes long-polling clients when a payment changes status.
+
+    Writers publish the committed payment (as PaymentResponse JSON) on
+    one Redis channel; every worker listens with a single pub/sub reader
+    and resolves the futures parked under that booking id. The waiter
+    gets the payment from the message itself, so a wait costs only the
+    one read it made before parking. A Redis error resolves every parked
+    future with None so callers re-read instead of waiting out the
+    timeout on a dead connection.
+    """
+
+    def __init__(self, redis=async_redis_client, channel: str = PAYMENT_STATUS_CHANNEL):
+        self.redis = redis
+        self.channel = channel
+        self._waiters: Dict[str, Set[asyncio.Future]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------------- WRITE SIDE ----------------
+
+    async def publish(self, payment: Payment) -> None:
+        """Call after the status change committed; never fails the caller."""
+        message = PaymentResponse.model_validate(payment).model_dump_json()
+        try:
+            await self.redis.publish(self.channel, message)
+        except RedisError:
+            logger.warning("Payment status publish for %s failed", payment.uid, exc_info=True)
+
+    # ---------------- WAITERS ----------------
+
+    def park(self, booking_id: UUID) -> asyncio.Future:
+        """Register before reading the current status, so no change is missed."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[str(booking_id)].add(future)
+        return future
+
+    def unpark(self, booking_id: UUID, future: asyncio.Future) -> None:
+        key = str(booking_id)
+        waiters = self._waiters.get(key)
+        if waiters is not None:
+            waiters.discard(future)
+            if not waiters:
+                del self._waiters[key]
+        if not future.done():
+            future.cancel()
+
+    async def wait(self, future: asyncio.Future, timeout: float) -> Optional[dict]:
+        """The changed payment, or None on timeout or a broken connection."""
+        try:
+            payment = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            payment_waits.inc(outcome="timeout")
+            return None
+        payment_waits.inc(outcome="woken" if payment is not None else "interrupted")
+        return payment
+
+    def _wake(self, key: str, payment: Optional[dict]) -> None:
+        for future in self._waiters.pop(key, ()):
+            if not future.done():
+                future.set_result(payment)
+
+    def _wake_all(self) -> None:
+        for key in list(self._waiters):
+            self._wake(key, None)
+
+    # ---------------- READER ----------------
+
+    def _dispatch(self, data: str) -> None:
+        try:
+            payment = json.loads(data)
+            key = payment["booking_id"]
+        except (TypeError, ValueError, KeyError):
+            logger.warning("Ignoring malformed payment status message: %r", data)
+            return
+        self._wake(key, payment)
+
+    async def run(self) -> None:
+        backoff = 0.5
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                backoff = 0.5
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    "Payment status listener failed; retrying in %.1fs", backoff, exc_info=True
+                )
+            finally:
+                await pubsub.aclose()
+            # whatever was published meanwhile is lost; let waiters re-read
+            self._wake_all()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wake_all()
+
+
+payment_status_broker = PaymentStatusBroker()
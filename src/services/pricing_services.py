@@ -0,0 +1,352 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import LRUCache
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.db.database import shard_map
+from src.db.models.booking import Booking
+from src.db.models.parkinglot import ParkingLot
+from src.db.models.parkingslot import ParkingSlot
+from src.db.models.rate_card import LotRateCard
+from src.db.models.user import User
+from src.db.routing import replica_read
+from src.db.statements import MAX_BOOKING_DURATION
+
+logger = logging.getLogger(__name__)
+
+pricing_lookups = metrics.counter(
+    "pricing_lookups_total",
+    "Rate card and slot lookups by kind and result (cache/db/missing)",
+)
+quoted_windows = metrics.counter(
+    "pricing_quoted_windows_total",
+    "Windows priced, by caller (quotes/order)",
+)
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+# 1970-01-01 was a Thursday; shifting by 3 days counts from a Monday
+EPOCH_TO_MONDAY = 3 * DAY
+
+
+class PricingError(ValueError):
+    pass
+
+
+# ======================= RATE TABLES =======================
+@dataclass(frozen=True)
+class RateTable:
+    """A rate card unrolled over one local week, in paise."""
+    parking_lot_id: UUID
+    currency: str
+    hourly: np.ndarray      # (168,) price of each local hour, Monday 00:00 first
+    cumulative: np.ndarray  # (169,) price from Monday 00:00 to each hour boundary
+    daily_cap: float        # inf without a cap
+    increment: int          # billing increment, seconds
+
+    @classmethod
+    def from_card(cls, card: LotRateCard) -> "RateTable":
+        hours = np.arange(168)
+        weekday, hour = np.divmod(hours, 24)
+
+        start, end = card.peak_start_hour, card.peak_end_hour
+        if start < end:
+            in_window = (hour >= start) & (hour < end)
+        elif start > end:  # wraps midnight
+            in_window = (hour >= start) | (hour < end)
+        else:
+            in_window = np.zeros(168, dtype=bool)
+        peak = in_window & ((card.peak_weekdays >> weekday) & 1).astype(bool)
+
+        rate = float(card.hourly_rate) * 100
+        hourly = np.where(peak, rate * float(card.peak_multiplier), rate)
+        return cls(
+            parking_lot_id=card.parking_lot_id,
+            currency=card.currency,
+            hourly=hourly,
+            cumulative=np.concatenate(([0.0], np.cumsum(hourly))),
+            daily_cap=float(card.daily_cap) * 100 if card.daily_cap is not None else np.inf,
+            increment=card.billing_increment_minutes * 60,
+        )
+
+
+def price_windows(
+    tables: Sequence[RateTable],
+    table_index: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    offset_seconds: int,
+) -> np.ndarray:
+    """
+    Prices N windows (UTC epoch seconds) in one pass; returns paise.
+
+    The cost of [a, b) under a table is F(b) - F(a), where F is the
+    table's running total since some Monday 00:00: whole weeks, plus the
+    cumulative sum up to the hour, plus the partial hour. Every window is
+    cut at local midnights into an (N x days) matrix, so the daily cap
+    is a single np.minimum before the row sums.
+    """
+    hourly = np.stack([t.hourly for t in tables])
+    cumulative = np.stack([t.cumulative for t in tables])
+    caps = np.array([t.daily_cap for t in tables])[table_index]
+    increments = np.array([t.increment for t in tables], dtype=np.int64)[table_index]
+
+    a = starts + offset_seconds + EPOCH_TO_MONDAY
+    billed = -(-(ends - starts) // increments) * increments
+    b = a + billed
+
+    first_day = a // DAY
+    days = int(((b - 1) // DAY - first_day).max()) + 1 if len(a) else 0
+    bounds = (first_day[:, None] + np.arange(days + 1)[None, :]) * DAY
+    bounds = np.clip(bounds, a[:, None], b[:, None])
+
+    rows = table_index[:, None]
+    weeks, seconds = np.divmod(bounds, WEEK)
+    hour = seconds // HOUR
+    running = (
+        weeks * cumulative[rows, 168]
+        + cumulative[rows, hour]
+        + hourly[rows, hour] * (seconds - hour * HOUR) / HOUR
+    )
+
+    per_day = np.minimum(np.diff(running, axis=1), caps[:, None])
+    return np.rint(per_day.sum(axis=1)).astype(np.int64)
+
+
+# ======================= ENGINE =======================
+@dataclass
+class Quote:
+    slot_id: UUID
+    start_time: datetime
+    end_time: datetime
+    parking_lot_id: Optional[UUID] = None
+    amount: Optional[Decimal] = None
+    currency: Optional[str] = None
+    error: Optional[str] = None
+
+
+class PricingEngine:
+    """
+    Server-side prices for booking windows.
+
+    Rate cards are cached per worker as unrolled RateTables and dropped
+    on lot_rate_cards change notifications; slot -> lot is cached for
+    long since a slot never changes lots. A batch of windows needs at
+    most one query per kind for whatever is not cached, then is priced
+    by `price_windows` in one vectorized pass.
+    """
+
+    def __init__(
+        self,
+        cache_seconds: float = Config.PRICING_CACHE_SECONDS,
+        offset_minutes: int = Config.PRICING_UTC_OFFSET_MINUTES,
+    ):
+        self.rate_tables = LRUCache(maxsize=20000, ttl=cache_seconds)
+        self.slot_lots = LRUCache(maxsize=200000, ttl=86400)
+        self.offset_seconds = offset_minutes * 60
+
+    # ---------------- CACHE INVALIDATION ----------------
+
+    def on_change(self, change: dict) -> None:
+        if change.get("table") == "lot_rate_cards" and change.get("lot"):
+            self.rate_tables.pop(UUID(change["lot"]))
+
+    def flush_local(self) -> None:
+        self.rate_tables.clear()
+
+    # ---------------- LOOKUPS ----------------
+
+    async def _lookup(self, cache: LRUCache, kind: str, keys: Iterable[UUID], query, session, pinned):
+        """Cached values for `keys`; misses are fetched with one query (per shard)."""
+        found, missing = {}, []
+        for key in set(keys):
+            value = cache.get(key)
+            if isinstance(value, (RateTable, UUID)):
+                found[key] = value
+            else:
+                missing.append(key)
+        pricing_lookups.inc(len(found), kind=kind, result="cache")
+        if not missing:
+            return found
+
+        async def fetch(shard_session: AsyncSession):
+            return (await shard_session.execute(query(missing))).all()
+
+        if pinned:
+            parts = [await fetch(session)]
+        else:
+            parts = await shard_map.scatter(fetch, session=session, purpose=f"pricing_{kind}")
+
+        loaded = 0
+        for rows in parts:
+            for key, value in rows:
+                value = RateTable.from_card(value) if kind == "rate_card" else value
+                cache.set(key, value)
+                found[key] = value
+                loaded += 1
+        pricing_lookups.inc(loaded, kind=kind, result="db")
+        pricing_lookups.inc(len(missing) - loaded, kind=kind, result="missing")
+        return found
+
+    async def lots_for_slots(
+        self, slot_ids: Iterable[UUID], session: AsyncSession, pinned: bool = False
+    ) -> Dict[UUID, UUID]:
+        return await self._lookup(
+            self.slot_lots,
+            "slot",
+            slot_ids,
+            lambda ids: select(ParkingSlot.uid, ParkingSlot.parking_lot_id).where(
+                ParkingSlot.uid.in_(ids)
+            ),
+            session,
+            pinned,
+        )
+
+    async def tables_for_lots(
+        self, lot_ids: Iterable[UUID], session: AsyncSession, pinned: bool = False
+    ) -> Dict[UUID, RateTable]:
+        return await self._lookup(
+            self.rate_tables,
+            "rate_card",
+            lot_ids,
+            lambda ids: select(LotRateCard.parking_lot_id, LotRateCard).where(
+                LotRateCard.parking_lot_id.in_(ids)
+            ),
+            session,
+            pinned,
+        )
+
+    # ---------------- PRICING ----------------
+
+    def _price(self, quotes: List[Quote], tables: Dict[UUID, RateTable]) -> None:
+        priced = [q for q in quotes if q.error is None]
+        if not priced:
+            return
+
+        used = list({q.parking_lot_id: tables[q.parking_lot_id] for q in priced}.values())
+        position = {table.parking_lot_id: i for i, table in enumerate(used)}
+
+        paise = price_windows(
+            used,
+            np.array([position[q.parking_lot_id] for q in priced], dtype=np.int64),
+            np.array([int(q.start_time.timestamp()) for q in priced], dtype=np.int64),
+            np.array([int(q.end_time.timestamp()) for q in priced], dtype=np.int64),
+            self.offset_seconds,
+        )
+        for quote, amount in zip(priced, paise.tolist()):
+            quote.amount = Decimal(amount).scaleb(-2)
+            quote.currency = tables[quote.parking_lot_id].currency
+
+    @staticmethod
+    def _check_window(start_time: datetime, end_time: datetime) -> None:
+        if start_time >= end_time:
+            raise PricingError("start_time must be before end_time")
+        if end_time - start_time > MAX_BOOKING_DURATION:
+            raise PricingError(
+                f"Bookings can last at most {Config.BOOKING_MAX_DURATION_HOURS} hours"
+            )
+
+    @replica_read
+    async def quote_many(
+        self,
+        items: Sequence[Tuple[UUID, datetime, datetime]],
+        session: AsyncSession,
+    ) -> List[Quote]:
+        """
+        Prices (slot_id, start_time, end_time) triples, in request order.
+        Unknown slots and lots without a rate card come back with `error`
+        set rather than failing the batch.
+        """
+        if len(items) > Config.PRICING_MAX_QUOTES:
+            raise PricingError(f"At most {Config.PRICING_MAX_QUOTES} quotes per request")
+        for _, start_time, end_time in items:
+            self._check_window(start_time, end_time)
+
+        quotes = [Quote(slot_id, start, end) for slot_id, start, end in items]
+        slot_lots = await self.lots_for_slots((q.slot_id for q in quotes), session)
+        for quote in quotes:
+            quote.parking_lot_id = slot_lots.get(quote.slot_id)
+            if quote.parking_lot_id is None:
+                quote.error = "Slot not found"
+
+        tables = await self.tables_for_lots(
+            (q.parking_lot_id for q in quotes if q.error is None), session
+        )
+        for quote in quotes:
+            if quote.error is None and quote.parking_lot_id not in tables:
+                quote.error = "Parking lot has no rate card"
+
+        self._price(quotes, tables)
+        quoted_windows.inc(len(quotes), caller="quotes")
+        return quotes
+
+    async def quote_booking(self, booking: Booking, session: AsyncSession) -> Quote:
+        """Price of a booking, on the session already pinned to its lot's shard."""
+        quote = Quote(booking.slot_id, booking.start_time, booking.end_time)
+        slot_lots = await self.lots_for_slots([booking.slot_id], session, pinned=True)
+        quote.parking_lot_id = slot_lots[booking.slot_id]
+
+        tables = await self.tables_for_lots([quote.parking_lot_id], session, pinned=True)
+        if quote.parking_lot_id not in tables:
+            raise PricingError("Parking lot has no rate card")
+
+        self._price([quote], tables)
+        quoted_windows.inc(caller="order")
+        return quote
+
+    # ---------------- RATE CARD ADMIN ----------------
+
+    @replica_read
+    async def get_rate_card(self, parking_lot_id: UUID, session: AsyncSession) -> LotRateCard | None:
+        await shard_map.pin(session, parking_lot_id)
+        result = await session.execute(
+            select(LotRateCard).where(LotRateCard.parking_lot_id == parking_lot_id)
+        )
+        return result.scalars().first()
+
+    async def set_rate_card(
+        self,
+        parking_lot_id: UUID,
+        values: dict,
+        session: AsyncSession,
+        current_user: User,
+    ) -> LotRateCard:
+        if current_user.role != "ADMIN":
+            raise PermissionError("Only admin can change rate cards")
+
+        await shard_map.pin(session, parking_lot_id, write=True)
+        parking_lot = await session.get(ParkingLot, parking_lot_id)
+        if not parking_lot:
+            raise ValueError("Parking lot not found")
+        if parking_lot.admin_id != current_user.uid:
+            raise PermissionError("Not your parking lot")
+
+        result = await session.execute(
+            select(LotRateCard).where(LotRateCard.parking_lot_id == parking_lot_id)
+        )
+        card = result.scalars().first()
+        if card is None:
+            card = LotRateCard(parking_lot_id=parking_lot_id, **values)
+        else:
+            for key, value in values.items():
+                setattr(card, key, value)
+
+        session.add(card)
+        await session.commit()
+        await session.refresh(card)
+        # other workers drop theirs on the change notification
+        self.rate_tables.pop(parking_lot_id)
+        return card
+
+
+pricing_engine = PricingEngine()
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, Table, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.db.database import shard_map
+from src.db.models.booking import Booking
+from src.db.models.booking_transition import BookingTransition
+from src.db.models.catalog_version import CatalogVersion
+from src.db.models.lot_forecast import LotOccupancyForecast
+from src.db.models.lot_rollup import LotOccupancyHourly, LotRevenueDaily
+from src.db.models.rate_card import LotRateCard
+from src.db.models.parkinglot import ParkingLot
+from src.db.models.parkingslot import ParkingSlot
+from src.db.models.payment import Payment
+from src.db.models.refund_job import RefundJob, RefundJobStatus
+from src.db.sharding import ShardMap
+from src.services.partition_services import partition_manager
+
+logger = logging.getLogger(__name__)
+
+lot_moves = metrics.counter(
+    "shard_lot_moves_total",
+    "Lots moved between shards, by source, target and result",
+)
+
+lots = ParkingLot.__table__
+slots = ParkingSlot.__table__
+bookings = Booking.__table__
+payments = Payment.__table__
+transitions = BookingTransition.__table__
+refund_jobs = RefundJob.__table__
+catalog_versions = CatalogVersion.__table__
+revenue_rollups = LotRevenueDaily.__table__
+occupancy_rollups = LotOccupancyHourly.__table__
+forecasts = LotOccupancyForecast.__table__
+rate_cards = LotRateCard.__table__
+
+
+class LotMover:
+    """
+    Moves one lot and everything under it to another shard.
+
+        1. mark the lot `moving`: writes now fail with 503, reads go on
+        2. wait until every worker saw the flag and in-flight writes ended
+        3. copy lot, slots, rate card, bookings, payments, transitions,
+           refund jobs, dashboard rollups and the forecast to the target in
+           FK order, one transaction, in batches
+        4. point the directory at the target (clears `moving`)
+        5. wait out cached placements, then delete the source copy
+
+    Each step can be re-run: a copy left by a crash before step 4 is
+    cleared on the target first, and `cleanup` removes a source copy a
+    crash after step 4 left behind. Unpublished outbox rows stay on the
+    source, whose relay still publishes them; archived booking months
+    stay in the source shard's archive.
+    """
+
+    def __init__(
+        self,
+        shards: ShardMap = shard_map,
+        batch_size: int = 1000,
+        drain_seconds: float = Config.SHARD_MOVE_DRAIN_SECONDS,
+    ):
+        self.shards = shards
+        self.batch_size = batch_size
+        self.drain_seconds = max(drain_seconds, Config.SHARD_DIRECTORY_TTL_SECONDS)
+
+    @staticmethod
+    def _selects(lot_id: UUID) -> List[Tuple[Table, Select]]:
+        """Every row of the lot, parents first."""
+        slot_ids = select(slots.c.uid).where(slots.c.parking_lot_id == lot_id)
+        booking_ids = select(bookings.c.uid).where(bookings.c.slot_id.in_(slot_ids))
+        return [
+            (lots, select(lots).where(lots.c.uid == lot_id)),
+            (slots, select(slots).where(slots.c.parking_lot_id == lot_id)),
+            (rate_cards, select(rate_cards).where(rate_cards.c.parking_lot_id == lot_id)),
+            (bookings, select(bookings).where(bookings.c.slot_id.in_(slot_ids))),
+            (payments, select(payments).where(payments.c.booking_id.in_(booking_ids))),
+            (transitions, select(transitions).where(transitions.c.booking_id.in_(booking_ids))),
+            (refund_jobs, select(refund_jobs).where(refund_jobs.c.parking_lot_id == lot_id)),
+            # rollups keep days whose bookings were already archived
+            (revenue_rollups, select(revenue_rollups).where(revenue_rollups.c.parking_lot_id == lot_id)),
+            (occupancy_rollups, select(occupancy_rollups).where(occupancy_rollups.c.parking_lot_id == lot_id)),
+            (forecasts, select(forecasts).where(forecasts.c.parking_lot_id == lot_id)),
+        ]
+
+    async def _delete(self, session: AsyncSession, lot_id: UUID) -> None:
+        """Children first, so the subqueries still find their parents."""
+        for table, stmt in reversed(self._selects(lot_id)):
+            await session.execute(delete(table).where(stmt.whereclause))
+
+    async def _ensure_partitions(
+        self, source: AsyncSession, target: AsyncSession, bookings_stmt: Select
+    ) -> None:
+        """The target needs a bookings partition for every month being copied."""
+        month = func.date_trunc("month", func.timezone("UTC", bookings.c.start_time))
+        result = await source.execute(
+            bookings_stmt.with_only_columns(month).distinct()
+        )
+        await partition_manager.ensure(target, (m.date() for m in result.scalars()))
+
+    async def _copy(self, source: AsyncSession, target: AsyncSession, lot_id: UUID) -> Dict[str, int]:
+        counts = {}
+        for table, stmt in self._selects(lot_id):
+            if table is bookings:
+                await self._ensure_partitions(source, target, stmt)
+            counts[table.name] = 0
+            result = await source.stream(stmt.execution_options(yield_per=self.batch_size))
+            async for rows in result.partitions():
+                values = [dict(row._mapping) for row in rows]
+                if table is transitions:
+                    for value in values:
+                        value.pop("id")  # the target's own sequence numbers it
+                await target.execute(insert(table), values)
+                counts[table.name] += len(values)
+        return counts
+
+    async def _carry_catalog_version(
+        self, source: AsyncSession, target: AsyncSession, lot_id: UUID
+    ) -> None:
+        """The lot's ETag version must keep growing across the move."""
+        scope = f"lot:{lot_id}"
+        current = (
+            await source.execute(
+                select(catalog_versions.c.version).where(catalog_versions.c.scope == scope)
+            )
+        ).scalar_one_or_none() or 0
+
+        stmt = pg_insert(catalog_versions).values(
+            scope=scope, version=current + 1, updated_at=func.now()
+        )
+        await target.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[catalog_versions.c.scope],
+                set_={
+                    "version": func.greatest(catalog_versions.c.version, current) + 1,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    async def _check_idle(self, session: AsyncSession, lot_id: UUID) -> None:
+        running = (
+            await session.execute(
+                select(refund_jobs.c.uid).where(
+                    refund_jobs.c.parking_lot_id == lot_id,
+                    refund_jobs.c.status == RefundJobStatus.RUNNING,
+                ).limit(1)
+            )
+        ).first()
+        if running:
+            raise ValueError("Lot has a running refund job; move it afterwards")
+
+    # ======================= MOVE =======================
+
+    async def move(self, lot_id: UUID, target: str) -> Dict[str, int]:
+        if target not in self.shards.engines:
+            raise ValueError(f"Unknown shard {target!r}")
+
+        placement = await self.shards.lookup(lot_id, fresh=True)
+        source = placement.shard
+        if source == target and not placement.moving:
+            return {}
+
+        async with self.shards.session(source) as session:
+            if not await session.get(ParkingLot, lot_id):
+                raise ValueError("Parking lot not found on its shard")
+            await self._check_idle(session, lot_id)
+
+        # 1️⃣ freeze writes, 2️⃣ let every worker notice
+        await self.shards.set_placement(lot_id, source, moving=True)
+        logger.info("Lot %s frozen on %s; draining %.0fs", lot_id, source, self.drain_seconds)
+        await asyncio.sleep(self.drain_seconds)
+
+        try:
+            # 3️⃣ copy in one target transaction
+            async with self.shards.session(source) as source_session, \
+                    self.shards.session(target) as target_session:
+                await self._delete(target_session, lot_id)
+                counts = await self._copy(source_session, target_session, lot_id)
+                await self._carry_catalog_version(source_session, target_session, lot_id)
+                await target_session.commit()
+        except Exception:
+            # writes resume on the source; the partial copy was rolled back
+            await self.shards.set_placement(lot_id, source, moving=False)
+            lot_moves.inc(source=source, target=target, result="failed")
+            raise
+
+        # 4️⃣ flip
+        await self.shards.set_placement(lot_id, target, moving=False)
+        logger.info("Lot %s now on %s: %s", lot_id, target, counts)
+
+        # 5️⃣ stale placements may still read the source for one TTL
+        await asyncio.sleep(Config.SHARD_DIRECTORY_TTL_SECONDS)
+        await self.cleanup(lot_id, source)
+
+        lot_moves.inc(source=source, target=target, result="moved")
+        return counts
+
+    async def cleanup(self, lot_id: UUID, shard: str) -> None:
+        """Deletes a leftover copy of the lot from a shard that does not own it."""
+        placement = await self.shards.lookup(lot_id, fresh=True)
+        if placement.shard == shard:
+            raise ValueError(f"Lot {lot_id} is owned by {shard}; refusing to delete it")
+
+        async with self.shards.session(shard) as session:
+            await self._delete(session, lot_id)
+            await session.commit()
+
+
+lot_mover = LotMover()
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import DateTime, String, column, select, tuple_, type_coerce, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.booking import BookingStatus
+from src.db.models.payment import Payment, PaymentStatus
+from src.services.booking_state_machine import booking_state_machine
+from src.services.outbox_services import PAYMENT_STATUS_CHANGED, outbox_service
+from src.services.payment_gateway import GatewayOrderStatus, PaymentGateway
+
+logger = logging.getLogger(__name__)
+
+payments_table = Payment.__table__
+
+# the column is timestamptz in the database; compare with aware datetimes
+payment_created_at = type_coerce(payments_table.c.created_at, DateTime(timezone=True))
+
+# what a reconciled payment does to its booking (mirrors the webhook handlers)
+BOOKING_TRANSITIONS = {
+    PaymentStatus.paid: BookingStatus.BOOKED,
+    PaymentStatus.failed: BookingStatus.PAYMENT_FAILED,
+    PaymentStatus.refunded: BookingStatus.CANCELLED,
+}
+
+
+@dataclass
+class ReconciliationSummary:
+    scanned: int = 0
+    paid: int = 0
+    failed: int = 0
+    refunded: int = 0
+    unchanged: int = 0
+    errors: int = 0
+    pages: int = 0
+    elapsed_seconds: float = 0.0
+    error_order_ids: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class PaymentReconciliationService:
+    """
+    Repairs payments left in `created` because a webhook never arrived.
+
+    Stale payments are read in keyset pages of (created_at, uid), so each
+    page is a single index range scan no matter how deep we are. Gateway
+    lookups for a page run concurrently behind a semaphore, and the
+    resulting transitions are written in one transaction per page.
+    """
+
+    def __init__(
+        self,
+        gateway: PaymentGateway,
+        page_size: int = 500,
+        concurrency: int = 20,
+    ):
+        self.gateway = gateway
+        self.page_size = page_size
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    # ======================= PAGING =======================
+
+    async def _fetch_page(
+        self,
+        session: AsyncSession,
+        cutoff: datetime,
+        after: Optional[tuple],
+    ):
+        stmt = (
+            select(
+                payments_table.c.uid,
+                payments_table.c.booking_id,
+                payments_table.c.razorpay_order_id,
+                payment_created_at.label("created_at"),
+            )
+            .where(
+                payments_table.c.status == PaymentStatus.created,
+                payment_created_at < cutoff,
+            )
+            .order_by(payments_table.c.created_at, payments_table.c.uid)
+            .limit(self.page_size)
+        )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(payment_created_at, payments_table.c.uid) > after
+            )
+
+        result = await session.execute(stmt)
+        return result.all()
+
+    # ======================= GATEWAY =======================
+
+    async def _lookup(self, order_id: str) -> GatewayOrderStatus | Exception:
+        async with self.semaphore:
+            try:
+                return await self.gateway.fetch_order_status(order_id)
+            except Exception as e:  # one bad order must not stop the run
+                return e
+
+    # ======================= APPLY =======================
+
+    async def _apply(
+        self,
+        session: AsyncSession,
+        changes: List[tuple],
+    ) -> None:
+        """
+        `changes` holds (payment_uid, booking_id, GatewayOrderStatus).
+        Payments are updated with a single UPDATE ... FROM (VALUES ...);
+        bookings with one state-machine bulk transition per target status.
+        Both are guarded on the current status, so a webhook that landed
+        meanwhile wins and nothing is applied twice. Only rows actually
+        changed get outbox events.
+        """
+        if not changes:
+            return
+
+        gateway_rows = values(
+            column("uid", PG_UUID(as_uuid=True)),
+            column("status", payments_table.c.status.type),
+            column("payment_id", String),
+            name="gateway_rows",
+        ).data(
+            [
+                (payment_uid, gateway_status.status, gateway_status.payment_id)
+                for payment_uid, _, gateway_status in changes
+            ]
+        )
+
+        result = await session.execute(
+            update(payments_table)
+            .where(
+                payments_table.c.uid == gateway_rows.c.uid,
+                payments_table.c.status == PaymentStatus.created,
+            )
+            .values(
+                status=gateway_rows.c.status,
+                razorpay_payment_id=gateway_rows.c.payment_id,
+            )
+            .returning(
+                payments_table.c.uid,
+                payments_table.c.booking_id,
+                payments_table.c.status,
+            )
+        )
+        updated_payments = result.all()
+
+        events = [
+            {
+                "aggregate_type": "payment",
+                "aggregate_id": row.uid,
+                "event_type": PAYMENT_STATUS_CHANGED,
+                "payload": outbox_service.payment_payload(
+                    row.uid, row.booking_id, PaymentStatus.created, row.status
+                ),
+            }
+            for row in updated_payments
+        ]
+
+        await outbox_service.record_many(session, events)
+
+        for payment_status, booking_status in BOOKING_TRANSITIONS.items():
+            booking_ids: List[UUID] = [
+                row.booking_id
+                for row in updated_payments
+                if row.status == payment_status
+            ]
+            # paid/failed only settle a pending booking; a refund cancels
+            # whatever state the booking reached
+            await booking_state_machine.bulk_transition(
+                session,
+                booking_ids,
+                booking_status,
+                allowed_from=(
+                    None if payment_status == PaymentStatus.refunded
+                    else {BookingStatus.PAYMENT_PENDING}
+                ),
+                reason="reconciliation",
+            )
+
+        await session.commit()
+
+    # ======================= RUN =======================
+
+    async def run(
+        self,
+        session: AsyncSession,
+        stale_after: timedelta = timedelta(minutes=30),
+        limit: Optional[int] = None,
+        dry_run: bool = False,
+    ) -> ReconciliationSummary:
+
+        summary = ReconciliationSummary()
+        started = time.perf_counter()
+        cutoff = datetime.now(timezone.utc) - stale_after
+        after = None
+
+        while limit is None or summary.scanned < limit:
+            rows = await self._fetch_page(session, cutoff, after)
+            if limit is not None:
+                rows = rows[: limit - summary.scanned]
+            if not rows:
+                break
+
+            # end the read transaction before the slow gateway calls
+            await session.rollback()
+
+            after = (rows[-1].created_at, rows[-1].uid)
+            summary.pages += 1
+            summary.scanned += len(rows)
+
+            results = await asyncio.gather(
+                *(self._lookup(row.razorpay_order_id) for row in rows)
+            )
+
+            changes = []
+            for row, result in zip(rows, results):
+                if isinstance(result, Exception):
+                    summary.errors += 1
+                    summary.error_order_ids.append(row.razorpay_order_id)
+                    logger.warning(
+                        "Gateway lookup failed for order %s: %s",
+                        row.razorpay_order_id,
+                        result,
+                    )
+                elif result.status == PaymentStatus.created:
+                    summary.unchanged += 1
+                else:
+                    setattr(summary, result.status.value, getattr(summary, result.status.value) + 1)
+                    changes.append((row.uid, row.booking_id, result))
+
+            if not dry_run:
+                await self._apply(session, changes)
+
+            logger.info(
+                "Reconciled page %s (%s scanned, %s changed)",
+                summary.pages,
+                summary.scanned,
+                len(changes),
+            )
+
+        summary.elapsed_seconds = round(time.perf_counter() - started, 3)
+        return summary
@@ -0,0 +1,339 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select, tuple_, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.config import Config
+from src.db.database import async_session_maker, shard_map
+from src.db.models.booking import Booking, BookingStatus
+from src.db.models.parkinglot import ParkingLot
+from src.db.models.parkingslot import ParkingSlot
+from src.db.models.payment import Payment, PaymentStatus
+from src.db.models.refund_job import RefundJob, RefundJobStatus
+from src.db.statements import MAX_BOOKING_DURATION
+from src.services.booking_state_machine import booking_state_machine
+from src.services.outbox_services import PAYMENT_STATUS_CHANGED, outbox_service
+from src.services.payment_gateway import PaymentGateway, RazorpayGateway
+from src.utils.rate_limit import AsyncTokenBucket
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_BOOKING_STATUSES = (
+    BookingStatus.PAYMENT_PENDING,
+    BookingStatus.CONFIRMED,
+    BookingStatus.BOOKED,
+)
+
+# payments a lot closure refunds; refund_pending ones were claimed by an
+# earlier attempt whose outcome never got committed
+REFUNDABLE_PAYMENT_STATUSES = (
+    PaymentStatus.paid,
+    PaymentStatus.refund_pending,
+)
+
+# a RUNNING job whose checkpoint has not moved for this long lost its worker
+STALE_JOB_AFTER = timedelta(minutes=5)
+
+
+class LotClosureRefundService:
+    """
+    Cancels and refunds every active booking of a lot inside a window.
+
+    Work runs in the background in keyset batches of (start_time, uid).
+    Each batch first commits its paid payments as refund_pending, then
+    sends the gateway refunds with bounded concurrency behind a token
+    bucket, keyed by payment uid so a repeat never refunds twice. The
+    outcomes and the job checkpoint are committed together, so a resumed
+    job continues right after the last committed batch and re-sends the
+    refunds still pending.
+
+    Bookings whose refund failed stay active with their payment
+    refund_pending. A pass that left any behind ends FAILED with the
+    cursor reset, so resuming the job rescans the window and retries
+    exactly those. Progress lives on the refund_jobs row and can be read
+    from any worker while the job runs.
+    """
+
+    def __init__(self, gateway: PaymentGateway | None = None):
+        self._gateway = gateway
+        self._tasks: Dict[UUID, asyncio.Task] = {}
+        self.semaphore = asyncio.Semaphore(Config.REFUND_CONCURRENCY)
+        self.rate_limiter = AsyncTokenBucket(Config.REFUND_RATE_PER_SECOND)
+
+    @property
+    def gateway(self) -> PaymentGateway:
+        if self._gateway is None:
+            from src.services.payment_services import razorpay_client
+            self._gateway = RazorpayGateway(razorpay_client)
+        return self._gateway
+
+    # ======================= JOB LIFECYCLE =======================
+
+    async def create_job(
+        self,
+        parking_lot_id: UUID,
+        window_start: datetime,
+        window_end: datetime,
+        admin_id: UUID,
+        session: AsyncSession,
+    ) -> RefundJob:
+
+        if window_start >= window_end:
+            raise ValueError("window_start must be before window_end")
+
+        # the job runs next to the lot's bookings
+        await shard_map.pin(session, parking_lot_id, write=True)
+        if not await session.get(ParkingLot, parking_lot_id):
+            raise ValueError("Parking lot not found")
+
+        job = RefundJob(
+            parking_lot_id=parking_lot_id,
+            window_start=window_start,
+            window_end=window_end,
+            created_by=admin_id,
+        )
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+
+        self.start(job.uid)
+        return job
+
+    async def get_job(self, job_id: UUID, session: AsyncSession) -> RefundJob | None:
+        if await shard_map.pin_owner(session, RefundJob, job_id) is None:
+            return None
+        return await session.get(RefundJob, job_id)
+
+    async def resume_job(self, job_id: UUID, session: AsyncSession) -> RefundJob | None:
+        if await shard_map.pin_owner(session, RefundJob, job_id, write=True) is None:
+            return None
+        job = await session.get(RefundJob, job_id)
+        if not job:
+            return None
+
+        if job.status == RefundJobStatus.COMPLETED:
+            raise ValueError("Refund job already completed")
+
+        if job.status == RefundJobStatus.RUNNING and not self._is_stale(job):
+            raise ValueError("Refund job is already running")
+
+        self.start(job.uid)
+        return job
+
+    def start(self, job_id: UUID) -> None:
+        if job_id in self._tasks:
+            return
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    @staticmethod
+    def _is_stale(job: RefundJob) -> bool:
+        return job.updated_at < datetime.now(timezone.utc) - STALE_JOB_AFTER
+
+    # ======================= WORKER =======================
+
+    async def _claim(self, session: AsyncSession, job_id: UUID) -> RefundJob | None:
+        """Flip the job to RUNNING unless another worker holds it."""
+        jobs = RefundJob.__table__
+        stale_before = datetime.now(timezone.utc) - STALE_JOB_AFTER
+
+        result = await session.execute(
+            update(jobs)
+            .where(
+                jobs.c.uid == job_id,
+                or_(
+                    jobs.c.status.in_([RefundJobStatus.PENDING, RefundJobStatus.FAILED]),
+                    and_(
+                        jobs.c.status == RefundJobStatus.RUNNING,
+                        jobs.c.updated_at < stale_before,
+                    ),
+                ),
+            )
+            .values(status=RefundJobStatus.RUNNING, last_error=None)
+            .returning(jobs.c.uid)
+        )
+        claimed = result.first()
+        await session.commit()
+
+        if not claimed:
+            return None
+        job = await session.get(RefundJob, job_id)
+        await session.refresh(job)
+        return job
+
+    async def _run(self, job_id: UUID) -> None:
+        async with async_session_maker() as session:
+            await shard_map.pin_owner(session, RefundJob, job_id, write=True)
+            job = await self._claim(session, job_id)
+            if not job:
+                logger.info("Refund job %s is held by another worker", job_id)
+                return
+            if job.cursor_booking_id is None:
+                # a fresh pass counts its own failures
+                job.failed = 0
+
+            try:
+                while True:
+                    rows = await self._fetch_batch(session, job)
+                    if not rows:
+                        break
+                    await self._process_batch(session, job, rows)
+
+                if job.failed:
+                    # rescan from the start on resume; only bookings still
+                    # active (the failed ones) come back
+                    job.status = RefundJobStatus.FAILED
+                    job.cursor_start_time = None
+                    job.cursor_booking_id = None
+                else:
+                    job.status = RefundJobStatus.COMPLETED
+                session.add(job)
+                await session.commit()
+
+            except Exception as e:
+                logger.exception("Refund job %s failed", job_id)
+                await session.rollback()
+                job = await session.get(RefundJob, job_id)
+                job.status = RefundJobStatus.FAILED
+                job.last_error = str(e)[:500]
+                await session.commit()
+
+    async def _fetch_batch(self, session: AsyncSession, job: RefundJob):
+        stmt = (
+            select(
+                Booking.uid,
+                Booking.start_time,
+                Payment.uid.label("payment_uid"),
+                Payment.status.label("payment_status"),
+                Payment.razorpay_payment_id,
+                Payment.amount,
+            )
+            .join(ParkingSlot, ParkingSlot.uid == Booking.slot_id)
+            .outerjoin(
+                Payment,
+                and_(
+                    Payment.booking_id == Booking.uid,
+                    Payment.status.in_(REFUNDABLE_PAYMENT_STATUSES),
+                ),
+            )
+            .where(
+                ParkingSlot.parking_lot_id == job.parking_lot_id,
+                Booking.start_time > job.window_start - MAX_BOOKING_DURATION,
+                Booking.start_time < job.window_end,
+                Booking.end_time > job.window_start,
+                Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+            )
+            .order_by(Booking.start_time, Booking.uid)
+            .limit(Config.REFUND_BATCH_SIZE)
+        )
+        if job.cursor_booking_id is not None:
+            stmt = stmt.where(
+                tuple_(Booking.start_time, Booking.uid)
+                > (job.cursor_start_time, job.cursor_booking_id)
+            )
+
+        result = await session.execute(stmt)
+        rows = result.all()
+        await session.commit()  # don't hold the snapshot during gateway calls
+        return rows
+
+    async def _refund(self, row) -> Exception | None:
+        async with self.semaphore:
+            await self.rate_limiter.acquire()
+            try:
+                await self.gateway.refund_payment(
+                    row.razorpay_payment_id, row.amount, idempotency_key=str(row.payment_uid)
+                )
+            except Exception as e:
+                return e
+        return None
+
+    async def _move_payments(
+        self,
+        session: AsyncSession,
+        payment_ids,
+        from_status: PaymentStatus,
+        to_status: PaymentStatus,
+    ) -> None:
+        """Moves payments still in `from_status` and queues their outbox events."""
+        if not payment_ids:
+            return
+        result = await session.execute(
+            update(Payment)
+            .where(Payment.uid.in_(payment_ids), Payment.status == from_status)
+            .values(status=to_status)
+            .returning(Payment.uid, Payment.booking_id)
+        )
+        await outbox_service.record_many(
+            session,
+            (
+                {
+                    "aggregate_type": "payment",
+                    "aggregate_id": payment_uid,
+                    "event_type": PAYMENT_STATUS_CHANGED,
+                    "payload": outbox_service.payment_payload(
+                        payment_uid, booking_id, from_status, to_status
+                    ),
+                }
+                for payment_uid, booking_id in result.all()
+            ),
+        )
+
+    async def _process_batch(self, session: AsyncSession, job: RefundJob, rows) -> None:
+        paid_rows = [row for row in rows if row.payment_uid is not None]
+
+        # refund intent is durable before any money moves
+        await self._move_payments(
+            session,
+            [row.payment_uid for row in paid_rows if row.payment_status == PaymentStatus.paid],
+            PaymentStatus.paid,
+            PaymentStatus.refund_pending,
+        )
+        await session.commit()
+
+        errors = await asyncio.gather(*(self._refund(row) for row in paid_rows))
+
+        refunded_payments = []
+        failed_bookings = set()
+        for row, error in zip(paid_rows, errors):
+            if error is None:
+                refunded_payments.append(row.payment_uid)
+            else:
+                failed_bookings.add(row.uid)
+                job.last_error = f"{row.razorpay_payment_id}: {error}"[:500]
+                logger.warning("Refund failed for booking %s: %s", row.uid, error)
+
+        # failed bookings stay active, their payments refund_pending
+        cancelled_bookings = [row.uid for row in rows if row.uid not in failed_bookings]
+        # a refund.processed webhook may have settled some of these already
+        await self._move_payments(
+            session, refunded_payments, PaymentStatus.refund_pending, PaymentStatus.refunded
+        )
+
+        cancelled = await booking_state_machine.bulk_transition(
+            session,
+            cancelled_bookings,
+            BookingStatus.CANCELLED,
+            allowed_from=ACTIVE_BOOKING_STATUSES,
+            actor_id=job.created_by,
+            reason="lot_closure",
+        )
+
+        # checkpoint in the same transaction as the status changes; failed
+        # bookings are counted as processed once their retry succeeds
+        job.processed += len(rows) - len(failed_bookings)
+        job.refunded += len(refunded_payments)
+        job.cancelled += len(cancelled)
+        job.failed += len(failed_bookings)
+        job.cursor_start_time = rows[-1].start_time
+        job.cursor_booking_id = rows[-1].uid
+        session.add(job)
+        await session.commit()
+
+
+lot_closure_refund_service = LotClosureRefundService()
@@ -0,0 +1,301 @@
+import asyncio
+import logging
+import time
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.db.database import shard_map
+from src.db.models.booking import BookingStatus
+from src.db.models.lot_rollup import LotOccupancyHourly, LotRevenueDaily
+from src.db.models.payment import PaymentStatus
+from src.db.routing import replica_read
+from src.db.statements import MAX_BOOKING_DURATION
+
+logger = logging.getLogger(__name__)
+
+rollup_days = metrics.counter(
+    "rollup_days_refreshed_total",
+    "Dirty (lot, day) buckets rolled up, by shard",
+)
+rollup_seconds = metrics.summary(
+    "rollup_refresh_seconds",
+    "Time to roll up one batch of dirty days",
+)
+
+# bookings that hold their slot for the purpose of occupancy
+OCCUPYING_STATUSES = (
+    BookingStatus.BOOKED,
+    BookingStatus.CONFIRMED,
+    BookingStatus.COMPLETED,
+)
+
+MAX_REVENUE_DAYS = 366
+MAX_OCCUPANCY_HOURS = 31 * 24
+
+# Claims a batch of dirty days. A trigger marking one of them again
+# while we work waits for our commit and re-inserts it, so the next
+# batch picks up whatever our snapshot missed.
+CLAIM_SQL = text(
+    """
+    DELETE FROM rollup_dirty_days d
+    USING (
+        SELECT parking_lot_id, day FROM rollup_dirty_days
+        ORDER BY day
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ) AS pick
+    WHERE d.parking_lot_id = pick.parking_lot_id AND d.day = pick.day
+    RETURNING d.parking_lot_id, d.day
+    """
+)
+
+DIRTY = "unnest(CAST(:lots AS uuid[]), CAST(:days AS date[])) AS dirty(parking_lot_id, day)"
+DAY_START = "(dirty.day::timestamp AT TIME ZONE 'UTC')"
+DAY_END = "((dirty.day + 1)::timestamp AT TIME ZONE 'UTC')"
+
+CLEAR_REVENUE_SQL = text(
+    f"""
+    DELETE FROM lot_revenue_daily r USING {DIRTY}
+    WHERE r.parking_lot_id = dirty.parking_lot_id AND r.day = dirty.day
+    """
+)
+
+# :from_ts / :to_ts bound the whole batch so the planner prunes partitions
+REVENUE_SQL = text(
+    f"""
+    INSERT INTO lot_revenue_daily (
+        parking_lot_id, day, currency,
+        paid_amount, paid_count, refunded_amount, refunded_count, refreshed_at
+    )
+    SELECT dirty.parking_lot_id, dirty.day, p.currency,
+           coalesce(sum(p.amount) FILTER (WHERE p.status = :paid), 0),
+           count(*) FILTER (WHERE p.status = :paid),
+           coalesce(sum(p.amount) FILTER (WHERE p.status = :refunded), 0),
+           count(*) FILTER (WHERE p.status = :refunded),
+           now()
+    FROM {DIRTY}
+    JOIN parking_slots s ON s.parking_lot_id = dirty.parking_lot_id
+    JOIN bookings b ON b.slot_id = s.uid
+        AND b.start_time >= {DAY_START}
+        AND b.start_time < {DAY_END}
+        AND b.start_time >= :from_ts
+        AND b.start_time < :to_ts
+    JOIN payments p ON p.booking_id = b.uid AND p.status IN (:paid, :refunded)
+    GROUP BY dirty.parking_lot_id, dirty.day, p.currency
+    """
+)
+
+CLEAR_OCCUPANCY_SQL = text(
+    f"""
+    DELETE FROM lot_occupancy_hourly o USING {DIRTY}
+    WHERE o.parking_lot_id = dirty.parking_lot_id
+      AND o.hour >= {DAY_START} AND o.hour < {DAY_END}
+    """
+)
+
+# every occupying booking is cut into the hours of the dirty day it covers
+OCCUPANCY_SQL = text(
+    f"""
+    INSERT INTO lot_occupancy_hourly (
+        parking_lot_id, hour, occupied_seconds, booking_count, slot_count
+    )
+    SELECT dirty.parking_lot_id, h,
+           sum(extract(epoch FROM least(b.end_time, h + interval '1 hour') - greatest(b.start_time, h)))::bigint,
+           count(*),
+           max(slots.n)
+    FROM {DIRTY}
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS n FROM parking_slots WHERE parking_lot_id = dirty.parking_lot_id
+    ) AS slots
+    JOIN parking_slots s ON s.parking_lot_id = dirty.parking_lot_id
+    JOIN bookings b ON b.slot_id = s.uid
+        AND b.status IN :statuses
+        AND b.start_time < {DAY_END}
+        AND b.end_time > {DAY_START}
+        AND b.start_time > :from_ts
+        AND b.start_time < :to_ts
+    CROSS JOIN LATERAL generate_series(
+        date_trunc('hour', greatest(b.start_time, {DAY_START}), 'UTC'),
+        least(b.end_time, {DAY_END}) - interval '1 microsecond',
+        interval '1 hour'
+    ) AS h
+    GROUP BY dirty.parking_lot_id, h
+    """
+).bindparams(bindparam("statuses", expanding=True))
+
+
+def _utc(day: date) -> datetime:
+    return datetime.combine(day, dtime.min, tzinfo=timezone.utc)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Naive datetimes are taken as UTC."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+class RollupService:
+    """
+    Revenue per lot and day, occupancy per lot and hour.
+
+    Triggers on bookings and payments add every (lot, UTC day) a write
+    touches to rollup_dirty_days in the writer's own transaction. The
+    refresh job drains that set in batches and rebuilds exactly those
+    days with two set-based statements per table, so a refresh costs
+    what changed, not the history size. Dashboard reads are primary-key
+    range scans of the rollup tables.
+    """
+
+    def __init__(self, batch_days: int = Config.ROLLUP_BATCH_DAYS):
+        self.batch_days = batch_days
+
+    # ======================= REFRESH =======================
+
+    async def refresh_batch(self, session: AsyncSession) -> int:
+        started = time.perf_counter()
+        claimed = (await session.execute(CLAIM_SQL, {"limit": self.batch_days})).all()
+        if not claimed:
+            await session.rollback()
+            return 0
+
+        days = [row.day for row in claimed]
+        params = {
+            "lots": [row.parking_lot_id for row in claimed],
+            "days": days,
+        }
+        revenue_window = {"from_ts": _utc(min(days)), "to_ts": _utc(max(days) + timedelta(days=1))}
+        occupancy_window = {
+            "from_ts": _utc(min(days)) - MAX_BOOKING_DURATION,
+            "to_ts": _utc(max(days) + timedelta(days=1)),
+        }
+
+        await session.execute(CLEAR_REVENUE_SQL, params)
+        await session.execute(
+            REVENUE_SQL,
+            {
+                **params,
+                **revenue_window,
+                "paid": PaymentStatus.paid.value,
+                "refunded": PaymentStatus.refunded.value,
+            },
+        )
+        await session.execute(CLEAR_OCCUPANCY_SQL, params)
+        await session.execute(
+            OCCUPANCY_SQL,
+            {
+                **params,
+                **occupancy_window,
+                "statuses": [status.value for status in OCCUPYING_STATUSES],
+            },
+        )
+        await session.commit()
+
+        rollup_seconds.observe(time.perf_counter() - started)
+        return len(claimed)
+
+    async def refresh_shard(self, shard: str) -> int:
+        """Drains the shard's dirty days; returns how many were rolled up."""
+        total = 0
+        async with shard_map.session(shard) as session:
+            while True:
+                refreshed = await self.refresh_batch(session)
+                total += refreshed
+                if refreshed < self.batch_days:
+                    break
+        rollup_days.inc(total, shard=shard)
+        return total
+
+    async def run(self, interval: float = Config.ROLLUP_REFRESH_INTERVAL_SECONDS) -> None:
+        while True:
+            for shard in shard_map.engines:
+                try:
+                    refreshed = await self.refresh_shard(shard)
+                    if refreshed:
+                        logger.info("Rolled up %d dirty days on %s", refreshed, shard)
+                except Exception:
+                    logger.exception("Rollup refresh failed on %s", shard)
+            await asyncio.sleep(interval)
+
+    # ======================= DASHBOARD READS =======================
+
+    @replica_read
+    async def get_revenue(
+        self,
+        parking_lot_id: UUID,
+        start_day: date,
+        end_day: date,
+        session: AsyncSession,
+    ) -> List[dict]:
+        if end_day < start_day or (end_day - start_day).days >= MAX_REVENUE_DAYS:
+            raise ValueError(f"Pick a range of 1 to {MAX_REVENUE_DAYS} days")
+
+        await shard_map.pin(session, parking_lot_id)
+        result = await session.execute(
+            select(LotRevenueDaily)
+            .where(
+                LotRevenueDaily.parking_lot_id == parking_lot_id,
+                LotRevenueDaily.day >= start_day,
+                LotRevenueDaily.day <= end_day,
+            )
+            .order_by(LotRevenueDaily.day, LotRevenueDaily.currency)
+        )
+        return [
+            {
+                "day": row.day,
+                "currency": row.currency,
+                "paid_amount": row.paid_amount,
+                "paid_count": row.paid_count,
+                "refunded_amount": row.refunded_amount,
+                "refunded_count": row.refunded_count,
+            }
+            for row in result.scalars()
+        ]
+
+    @replica_read
+    async def get_occupancy(
+        self,
+        parking_lot_id: UUID,
+        start: datetime,
+        end: datetime,
+        session: AsyncSession,
+    ) -> List[dict]:
+        """One entry per hour in [start, end), zeros where nothing was booked."""
+        first = _as_utc(start).replace(minute=0, second=0, microsecond=0)
+        hours = int((_as_utc(end) - first).total_seconds() // 3600)
+        if hours <= 0 or hours > MAX_OCCUPANCY_HOURS:
+            raise ValueError(f"Pick a range of 1 to {MAX_OCCUPANCY_HOURS} hours")
+
+        await shard_map.pin(session, parking_lot_id)
+        result = await session.execute(
+            select(LotOccupancyHourly).where(
+                LotOccupancyHourly.parking_lot_id == parking_lot_id,
+                LotOccupancyHourly.hour >= first,
+                LotOccupancyHourly.hour < first + timedelta(hours=hours),
+            )
+        )
+        stored = {row.hour: row for row in result.scalars()}
+
+        series = []
+        for i in range(hours):
+            hour = first + timedelta(hours=i)
+            row = stored.get(hour)
+            occupied = row.occupied_seconds if row else 0
+            slot_count = row.slot_count if row else 0
+            series.append({
+                "hour": hour,
+                "occupied_seconds": occupied,
+                "booking_count": row.booking_count if row else 0,
+                "slot_count": slot_count,
+                "occupancy": occupied / (slot_count * 3600) if slot_count else 0.0,
+            })
+        return series
+
+
+rollup_service = RollupService()
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Boolean, DateTime, all_, bindparam, func, or_, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.db.database import shard_map
+from src.db.models.parkingslot import ParkingSlot
+
+logger = logging.getLogger(__name__)
+
+slots_table = ParkingSlot.__table__
+
+sensor_readings = metrics.counter(
+    "sensor_readings_total",
+    "Slot sensor readings by outcome (accepted/coalesced)",
+)
+sensor_flushes = metrics.counter(
+    "sensor_flushes_total",
+    "Sensor buffer flushes by outcome (ok/failed)",
+)
+sensor_slot_updates = metrics.counter(
+    "sensor_slot_updates_total",
+    "Slot availability changes applied from sensor readings",
+)
+sensor_flush_seconds = metrics.summary(
+    "sensor_flush_seconds",
+    "Time to apply one sensor buffer flush to every shard",
+)
+
+# (slot_id, is_available, observed_at); the buffer maps slot_id -> (observed_at, is_available)
+Reading = Tuple[UUID, bool, datetime]
+
+
+# The readings join as three arrays rather than a literal VALUES list: the
+# statement text never changes, so it is compiled and prepared once, and
+# asyncpg ships each array as one binary parameter.
+readings = (
+    func.unnest(
+        bindparam("uids", type_=ARRAY(PG_UUID(as_uuid=True))),
+        bindparam("states", type_=ARRAY(Boolean)),
+        bindparam("observed", type_=ARRAY(DateTime(timezone=True))),
+    )
+    .table_valued("uid", "is_available", "observed_at")
+    .render_derived(name="readings")
+)
+
+# only real changes, and only readings newer than the slot's last change
+SENSOR_UPDATE = (
+    update(slots_table)
+    .where(
+        slots_table.c.uid == readings.c.uid,
+        slots_table.c.is_available != readings.c.is_available,
+        # sensor time against sensor time: the apply time (updated_at) must
+        # not decide whether a later-observed change still lands
+        or_(
+            slots_table.c.state_observed_at.is_(None),
+            slots_table.c.state_observed_at < readings.c.observed_at,
+        ),
+        # writes to a lot being moved between shards are frozen
+        slots_table.c.parking_lot_id != all_(
+            bindparam("moving", type_=ARRAY(PG_UUID(as_uuid=True)))
+        ),
+    )
+    .values(
+        is_available=readings.c.is_available,
+        state_observed_at=readings.c.observed_at,
+        updated_at=func.now(),
+    )
+)
+
+
+def coalesce(pending: Dict[UUID, Tuple[datetime, bool]], readings: Iterable[Reading]) -> int:
+    """Keeps the newest reading per slot; returns how many were superseded."""
+    superseded = 0
+    for slot_id, is_available, observed_at in readings:
+        current = pending.get(slot_id)
+        if current is not None:
+            superseded += 1
+            if current[0] > observed_at:
+                continue
+        pending[slot_id] = (observed_at, is_available)
+    return superseded
+
+
+def as_readings(pending: Dict[UUID, Tuple[datetime, bool]]) -> List[Reading]:
+    return [
+        (slot_id, is_available, observed_at)
+        for slot_id, (observed_at, is_available) in pending.items()
+    ]
+
+
+class SensorIngestService:
+    """
+    Applies ground-sensor / ANPR occupancy readings to `is_available`.
+
+    Requests only merge readings into a per-worker buffer keyed by slot,
+    so the buffer is bounded by the number of slots however fast
+    sensors report; a slot flapping within one window costs one write.
+    A background loop flushes it every SENSOR_FLUSH_SECONDS (sooner once
+    SENSOR_FLUSH_SIZE slots are pending) with one bulk UPDATE ... FROM
+    per chunk, fanned out to every shard (each only matches its own
+    slots). The update is guarded so it only touches rows whose state
+    really changes and whose last applied reading was observed before
+    this one (state_observed_at; updated_at stays the audit time).
+    Catalog versions and change notifications then fire once per
+    statement and lot, not per reading.
+
+    A failed flush puts its readings back unless newer ones arrived.
+    Slots of a lot in the middle of a shard move are skipped; sensors
+    re-report, so the next reading after the move lands.
+    """
+
+    def __init__(
+        self,
+        flush_seconds: float = Config.SENSOR_FLUSH_SECONDS,
+        flush_size: int = Config.SENSOR_FLUSH_SIZE,
+        chunk: int = Config.SENSOR_UPDATE_CHUNK,
+    ):
+        self.flush_seconds = flush_seconds
+        self.flush_size = flush_size
+        self.chunk = chunk
+        self._pending: Dict[UUID, Tuple[datetime, bool]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------------- INGEST ----------------
+
+    def submit(self, readings: List[Reading]) -> int:
+        """Buffers readings; returns how many were coalesced away."""
+        if len(readings) > Config.SENSOR_MAX_READINGS:
+            raise ValueError(f"At most {Config.SENSOR_MAX_READINGS} readings per request")
+        coalesced = coalesce(self._pending, readings)
+        sensor_readings.inc(len(readings) - coalesced, outcome="accepted")
+        sensor_readings.inc(coalesced, outcome="coalesced")
+        if len(self._pending) >= self.flush_size:
+            self._wakeup.set()
+        return coalesced
+
+    # ---------------- APPLY ----------------
+
+    @staticmethod
+    def _sorted_rows(pending: Dict[UUID, Tuple[datetime, bool]]) -> List[Reading]:
+        # uid order (Postgres compares uuids bytewise), so concurrent
+        # flushes from other workers lock rows in the same order
+        return sorted(as_readings(pending), key=lambda row: row[0].int)
+
+    @staticmethod
+    def _chunk_params(rows: List[Reading], moving: List[UUID]) -> dict:
+        uids, states, observed = zip(*rows)
+        return {"uids": list(uids), "states": list(states), "observed": list(observed), "moving": moving}
+
+    async def apply(self, pending: Dict[UUID, Tuple[datetime, bool]]) -> int:
+        """Writes `pending` to every shard; returns the number of slots changed."""
+        rows = self._sorted_rows(pending)
+        moving = await shard_map.moving_lots()
+
+        async def run(session: AsyncSession) -> int:
+            changed = 0
+            for start in range(0, len(rows), self.chunk):
+                params = self._chunk_params(rows[start:start + self.chunk], moving)
+                result = await session.execute(SENSOR_UPDATE, params)
+                changed += result.rowcount
+            await session.commit()
+            return changed
+
+        return sum(await shard_map.scatter(run, purpose="sensor_flush"))
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+
+        started = time.perf_counter()
+        try:
+            changed = await self.apply(pending)
+        except Exception:
+            sensor_flushes.inc(outcome="failed")
+            # anything newer that arrived meanwhile wins over the retry
+            coalesce(pending, as_readings(self._pending))
+            self._pending = pending
+            raise
+
+        sensor_flushes.inc(outcome="ok")
+        sensor_slot_updates.inc(changed)
+        sensor_flush_seconds.observe(time.perf_counter() - started)
+        return changed
+
+    # ---------------- LOOP ----------------
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.warning("Sensor flush failed; readings kept for the next one", exc_info=True)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.warning("Dropping %d sensor readings on shutdown", len(self._pending), exc_info=True)
+
+
+sensor_ingest_service = SensorIngestService()
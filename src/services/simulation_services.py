@@ -0,0 +1,298 @@
+import heapq
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.database import shard_map
+from src.db.models.booking import Booking
+from src.db.models.parkingslot import ParkingSlot
+from src.db.models.payment import Payment, PaymentStatus
+from src.db.statements import MAX_BOOKING_DURATION
+from src.services.pricing_services import RateTable, pricing_engine, price_windows
+from src.services.rollup_services import OCCUPYING_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+# ======================= POLICY / REPORT =======================
+@dataclass(frozen=True)
+class CapacityPolicy:
+    """
+    What the lot would do with the same demand.
+
+    `hold_minutes`: how long an unpaid request keeps its window blocked.
+    `overbooking_ratio`: extra bookings accepted beyond `slots` (0.1 = 10%).
+    `no_show_rate`: share of paid bookings that never arrive.
+    """
+    name: str
+    slots: int
+    hold_minutes: float = 15.0
+    overbooking_ratio: float = 0.0
+    no_show_rate: float = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return int(self.slots * (1 + self.overbooking_ratio))
+
+
+@dataclass
+class SimulationReport:
+    policy: CapacityPolicy
+    requests: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    expired_holds: int = 0
+    no_shows: int = 0
+    walked: int = 0  # paid, arrived, no free slot (overbooking gone wrong)
+    occupied_seconds: int = 0
+    horizon_seconds: int = 0
+    revenue_paise: int = 0
+    currency: Optional[str] = None
+
+    @property
+    def utilization(self) -> float:
+        capacity = self.policy.slots * self.horizon_seconds
+        return self.occupied_seconds / capacity if capacity else 0.0
+
+    @property
+    def rejection_rate(self) -> float:
+        return self.rejected / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "policy": self.policy.name,
+            "slots": self.policy.slots,
+            "hold_minutes": self.policy.hold_minutes,
+            "overbooking_ratio": self.policy.overbooking_ratio,
+            "no_show_rate": self.policy.no_show_rate,
+            "requests": self.requests,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "rejection_rate": round(self.rejection_rate, 4),
+            "expired_holds": self.expired_holds,
+            "no_shows": self.no_shows,
+            "walked": self.walked,
+            "utilization": round(self.utilization, 4),
+            "revenue": str(Decimal(self.revenue_paise).scaleb(-2)),
+            "currency": self.currency,
+        }
+
+
+@dataclass
+class HistoryChunk:
+    """Booking requests in created_at order, as epoch seconds."""
+    created: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    paid: np.ndarray    # bool: the request turned into a paid booking
+    amount: np.ndarray  # paise actually captured for it
+
+
+# ======================= SIMULATOR =======================
+class CapacitySimulator:
+    """
+    Event-driven replay of one lot's requests under a CapacityPolicy.
+
+    State is two int32 arrays over the horizon in `resolution`-second
+    buckets: `held` (windows promised to bookings and live holds) and,
+    after the replay, `occupied` (cars actually parked). Requests arrive
+    in created_at order; before each one, holds whose expiry is due are
+    released from a heap. A request is accepted when every bucket of
+    its window is below the policy's capacity.
+
+    Accepted paid bookings become arrivals (minus the no-shows); at
+    `finish` they are replayed in start order against `slots`, and an
+    arrival that finds the lot full is walked and refunded.
+    """
+
+    def __init__(
+        self,
+        policy: CapacityPolicy,
+        since: datetime,
+        until: datetime,
+        resolution: int = 300,
+        seed: int = 0,
+    ):
+        self.policy = policy
+        self.origin = int(since.timestamp())
+        self.horizon_end = int(until.timestamp())
+        self.resolution = resolution
+        buckets = math.ceil(
+            (self.horizon_end - self.origin + MAX_BOOKING_DURATION.total_seconds()) / resolution
+        )
+        self.held = np.zeros(buckets, dtype=np.int32)
+        self.hold_seconds = int(policy.hold_minutes * 60)
+        self.rng = np.random.default_rng(seed)
+        self.report = SimulationReport(policy, horizon_seconds=self.horizon_end - self.origin)
+        self._expiries: List[tuple] = []  # (expires_at, first, last)
+        self._arrivals: List[tuple] = []  # chunks of (start, end, amount) arrays
+
+    def _buckets(self, start: np.ndarray, end: np.ndarray):
+        first = (start - self.origin) // self.resolution
+        last = -(-(end - self.origin) // self.resolution)  # ceil: partial buckets count
+        return np.maximum(first, 0), np.maximum(last, first + 1)
+
+    def feed(self, chunk: HistoryChunk) -> None:
+        report, held, capacity = self.report, self.held, self.policy.capacity
+        expiries = self._expiries
+        first, last = self._buckets(chunk.start, chunk.end)
+        accepted = np.zeros(len(first), dtype=bool)
+
+        for i, (created, s, e, paid) in enumerate(
+            zip(chunk.created.tolist(), first.tolist(), last.tolist(), chunk.paid.tolist())
+        ):
+            while expiries and expiries[0][0] <= created:
+                _, hs, he = heapq.heappop(expiries)
+                held[hs:he] -= 1
+                report.expired_holds += 1
+
+            if held[s:e].max() >= capacity:
+                continue
+            held[s:e] += 1
+            accepted[i] = True
+            if not paid:
+                heapq.heappush(expiries, (created + self.hold_seconds, s, e))
+
+        report.requests += len(first)
+        report.accepted += int(accepted.sum())
+        report.rejected += int((~accepted).sum())
+
+        shows = accepted & chunk.paid
+        arrived = shows & (self.rng.random(len(first)) >= self.policy.no_show_rate)
+        report.no_shows += int((shows & ~arrived).sum())
+        # no-shows still paid
+        report.revenue_paise += int(chunk.amount[shows & ~arrived].sum())
+        self._arrivals.append((chunk.start[arrived], chunk.end[arrived], chunk.amount[arrived]))
+
+    def finish(self) -> SimulationReport:
+        report = self.report
+        if not self._arrivals:
+            return report
+
+        start, end, amount = (np.concatenate(parts) for parts in zip(*self._arrivals))
+        order = np.argsort(start, kind="stable")
+        start, end, amount = start[order], end[order], amount[order]
+        first, last = self._buckets(start, end)
+
+        occupied = np.zeros_like(self.held)
+        parked = np.zeros(len(start), dtype=bool)
+        slots = self.policy.slots
+        for i, (s, e) in enumerate(zip(first.tolist(), last.tolist())):
+            if occupied[s] < slots:
+                occupied[s:e] += 1
+                parked[i] = True
+
+        report.walked += int((~parked).sum())
+        report.revenue_paise += int(amount[parked].sum())
+        clipped = np.minimum(end[parked], self.horizon_end) - np.maximum(start[parked], self.origin)
+        report.occupied_seconds += int(np.maximum(clipped, 0).sum())
+        return report
+
+
+# ======================= HISTORY =======================
+class CapacitySimulationService:
+
+    def __init__(self, chunk: int = 50000):
+        self.chunk = chunk
+
+    @staticmethod
+    def _history(parking_lot_id: UUID, since: datetime, until: datetime):
+        captured = (
+            select(func.coalesce(func.sum(Payment.amount), 0))
+            .where(Payment.booking_id == Booking.uid, Payment.status == PaymentStatus.paid)
+            .scalar_subquery()
+        )
+        return (
+            select(
+                func.extract("epoch", Booking.created_at).label("created"),
+                func.extract("epoch", Booking.start_time).label("start"),
+                func.extract("epoch", Booking.end_time).label("end"),
+                Booking.status.in_(OCCUPYING_STATUSES).label("paid"),
+                captured.label("amount"),
+            )
+            .join(ParkingSlot, ParkingSlot.uid == Booking.slot_id)
+            .where(
+                ParkingSlot.parking_lot_id == parking_lot_id,
+                Booking.start_time >= since,
+                Booking.start_time < until,
+            )
+            .order_by(Booking.created_at, Booking.uid)
+        )
+
+    async def stream_history(
+        self,
+        session: AsyncSession,
+        parking_lot_id: UUID,
+        since: datetime,
+        until: datetime,
+        rate_table: Optional[RateTable] = None,
+    ) -> AsyncIterator[HistoryChunk]:
+        """
+        Requests in chunks of `self.chunk` rows. With a rate table every
+        window is re-priced with it instead of using captured amounts.
+        """
+        result = await session.stream(
+            self._history(parking_lot_id, since, until).execution_options(yield_per=self.chunk)
+        )
+        async for rows in result.partitions():
+            created, start, end, paid, amount = (np.array(column) for column in zip(*rows))
+            start, end = start.astype(np.int64), end.astype(np.int64)
+            if rate_table is not None:
+                amount = price_windows(
+                    [rate_table],
+                    np.zeros(len(start), dtype=np.int64),
+                    start,
+                    end,
+                    pricing_engine.offset_seconds,
+                )
+            else:
+                amount = np.rint(amount.astype(np.float64) * 100).astype(np.int64)
+            yield HistoryChunk(created.astype(np.int64), start, end, paid.astype(bool), amount)
+
+    async def slot_count(self, session: AsyncSession, parking_lot_id: UUID) -> int:
+        result = await session.execute(
+            select(func.count()).where(ParkingSlot.parking_lot_id == parking_lot_id)
+        )
+        return result.scalar_one()
+
+    async def simulate(
+        self,
+        parking_lot_id: UUID,
+        policies: Sequence[CapacityPolicy],
+        since: datetime,
+        until: datetime,
+        use_rate_card: bool = True,
+        resolution: int = 300,
+        seed: int = 0,
+    ) -> List[SimulationReport]:
+        """Replays [since, until) once, feeding every policy side by side."""
+        placement = await shard_map.lookup(parking_lot_id)
+        async with shard_map.session(placement.shard) as session:
+            rate_table = None
+            if use_rate_card:
+                tables = await pricing_engine.tables_for_lots([parking_lot_id], session, pinned=True)
+                rate_table = tables.get(parking_lot_id)
+
+            simulators = [
+                CapacitySimulator(policy, since, until, resolution=resolution, seed=seed)
+                for policy in policies
+            ]
+            async for chunk in self.stream_history(session, parking_lot_id, since, until, rate_table):
+                for simulator in simulators:
+                    simulator.feed(chunk)
+
+        reports = [simulator.finish() for simulator in simulators]
+        for report in reports:
+            report.currency = rate_table.currency if rate_table else None
+        return reports
+
+
+capacity_simulation_service = CapacitySimulationService()
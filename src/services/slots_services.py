@@ -1,14 +1,20 @@
 from uuid import UUID
 from typing import List
 
-from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from src.db.models.parkingslot import ParkingSlot
 from src.db.models.parkinglot import ParkingLot
 from src.db.models.user import User
-from src.db.accessor.schemas.parkingslot import SlotCreate, SlotUpdate
+from src.db.accessor.schemas.parkingslot import SlotCreate, SlotUpdate, SlotResponse
+from src.core.cache import catalog_cache
+from src.db.database import shard_map
+from src.core.responses import ListSerializer
+from src.db.projections import slot_rows
+from src.db.routing import replica_read
+
+slot_list = ListSerializer(SlotResponse)
 
 
 class ParkingSlotService:
@@ -25,6 +31,7 @@ class ParkingSlotService:
         if current_user.role != "ADMIN":
             raise PermissionError("Only admin can create parking slots")
 
+        await shard_map.pin(session, parking_lot_id, write=True)
         parking_lot = await session.get(ParkingLot, parking_lot_id)
         if not parking_lot:
             raise ValueError("Parking lot not found")
@@ -44,29 +51,41 @@ class ParkingSlotService:
             raise ValueError("Slot number already exists in this parking lot")
 
         await session.refresh(slot)
+        await catalog_cache.bump(f"lot:{parking_lot_id}")
         return slot
 
     # ===================== GET ALL SLOTS BY PARKING LOT (USER ACCESS) =====================
+    @replica_read
     async def get_slots_by_parking_lot(
         self,
         parking_lot_id: UUID,
-        session: AsyncSession
-    ) -> List[ParkingSlot]:
-
-        stmt = select(ParkingSlot).where(
-            ParkingSlot.parking_lot_id == parking_lot_id
+        session: AsyncSession,
+        version: int | None = None
+    ) -> List[dict]:
+        """Cached; returns dicts shaped like SlotResponse."""
+
+        async def load():
+            await shard_map.pin(session, parking_lot_id)
+            stmt = slot_rows.select().where(
+                ParkingSlot.parking_lot_id == parking_lot_id
+            )
+            slots = await slot_rows.fetch(session, stmt)
+            return slot_list.dump_jsonable(slots)
+
+        return await catalog_cache.get_or_load(
+            f"lot:{parking_lot_id}", "slots", load, version=version
         )
 
-        result = await session.execute(stmt)
-        return result.scalars().all()
-
     # ===================== GET SLOT BY ID (USER ACCESS) =====================
+    @replica_read
     async def get_slot_by_id(
         self,
         slot_id: UUID,
         session: AsyncSession
     ) -> ParkingSlot | None:
 
+        if await shard_map.pin_owner(session, ParkingSlot, slot_id) is None:
+            return None
         return await session.get(ParkingSlot, slot_id)
 
     # ===================== UPDATE SLOT (ADMIN ONLY) =====================
@@ -81,6 +100,8 @@ class ParkingSlotService:
         if current_user.role != "ADMIN":
             raise PermissionError("Only admin can update parking slots")
 
+        if await shard_map.pin_owner(session, ParkingSlot, slot_id, write=True) is None:
+            raise ValueError("Parking slot not found")
         slot = await session.get(ParkingSlot, slot_id)
         if not slot:
             raise ValueError("Parking slot not found")
@@ -100,6 +121,7 @@ class ParkingSlotService:
             raise ValueError("Slot number already exists in this parking lot")
 
         await session.refresh(slot)
+        await catalog_cache.bump(f"lot:{slot.parking_lot_id}")
         return slot
 
 
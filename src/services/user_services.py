@@ -1,10 +1,10 @@
-from sqlmodel import select
 from pydantic import EmailStr
 from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 from src.db.models import User
 from src.db.accessor.schemas.user import Signup,SignupResponse
 from src.utils.auth import generate_password_hash
+from src.db.statements import user_by_email
 
 
 class UserService:
@@ -14,8 +14,7 @@ class UserService:
         email: EmailStr,
         session: AsyncSession
     ) -> User :
-        statement = select(User).where(User.email == email)
-        result = await session.execute(statement)
+        result = await session.execute(user_by_email(email))
         return result.scalar_one_or_none()
 
     async def get_user_by_id(
@@ -0,0 +1,108 @@
+import logging
+import time
+
+from redis.exceptions import RedisError
+
+from src.core.config import Config
+from src.core.metrics import metrics
+from src.core.redis import redis_client
+from src.utils.bloom import RotatingBloomFilter
+
+logger = logging.getLogger(__name__)
+
+EVENT_KEY_PREFIX = "webhook:razorpay:event:"
+
+dedup_lookups = metrics.counter(
+    "webhook_dedup_lookups_total",
+    "Webhook event-id lookups by layer (bloom/redis) and result (hit/miss)",
+)
+webhook_events = metrics.counter(
+    "webhook_events_total",
+    "Razorpay webhook deliveries by outcome",
+)
+
+
+class WebhookEventGuard:
+    """
+    Replay protection for Razorpay webhooks.
+
+    Event ids (X-Razorpay-Event-Id) are remembered in Redis with a TTL,
+    which is shared by every worker. A per-process Bloom filter sits in
+    front of it: a Bloom miss means this worker has never seen the id,
+    so the Redis lookup is skipped; a Bloom hit is confirmed in Redis
+    before anything is rejected, so false positives never drop events.
+
+    Redis is best effort here: if it is down we fall back to the
+    status-based idempotency in the handlers.
+    """
+
+    def __init__(self):
+        self.seen_ids = RotatingBloomFilter(Config.WEBHOOK_BLOOM_CAPACITY)
+
+    @staticmethod
+    def _key(event_id: str) -> str:
+        return EVENT_KEY_PREFIX + event_id
+
+    # ---------------- PRE-CHECK (before signature / parse) ----------------
+
+    def is_duplicate(self, event_id: str) -> bool:
+        if event_id not in self.seen_ids:
+            dedup_lookups.inc(layer="bloom", result="miss")
+            return False
+        dedup_lookups.inc(layer="bloom", result="hit")
+
+        try:
+            found = redis_client.exists(self._key(event_id))
+        except RedisError:
+            logger.warning("Redis unavailable for webhook dedupe", exc_info=True)
+            return False
+
+        dedup_lookups.inc(layer="redis", result="hit" if found else "miss")
+        return bool(found)
+
+    # ---------------- TIMESTAMP WINDOW ----------------
+
+    def check_timestamp(self, created_at: int | None, now: float | None = None) -> None:
+        if created_at is None:
+            raise ValueError("Missing event timestamp")
+
+        now = time.time() if now is None else now
+        age = now - created_at
+
+        if age > Config.WEBHOOK_MAX_EVENT_AGE_SECONDS:
+            raise ValueError("Webhook event is too old")
+        if age < -Config.WEBHOOK_MAX_CLOCK_SKEW_SECONDS:
+            raise ValueError("Webhook event timestamp is in the future")
+
+    # ---------------- CLAIM / RELEASE ----------------
+
+    def claim(self, event_id: str) -> bool:
+        """
+        Atomically marks the event as seen. Returns False if another
+        delivery (possibly on another worker) already claimed it.
+        """
+        self.seen_ids.add(event_id)
+
+        try:
+            claimed = redis_client.set(
+                self._key(event_id),
+                "1",
+                nx=True,
+                ex=Config.WEBHOOK_EVENT_TTL_SECONDS,
+            )
+        except RedisError:
+            logger.warning("Redis unavailable for webhook dedupe", exc_info=True)
+            return True
+
+        dedup_lookups.inc(layer="redis", result="miss" if claimed else "hit")
+        return bool(claimed)
+
+    def release(self, event_id: str) -> None:
+        """Forget a claim so Razorpay's retry of a failed delivery is processed."""
+        try:
+            redis_client.delete(self._key(event_id))
+        except RedisError:
+            logger.warning("Could not release webhook event %s", event_id, exc_info=True)
+
+
+webhook_event_guard = WebhookEventGuard()
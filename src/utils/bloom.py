@@ -0,0 +1,73 @@
+import hashlib
+import math
+import threading
+
+
+# ===================== BLOOM FILTER =====================
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Uses double hashing on a single blake2b digest, so each add/check
+    costs one hash regardless of the number of probes.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(item)
+        )
+
+
+class RotatingBloomFilter:
+    """
+    Bounded "seen" set built from two Bloom generations.
+
+    When the active generation reaches capacity it becomes the previous
+    one and a fresh generation starts, so memory stays fixed and old
+    entries age out after roughly two capacities worth of inserts.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous: BloomFilter | None = None
+        self._lock = threading.Lock()
+
+    def add(self, item: str) -> None:
+        with self._lock:
+            if self._current.count >= self.capacity:
+                self._previous = self._current
+                self._current = BloomFilter(self.capacity, self.error_rate)
+            self._current.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        if item in self._current:
+            return True
+        previous = self._previous
+        return previous is not None and item in previous